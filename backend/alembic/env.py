@@ -8,7 +8,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.database import Base
-from app.models import usuario, pca, qualificacao, licitacao
+from app.models import usuario, pca, qualificacao, licitacao, pca_import_job, dashboard_summary
 
 config = context.config
 if config.config_file_name is not None:
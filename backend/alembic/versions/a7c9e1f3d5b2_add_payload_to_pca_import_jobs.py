@@ -0,0 +1,25 @@
+"""add payload to pca_import_jobs for import previews
+
+Revision ID: a7c9e1f3d5b2
+Revises: f6b8d0e2c4a1
+Create Date: 2025-11-26 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c9e1f3d5b2'
+down_revision = 'f6b8d0e2c4a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('pca_import_jobs', sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pca_import_jobs', 'payload')
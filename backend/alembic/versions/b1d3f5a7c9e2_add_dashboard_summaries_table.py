@@ -0,0 +1,34 @@
+"""add dashboard_summaries table
+
+Revision ID: b1d3f5a7c9e2
+Revises: f8d0b2c4e6a3
+Create Date: 2025-12-03 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1d3f5a7c9e2'
+down_revision = 'f8d0b2c4e6a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'dashboard_summaries',
+        sa.Column('kind', sa.String(length=40), nullable=False),
+        sa.Column('ano', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('computed_on', sa.Date(), server_default=sa.text('CURRENT_DATE'), nullable=False),
+        sa.Column('dirty', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.PrimaryKeyConstraint('kind', 'ano'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dashboard_summaries')
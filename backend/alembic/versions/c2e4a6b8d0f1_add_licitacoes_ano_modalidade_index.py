@@ -0,0 +1,28 @@
+"""add composite ano/modalidade index on licitacoes
+
+Revision ID: c2e4a6b8d0f1
+Revises: b1d3f5a7c9e2
+Create Date: 2025-12-04 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e4a6b8d0f1'
+down_revision = 'b1d3f5a7c9e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_licitacoes_ano_modalidade',
+        'licitacoes',
+        ['ano', 'modalidade'],
+        postgresql_include=['status', 'valor_estimado', 'valor_homologado'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_licitacoes_ano_modalidade', table_name='licitacoes')
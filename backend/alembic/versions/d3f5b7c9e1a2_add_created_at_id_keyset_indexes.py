@@ -0,0 +1,32 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: d3f5b7c9e1a2
+Revises: c2e4a6b8d0f1
+Create Date: 2025-12-05 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f5b7c9e1a2'
+down_revision = 'c2e4a6b8d0f1'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ('pca', 'qualificacoes', 'licitacoes', 'usuarios')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # Linhas antigas sem created_at ficariam fora da ordenação (created_at, id)
+        op.execute(
+            f"UPDATE {table} SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL"
+        )
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table)
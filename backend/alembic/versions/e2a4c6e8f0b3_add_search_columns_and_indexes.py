@@ -0,0 +1,95 @@
+"""add full-text and trigram search columns to pca, qualificacoes and licitacoes
+
+Revision ID: e2a4c6e8f0b3
+Revises: d3f5b7c9e1a2
+Create Date: 2025-12-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a4c6e8f0b3'
+down_revision = 'd3f5b7c9e1a2'
+branch_labels = None
+depends_on = None
+
+
+# Mesmas expressões de app.models.pca / qualificacao / licitacao (SEARCH_VECTOR_SQL e SEARCH_TEXT_SQL)
+SEARCH_COLUMNS = {
+    'pca': (
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(titulo_contratacao, '')), 'A') || "
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(categoria_contratacao, '') || ' ' || "
+        "coalesce(area_requisitante, '')), 'B')",
+        "public.f_unaccent(lower(coalesce(numero_contratacao, '') || ' ' || coalesce(titulo_contratacao, '') || ' ' || "
+        "coalesce(area_requisitante, '')))",
+    ),
+    'qualificacoes': (
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(objeto, '')), 'A') || "
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(palavra_chave, '')), 'B') || "
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(area_demandante, '') || ' ' || "
+        "coalesce(modalidade, '')), 'C')",
+        "public.f_unaccent(lower(coalesce(nup, '') || ' ' || coalesce(numero_contratacao, '') || ' ' || "
+        "coalesce(objeto, '') || ' ' || coalesce(palavra_chave, '')))",
+    ),
+    'licitacoes': (
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(objeto, '')), 'A') || "
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(palavra_chave, '')), 'B') || "
+        "setweight(to_tsvector('public.pt_unaccent'::regconfig, coalesce(area_demandante, '') || ' ' || "
+        "coalesce(modalidade, '') || ' ' || coalesce(pregoeiro, '')), 'C')",
+        "public.f_unaccent(lower(coalesce(nup, '') || ' ' || coalesce(numero_contratacao, '') || ' ' || "
+        "coalesce(objeto, '') || ' ' || coalesce(palavra_chave, '')))",
+    ),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # unaccent() é STABLE; o wrapper IMMUTABLE (dicionário fixo) pode ser usado em colunas geradas e índices
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION public.f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    # Português sem acentos: "licitação" e "licitacao" geram o mesmo lexema,
+    # e ts_headline destaca o texto original
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'pt_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION public.pt_unaccent (COPY = pg_catalog.portuguese);
+                ALTER TEXT SEARCH CONFIGURATION public.pt_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH public.unaccent, portuguese_stem;
+            END IF;
+        END
+        $$
+        """
+    )
+
+    for table, (vector_sql, text_sql) in SEARCH_COLUMNS.items():
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(vector_sql, persisted=True)))
+        op.add_column(table, sa.Column('search_text', sa.Text(), sa.Computed(text_sql, persisted=True)))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+        op.create_index(
+            f'ix_{table}_search_text_trgm',
+            table,
+            ['search_text'],
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for table in SEARCH_COLUMNS:
+        op.drop_index(f'ix_{table}_search_text_trgm', table_name=table)
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_text')
+        op.drop_column(table, 'search_vector')
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS public.pt_unaccent")
+    op.execute("DROP FUNCTION IF EXISTS public.f_unaccent(text)")
@@ -0,0 +1,48 @@
+"""add pca_import_jobs table
+
+Revision ID: e5a7c9d1b2f3
+Revises: d4f1a2b3c6d7
+Create Date: 2025-11-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d1b2f3'
+down_revision = 'd4f1a2b3c6d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pca_import_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='PENDENTE'),
+        sa.Column('source', sa.String(length=10), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('ano', sa.Integer(), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('imported', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['created_by'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_pca_import_jobs_created_by_created_at', 'pca_import_jobs', ['created_by', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pca_import_jobs_created_by_created_at', table_name='pca_import_jobs')
+    op.drop_table('pca_import_jobs')
@@ -0,0 +1,27 @@
+"""add generation to dashboard_summaries
+
+Revision ID: f4b6d8e0a2c5
+Revises: e2a4c6e8f0b3
+Create Date: 2025-12-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b6d8e0a2c5'
+down_revision = 'e2a4c6e8f0b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'dashboard_summaries',
+        sa.Column('generation', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('dashboard_summaries', 'generation')
@@ -0,0 +1,30 @@
+"""add content_hash to pca and unchanged count to pca_import_jobs
+
+Revision ID: f6b8d0e2c4a1
+Revises: e5a7c9d1b2f3
+Create Date: 2025-11-24 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b8d0e2c4a1'
+down_revision = 'e5a7c9d1b2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fica NULL nas linhas existentes: a primeira reimportação grava o hash
+    op.add_column('pca', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column(
+        'pca_import_jobs',
+        sa.Column('unchanged', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('pca_import_jobs', 'unchanged')
+    op.drop_column('pca', 'content_hash')
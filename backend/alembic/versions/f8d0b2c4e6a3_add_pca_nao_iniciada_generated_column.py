@@ -0,0 +1,47 @@
+"""add generated nao_iniciada column, partial indexes and ano_pca index to pca
+
+Revision ID: f8d0b2c4e6a3
+Revises: a7c9e1f3d5b2
+Create Date: 2025-12-01 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8d0b2c4e6a3'
+down_revision = 'a7c9e1f3d5b2'
+branch_labels = None
+depends_on = None
+
+# Mesma regra de app.models.pca.SITUACOES_NAO_INICIADA
+NAO_INICIADA_SQL = (
+    "lower(btrim(coalesce(situacao_execucao, ''), E' \\t\\r\\n')) IN "
+    "('', 'não iniciada', 'nao iniciada', 'não iniciado', 'nao iniciado')"
+)
+
+
+def upgrade() -> None:
+    # STORED: reescreve a tabela uma vez; depois é mantida pelo próprio Postgres
+    op.add_column(
+        'pca',
+        sa.Column('nao_iniciada', sa.Boolean(), sa.Computed(NAO_INICIADA_SQL, persisted=True), nullable=True),
+    )
+    op.create_index(
+        'ix_pca_nao_iniciada_inicio', 'pca', ['data_estimada_inicio'],
+        postgresql_where=sa.text('nao_iniciada'),
+    )
+    op.create_index(
+        'ix_pca_nao_iniciada_conclusao', 'pca', ['data_estimada_conclusao'],
+        postgresql_where=sa.text('nao_iniciada'),
+    )
+    # Filtro por ano das estatísticas e listagens
+    op.create_index('ix_pca_ano_pca', 'pca', ['ano_pca'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pca_ano_pca', table_name='pca')
+    op.drop_index('ix_pca_nao_iniciada_conclusao', table_name='pca')
+    op.drop_index('ix_pca_nao_iniciada_inicio', table_name='pca')
+    op.drop_column('pca', 'nao_iniciada')
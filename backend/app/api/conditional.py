@@ -0,0 +1,52 @@
+"""
+GET condicional (ETag / If-None-Match) para listagens e estatísticas.
+
+A versão de uma tabela é calculada no banco com uma agregação barata
+(quantidade de linhas, maior e soma dos instantes de criação/alteração),
+sem carregar nem serializar as linhas. Se o cliente já tem essa versão,
+a rota responde 304 sem corpo.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+
+def table_version(db: Session, model, *criteria) -> str:
+    """Token de versão das linhas de ``model`` que atendem aos critérios"""
+    stamp = func.coalesce(model.updated_at, model.created_at)
+    # A soma cobre alterações confirmadas fora de ordem: now() é o início da
+    # transação, então só o máximo poderia não mudar
+    count, latest, total = (
+        db.query(func.count(), func.max(stamp), func.sum(func.extract("epoch", stamp)))
+        .select_from(model)
+        .filter(*criteria)
+        .one()
+    )
+    return f"{count}:{latest.isoformat() if latest else ''}:{total or 0}"
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparação fraca (RFC 9110): ignora o prefixo W/
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def check_etag(request: Request, response: Response, *version: Any) -> Optional[Response]:
+    """
+    Define ETag/Cache-Control na resposta e devolve um 304 pronto se o
+    cliente enviou ``If-None-Match`` com a mesma versão; senão, ``None``.
+    """
+    token = "|".join([request.url.path, request.url.query, *map(str, version)])
+    etag = f'"{hashlib.sha1(token.encode("utf-8")).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return None
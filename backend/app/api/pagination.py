@@ -0,0 +1,110 @@
+"""
+Paginação por cursor (keyset) para as listagens.
+
+As páginas são ordenadas por ``(created_at, id)``, que é único e estável, e
+a próxima página começa depois da última linha entregue (índice composto
+``(created_at, id)`` em cada tabela), em tempo constante por página, ao
+contrário de OFFSET. O corpo continua sendo a lista de sempre; o cursor da
+próxima página e a estimativa de total vão nos cabeçalhos:
+
+- ``X-Next-Cursor``: cursor opaco a repassar em ``?cursor=``; ausente na última página
+- ``X-Total-Estimate``: estimativa do planejador (só na primeira página)
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+# A falha da estimativa é registrada uma vez por processo, não a cada listagem
+_estimate_failure_logged = False
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Parâmetro 'cursor' inválido")
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """Quantidade estimada pelo planejador (EXPLAIN), sem contar as linhas"""
+    try:
+        statement = query.order_by(None).statement
+        sql = str(statement.compile(dialect=query.session.bind.dialect, compile_kwargs={"literal_binds": True}))
+        # SAVEPOINT: uma falha aqui não pode abortar a transação da listagem
+        with query.session.begin_nested():
+            # no_parameters: o SQL já vem com os valores; '%' de um ILIKE não é placeholder
+            plan = query.session.connection().exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {sql}", execution_options={"no_parameters": True}
+            ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        global _estimate_failure_logged
+        if not _estimate_failure_logged:
+            _estimate_failure_logged = True
+            print(f"[PAGINATION] estimativa de total indisponível: {e}")
+        return None
+
+
+def paginate(
+    query: Query,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: Sequence[Any] = (),
+) -> List[Any]:
+    """
+    Aplica ordenação estável e a página pedida (por ``cursor`` ou, por
+    compatibilidade, por ``skip``) e preenche os cabeçalhos de paginação.
+
+    Com ``order_by`` (ordenação escolhida pelo cliente, desempatada por id)
+    só há paginação por ``skip``: o cursor pressupõe a ordem (created_at, id).
+    """
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use 'cursor' ou 'skip', não ambos")
+    if cursor and order_by:
+        raise HTTPException(status_code=400, detail="'cursor' só pode ser usado com a ordenação padrão")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Parâmetro 'limit' inválido")
+
+    model = query.column_descriptions[0]["entity"]
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        page = query.filter(tuple_(model.created_at, model.id) > tuple_(created_at, row_id))
+        page = page.order_by(model.created_at, model.id)
+    else:
+        if not skip:
+            estimate = estimate_count(query)
+            if estimate is not None:
+                response.headers[TOTAL_ESTIMATE_HEADER] = str(estimate)
+        if order_by:
+            page = query.order_by(*order_by, model.id).offset(skip)
+        else:
+            page = query.order_by(model.created_at, model.id).offset(skip)
+
+    # Uma linha a mais indica se existe próxima página
+    rows = page.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if not order_by:
+            last = rows[-1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
@@ -5,13 +5,15 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from fastapi.security import HTTPBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.api.pagination import paginate
 from app.core import security
 from app.core.config import settings
 from app.core.database import get_db
+from app.models.usuario import Usuario as UsuarioModel
 from app.schemas.usuario import Usuario, UsuarioCreate, UsuarioUpdate, Token
 from app.services.auth_service import (
     authenticate_user, create_user, get_user_by_username, get_user_by_email,
-    get_users, get_user, update_user, delete_user
+    get_user, update_user, delete_user
 )
 from pydantic import BaseModel
 import os
@@ -161,16 +163,18 @@ def get_avatar(
 # Endpoints de administração de usuários (apenas para COORDENADOR)
 @router.get("/users", response_model=List[Usuario])
 def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     admin_user: Usuario = Depends(deps.get_admin_user)
 ) -> Any:
     """
     Retrieve all users. Only accessible by COORDENADOR.
+    Paginated by cursor (X-Next-Cursor header) or, for compatibility, by skip.
     """
-    users = get_users(db, skip=skip, limit=limit)
-    return users
+    return paginate(db.query(UsuarioModel), response, skip, limit, cursor)
 
 
 @router.get("/users/{user_id}", response_model=Usuario)
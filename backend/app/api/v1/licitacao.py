@@ -1,27 +1,36 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
 from app.api import deps
+from app.api.conditional import check_etag, table_version
+from app.api.pagination import paginate
+from app.core.cache import dashboard_cache, invalidate_cache
 from app.core.database import get_db
 from app.models.usuario import Usuario
 from app.models.licitacao import Licitacao
 from app.models.qualificacao import Qualificacao
 from app.schemas.licitacao import Licitacao as LicitacaoSchema, LicitacaoCreate, LicitacaoUpdate
-from decimal import Decimal
+from app.services.licitacao_stats_service import licitacao_dashboard_stats
+from app.services.dashboard_summary_service import LICITACAO_SUMMARIES, get_summary, mark_dashboards_dirty
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[LicitacaoSchema])
 def read_licitacoes(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    licitacoes = db.query(Licitacao).offset(skip).limit(limit).all()
-    return licitacoes
+    not_modified = check_etag(request, response, table_version(db, Licitacao))
+    if not_modified:
+        return not_modified
+    return paginate(db.query(Licitacao), response, skip, limit, cursor)
 
 
 @router.post("/", response_model=LicitacaoSchema)
@@ -53,6 +62,8 @@ def create_licitacao(
             created_by=current_user.id
         )
         db.add(licitacao)
+        mark_dashboards_dirty(db, LICITACAO_SUMMARIES)
+        invalidate_cache(db, ("licitacao",))
         db.commit()
         db.refresh(licitacao)
         return licitacao
@@ -97,6 +108,8 @@ def update_licitacao(
         licitacao.economia = licitacao.valor_estimado - licitacao.valor_homologado
     # Track updater
     licitacao.updated_by = current_user.id
+    mark_dashboards_dirty(db, LICITACAO_SUMMARIES)
+    invalidate_cache(db, ("licitacao",))
 
     db.commit()
     db.refresh(licitacao)
@@ -114,82 +127,40 @@ def delete_licitacao(
         raise HTTPException(status_code=404, detail="Licitacao not found")
     
     db.delete(licitacao)
+    mark_dashboards_dirty(db, LICITACAO_SUMMARIES)
+    invalidate_cache(db, ("licitacao",))
     db.commit()
     return {"message": "Licitacao deleted successfully"}
 
 
 @router.get("/dashboard/stats")
-def get_dashboard_stats(db: Session = Depends(get_db)) -> Any:
-    """Retorna estatísticas para o dashboard de licitações"""
+def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    ano: Optional[int] = None,
+    modalidade: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> Any:
+    """Retorna estatísticas para o dashboard de licitações (opcionalmente por ano e modalidade)"""
+    if ano is not None and (ano < 2000 or ano > 2100):
+        raise HTTPException(status_code=400, detail="Ano inválido")
+    filters = [Licitacao.ano == ano] if ano is not None else []
+    if modalidade:
+        filters.append(Licitacao.modalidade == modalidade)
+    not_modified = check_etag(request, response, table_version(db, Licitacao, *filters))
+    if not_modified:
+        return not_modified
+
+    def compute():
+        if modalidade:
+            # Combinações com modalidade não são pré-calculadas: consulta direta (índice ano/modalidade)
+            stats = licitacao_dashboard_stats(db, ano, modalidade)
+            return {**stats, "computed_at": datetime.now(timezone.utc).isoformat()}
+        # Resumo pré-calculado por ano (recalculado após escritas)
+        return get_summary(db, "licitacao_stats", ano)
+
     try:
-        # Total de licitações
-        total_licitacoes = db.query(func.count(Licitacao.id)).scalar() or 0
-        
-        # Licitações por status
-        status_counts = db.query(
-            Licitacao.status,
-            func.count(Licitacao.id)
-        ).group_by(Licitacao.status).all()
-        
-        licitacoes_por_status = {
-            status: count for status, count in status_counts
-        }
-        
-        # Valores totais
-        valor_total_estimado = db.query(
-            func.sum(Licitacao.valor_estimado)
-        ).scalar() or Decimal('0')
-        
-        valor_total_homologado = db.query(
-            func.sum(Licitacao.valor_homologado)
-        ).filter(
-            Licitacao.status == 'HOMOLOGADA'
-        ).scalar() or Decimal('0')
-        
-        # Economia total
-        economia_total = db.query(
-            func.sum(
-                case(
-                    (Licitacao.status == 'HOMOLOGADA',
-                     Licitacao.valor_estimado - Licitacao.valor_homologado),
-                    else_=0
-                )
-            )
-        ).scalar() or Decimal('0')
-        
-        # Taxa de sucesso
-        total_concluidas = db.query(func.count(Licitacao.id)).filter(
-            Licitacao.status.in_(['HOMOLOGADA', 'FRACASSADA', 'REVOGADA'])
-        ).scalar() or 0
-        
-        total_homologadas = licitacoes_por_status.get('HOMOLOGADA', 0)
-        
-        taxa_sucesso = (
-            (total_homologadas / total_concluidas * 100) 
-            if total_concluidas > 0 else 0
-        )
-        
-        return {
-            "total_licitacoes": total_licitacoes,
-            "homologadas": licitacoes_por_status.get('HOMOLOGADA', 0),
-            "em_andamento": licitacoes_por_status.get('EM ANDAMENTO', 0),
-            "fracassadas": licitacoes_por_status.get('FRACASSADA', 0),
-            "revogadas": licitacoes_por_status.get('REVOGADA', 0),
-            "valor_total_estimado": float(valor_total_estimado),
-            "valor_total_homologado": float(valor_total_homologado),
-            "total_economia": float(economia_total),
-            "economia_percentual": (
-                float(economia_total / valor_total_estimado * 100) 
-                if valor_total_estimado > 0 else 0
-            ),
-            "taxa_sucesso": float(taxa_sucesso),
-            "licitacoes_por_status": {
-                "HOMOLOGADA": licitacoes_por_status.get('HOMOLOGADA', 0),
-                "EM ANDAMENTO": licitacoes_por_status.get('EM ANDAMENTO', 0),
-                "FRACASSADA": licitacoes_por_status.get('FRACASSADA', 0),
-                "REVOGADA": licitacoes_por_status.get('REVOGADA', 0)
-            }
-        }
+        return dashboard_cache.get_or_compute(("licitacao", "stats", ano, modalidade), compute)
     except Exception as e:
         print(f"Erro no dashboard stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
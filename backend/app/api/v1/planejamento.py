@@ -1,126 +1,44 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import text as sql_text
+from sqlalchemy import func, text as sql_text
 from app.api import deps
+from app.api.conditional import check_etag, table_version
+from app.api.pagination import paginate
+from app.core.cache import dashboard_cache, invalidate_cache
 from app.core.database import get_db
 from app.models.usuario import Usuario
 from app.models.pca import PCA
+from app.models.pca_import_job import PCAImportJob
 from app.schemas.pca import PCA as PCASchema, PCACreate, PCAUpdate
+from app.services.pca_import_service import (
+    apply_import_rows,
+    diff_import_rows,
+    load_import_rows,
+    pca_content_hash,
+    run_pca_import,
+    spool_upload,
+)
+from app.services import pca_import_jobs
+from app.services.pca_query_service import (
+    parse_fields,
+    parse_sort,
+    pca_list_filters,
+    projection_columns,
+    serialize_projection,
+)
+from app.services.dashboard_summary_service import PCA_SUMMARIES, get_summary, mark_dashboards_dirty
 from datetime import date
+from decimal import Decimal
 import pandas as pd
-import io
-import re
+import os
 import uuid
 
 
-def clean_text(text):
-    """Limpa e corrige caracteres especiais corrompidos"""
-    if pd.isna(text) or text == '':
-        return None
-
-    text = str(text)
-    # Correções de encoding corrompido comum (baseado em convert_pca.py)
-    replacements = {
-        '�': 'ã',
-        '��o': 'ção',
-        '��': 'ção',
-        'contrata��o': 'contratação',
-        'situa��o': 'situação',
-        'execu��o': 'execução',
-        'prepara��o': 'preparação',
-        't�tulo': 'título',
-        'servi�o': 'serviço',
-        'informa��o': 'informação',
-        'comunica��o': 'comunicação',
-        'aquisi��o': 'aquisição',
-        'manuten��o': 'manutenção',
-        '�rea': 'área',
-        'n�mero': 'número',
-        'in�cio': 'início',
-        'conclus�o': 'conclusão',
-        'dura��o': 'duração',
-        'transfer�ncia': 'transferência',
-        'assist�ncia': 'assistência',
-        't�cnica': 'técnica',
-        'cient�fica': 'científica',
-        'implementa��o': 'implementação',
-        '�gil': 'ágil',
-        'ag�ncias': 'agências',
-        'mobili�rios': 'mobiliários',
-        'acess�rios': 'acessórios',
-        'an�lise': 'análise',
-        'tecnologia': 'tecnologia',
-        'licenciamento': 'licenciamento'
-    }
-
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-
-    return text.strip()
-
-
-def parse_csv_date(date_str):
-    """Converte string de data CSV para formato datetime"""
-    if pd.isna(date_str) or date_str == '':
-        return None
-
-    date_str = str(date_str).strip()
-
-    # Tentar diferentes formatos de data
-    formats = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']
-
-    for fmt in formats:
-        try:
-            from datetime import datetime
-            return datetime.strptime(date_str, fmt).date()
-        except ValueError:
-            continue
-
-    return None
-
-
-def parse_csv_currency(value_str):
-    """Converte string de valor monetário CSV para float"""
-    if pd.isna(value_str) or value_str == '':
-        return 0.0
-
-    value_str = str(value_str).strip()
-
-    # Remove espaços e outros caracteres não numéricos
-    value_str = re.sub(r'[^\d,.]', '', value_str)
-
-    # Se tem vírgula, é separador decimal brasileiro
-    if ',' in value_str:
-        # Dividir em parte inteira e decimal
-        parts = value_str.split(',')
-        integer_part = parts[0].replace('.', '')  # Remove pontos de milhares
-        decimal_part = parts[1] if len(parts) > 1 else '00'
-        value_str = integer_part + '.' + decimal_part
-
-    try:
-        return float(value_str)
-    except ValueError:
-        return 0.0
-
-
 
 router = APIRouter()
 
 
-def _extract_year_from_num(numero: str):
-    try:
-        if not numero:
-            return None
-        m = re.search(r'(\d{4})$', str(numero).strip())
-        if m:
-            y = int(m.group(1))
-            if 2000 <= y <= 2100:
-                return y
-        return None
-    except Exception:
-        return None
-
 # --- Ciclos do Plano (pca_cycles) ---
 from sqlalchemy import text as sql_text
 
@@ -217,24 +135,63 @@ def _get_current_open_cycle(db: Session):
 
 @router.get("/", response_model=List[PCASchema])
 def read_pcas(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 1000,
     ano: Optional[int] = None,
+    cursor: Optional[str] = None,
+    situacao: Optional[List[str]] = Query(None, description="situacao_execucao (repetível)"),
+    categoria: Optional[List[str]] = Query(None, description="categoria_contratacao (repetível)"),
+    status: Optional[List[str]] = Query(None, description="status_contratacao (repetível)"),
+    area: Optional[str] = Query(None, description="trecho de area_requisitante"),
+    valor_min: Optional[Decimal] = None,
+    valor_max: Optional[Decimal] = None,
+    inicio_de: Optional[date] = None,
+    inicio_ate: Optional[date] = None,
+    conclusao_de: Optional[date] = None,
+    conclusao_ate: Optional[date] = None,
+    sort: Optional[str] = Query(None, description="ex.: -valor_total,numero_contratacao"),
+    fields: Optional[str] = Query(None, description="colunas a retornar, ex.: numero_contratacao,valor_total"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    query = db.query(PCA)
+    filters = []
     if ano is not None:
         try:
             year = int(ano)
             if 2000 <= year <= 2100:
-                query = query.filter(PCA.ano_pca == year)
+                filters.append(PCA.ano_pca == year)
             else:
                 raise ValueError()
         except Exception:
             raise HTTPException(status_code=400, detail="Parâmetro 'ano' inválido")
-    pcas = query.offset(skip).limit(limit).all()
-    return pcas
+    try:
+        filters += pca_list_filters(
+            situacao, categoria, status, area, valor_min, valor_max,
+            inicio_de, inicio_ate, conclusao_de, conclusao_ate,
+        )
+        order_by = parse_sort(sort)
+        names = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # atrasada/vencida mudam na virada do dia mesmo sem escrita na tabela
+    not_modified = check_etag(request, response, table_version(db, PCA, *filters), date.today())
+    if not_modified:
+        return not_modified
+
+    if names is None:
+        return paginate(db.query(PCA).filter(*filters), response, skip, limit, cursor, order_by)
+
+    # Projeção: só as colunas pedidas saem do banco e são serializadas
+    query = db.query(*projection_columns(names)).filter(*filters)
+    rows = paginate(query, response, skip, limit, cursor, order_by)
+    return Response(
+        content=serialize_projection(names, rows),
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
 
 
 @router.post("/", response_model=PCASchema)
@@ -252,7 +209,10 @@ def create_pca(
         **pca_in.dict(),
         created_by=current_user.id
     )
+    pca.content_hash = pca_content_hash(pca)
     db.add(pca)
+    mark_dashboards_dirty(db, PCA_SUMMARIES)
+    invalidate_cache(db, ("pca",))
     db.commit()
     db.refresh(pca)
     return pca
@@ -260,63 +220,149 @@ def create_pca(
 
 @router.get("/atrasadas")
 def get_pcas_atrasadas(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> List[PCASchema]:
-    from sqlalchemy import text
-
-    # Buscar contratações atrasadas usando a mesma lógica SQL
-    sql_query = text("""
-        SELECT * FROM pca
-        WHERE situacao_execucao = 'Não iniciada'
-          AND data_estimada_inicio < CURRENT_DATE
-          AND data_estimada_conclusao >= CURRENT_DATE
-        ORDER BY data_estimada_inicio ASC
-    """)
-
-    result = db.execute(sql_query)
-    pcas = result.fetchall()
-
-    # Converter resultados para objetos PCA
-    pca_objects = []
-    for row in pcas:
-        pca = PCA()
-        for column, value in zip(result.keys(), row):
-            setattr(pca, column, value)
-        pca_objects.append(pca)
-
-    return pca_objects
+    # A regra depende da data de hoje: a versão muda também na virada do dia
+    not_modified = check_etag(request, response, table_version(db, PCA), date.today())
+    if not_modified:
+        return not_modified
+    # Mesma regra das estatísticas (expressão híbrida PCA.atrasada)
+    return (
+        db.query(PCA)
+        .filter(PCA.atrasada)
+        .order_by(PCA.data_estimada_inicio.asc())
+        .all()
+    )
 
 
 @router.get("/vencidas")
 def get_pcas_vencidas(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> List[PCASchema]:
-    from sqlalchemy import text
+    not_modified = check_etag(request, response, table_version(db, PCA), date.today())
+    if not_modified:
+        return not_modified
+    # Mesma regra das estatísticas (expressão híbrida PCA.vencida)
+    return (
+        db.query(PCA)
+        .filter(PCA.vencida)
+        .order_by(PCA.data_estimada_conclusao.asc())
+        .all()
+    )
 
-    # Buscar contratações vencidas usando a mesma lógica SQL
-    sql_query = text("""
-        SELECT * FROM pca
-        WHERE situacao_execucao = 'Não iniciada'
-          AND data_estimada_conclusao < CURRENT_DATE
-        ORDER BY data_estimada_conclusao ASC
-    """)
 
-    result = db.execute(sql_query)
-    pcas = result.fetchall()
+@router.post("/import-jobs", status_code=202)
+def create_pca_import_job(
+    file: UploadFile = File(...),
+    ano: int | None = Form(default=None),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(deps.get_user_with_write_access)
+) -> Any:
+    """Recebe a planilha (Excel ou CSV) e agenda a importação em segundo plano"""
+    source = _import_source(file.filename)
+    if source is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Arquivo deve ser Excel (.xlsx ou .xls) ou CSV (.csv)"
+        )
+    chosen_year = _validate_import_year(ano)
+
+    path = spool_upload(file.file, os.path.splitext(file.filename)[1])
+    try:
+        job = pca_import_jobs.create_import_job(db, source, file.filename, chosen_year, current_user.id)
+    except Exception:
+        os.unlink(path)
+        raise
+    pca_import_jobs.submit_import_job(job.id, path)
+    return pca_import_jobs.job_to_dict(job)
+
+
+@router.get("/import-jobs")
+def list_pca_import_jobs(
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(deps.get_current_active_user)
+) -> Any:
+    """Lista os jobs de importação mais recentes do usuário"""
+    limit = max(1, min(limit, 100))
+    pca_import_jobs.expire_stale_jobs(db)
+    jobs = (
+        db.query(PCAImportJob)
+        .filter(PCAImportJob.created_by == current_user.id)
+        .order_by(PCAImportJob.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [pca_import_jobs.job_to_dict(job) for job in jobs]
 
-    # Converter resultados para objetos PCA
-    pca_objects = []
-    for row in pcas:
-        pca = PCA()
-        for column, value in zip(result.keys(), row):
-            setattr(pca, column, value)
-        pca_objects.append(pca)
 
-    return pca_objects
+@router.get("/import-jobs/{job_id}")
+def get_pca_import_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(deps.get_current_active_user)
+) -> Any:
+    """Progresso e resultado de um job de importação do usuário"""
+    pca_import_jobs.expire_stale_jobs(db)
+    job = (
+        db.query(PCAImportJob)
+        .filter(PCAImportJob.id == job_id, PCAImportJob.created_by == current_user.id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return pca_import_jobs.job_to_dict(job)
 
 
+@router.post("/import-previews/{token}/apply")
+def apply_pca_import_preview(
+    token: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(deps.get_user_with_write_access)
+) -> Any:
+    """Aplica uma simulação (dry_run) sem reenviar nem reler o arquivo"""
+    job = (
+        db.query(PCAImportJob)
+        .filter(PCAImportJob.id == token, PCAImportJob.created_by == current_user.id)
+        .with_for_update()
+        .first()
+    )
+    if not job or job.status not in ("PREVIEW", "EXPIRADO"):
+        raise HTTPException(status_code=404, detail="Simulação não encontrada ou já aplicada")
+    if job.status == "EXPIRADO" or pca_import_jobs.preview_expired(job):
+        job.status = "EXPIRADO"
+        job.payload = None
+        db.commit()
+        raise HTTPException(status_code=410, detail="Simulação expirada; envie o arquivo novamente")
+
+    rows, errors = pca_import_jobs.load_preview_rows(job)
+    try:
+        # O commit da importação também libera o lock do job
+        job.status = "PROCESSANDO"
+        result = apply_import_rows(
+            db, job.source, job.filename, rows, errors, job.total_rows or 0, job.ano, current_user.id
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"ERRO AO APLICAR SIMULAÇÃO {token}: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Erro ao aplicar importação: {str(e)}")
+
+    job.status = "CONCLUIDO"
+    job.imported = result["imported"]
+    job.updated = result["updated"]
+    job.unchanged = result["unchanged"]
+    job.processed_rows = len(rows)
+    job.payload = None
+    job.message = "Importação concluída"
+    job.finished_at = func.now()
+    db.commit()
+    return _import_response(result, "Importação concluída")
 
 
 @router.get("/{pca_id}", response_model=PCASchema)
@@ -347,6 +393,9 @@ def update_pca(
         setattr(pca, field, value)
     # Track updater
     pca.updated_by = current_user.id
+    pca.content_hash = pca_content_hash(pca)
+    mark_dashboards_dirty(db, PCA_SUMMARIES)
+    invalidate_cache(db, ("pca",))
 
     db.commit()
     db.refresh(pca)
@@ -364,217 +413,98 @@ def delete_pca(
         raise HTTPException(status_code=404, detail="PCA not found")
 
     db.delete(pca)
+    mark_dashboards_dirty(db, PCA_SUMMARIES)
+    invalidate_cache(db, ("pca",))
     db.commit()
     return {"message": "PCA deleted successfully"}
 
 
+def _validate_import_year(ano: Optional[int]) -> Optional[int]:
+    if ano is None:
+        return None
+    if 2000 <= int(ano) <= 2100:
+        return int(ano)
+    raise HTTPException(status_code=400, detail="Ano informado inválido")
+
+
+def _import_source(filename: str) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(('.xlsx', '.xls')):
+        return "excel"
+    if name.endswith('.csv'):
+        return "csv"
+    return None
+
+
+def _import_response(result: dict, message: str) -> dict:
+    errors = result["errors"]
+    response = {
+        "success": True,
+        "message": message,
+        "imported": result["imported"],
+        "updated": result["updated"],
+        "unchanged": result["unchanged"],
+        "total": result["total"],
+        "errors": errors[:5] if errors else []  # Retornar apenas os 5 primeiros erros
+    }
+    if "encoding" in result:
+        response["encoding"] = result["encoding"]
+    return response
+
+
+def _preview_import(db: Session, source: str, path: str, filename: str, chosen_year: Optional[int], user_id) -> dict:
+    """dry_run: lê e compara com a tabela sem gravar; as linhas ficam guardadas sob um token"""
+    rows, errors, stats = load_import_rows(source, path)
+    diff = diff_import_rows(db, rows)
+    job = pca_import_jobs.create_preview_job(
+        db, source, filename, chosen_year, user_id, rows, errors, stats["total"], diff
+    )
+    response = {
+        "success": True,
+        "dry_run": True,
+        "message": "Simulação concluída; nada foi gravado",
+        "preview_token": str(job.id),
+        "expires_at": pca_import_jobs.preview_expires_at(job).isoformat(),
+        "imported": diff["imported"],
+        "updated": diff["updated"],
+        "unchanged": diff["unchanged"],
+        "total": stats["total"],
+        "errors": errors[:5] if errors else [],
+        "diff": {
+            "inserts": diff["inserts"],
+            "updates": diff["updates"],
+            "truncated": diff["truncated"],
+        },
+    }
+    if stats.get("encoding"):
+        response["encoding"] = stats["encoding"]
+    return response
+
+
 @router.post("/import")
-async def import_pca_excel(
+def import_pca_excel(
     file: UploadFile = File(...),
     ano: int | None = Form(default=None),
+    dry_run: bool = Form(default=False),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_user_with_write_access)
 ) -> Any:
-    """Importa dados do PCA a partir de arquivo Excel"""
+    """Importa dados do PCA a partir de arquivo Excel (ou apenas simula, com dry_run)"""
     print(f"INICIO IMPORT - Filename: {file.filename}, ContentType: {file.content_type}")
+    if _import_source(file.filename) != "excel":
+        print(f"ERRO VALIDACAO - Arquivo inválido: {file.filename}")
+        raise HTTPException(
+            status_code=400,
+            detail="Arquivo deve ser Excel (.xlsx ou .xls)"
+        )
+    chosen_year = _validate_import_year(ano)
+
+    path = spool_upload(file.file, os.path.splitext(file.filename)[1])
     try:
-        # Validar tipo de arquivo
-        print(f"VALIDANDO ARQUIVO - Filename: {file.filename}")
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            print(f"ERRO VALIDACAO - Arquivo inválido: {file.filename}")
-            raise HTTPException(
-                status_code=400,
-                detail="Arquivo deve ser Excel (.xlsx ou .xls)"
-            )
-        
-        # Ler o arquivo Excel
-        print(f"LENDO ARQUIVO EXCEL - Size: {len(contents) if 'contents' in locals() else 'unknown'}")
-        contents = await file.read()
-        print(f"ARQUIVO LIDO - Size: {len(contents)} bytes")
-        df = pd.read_excel(io.BytesIO(contents))
-        print(f"EXCEL PROCESSADO - Linhas: {len(df)}, Colunas: {len(df.columns)}")
-        
-        # Mapear colunas do Excel para o modelo (incluindo versões com encoding corrompido)
-        column_mapping = {
-            'Número da Contratação': 'numero_contratacao',
-            'Status da Contratação': 'status_contratacao',
-            'Situação da Execução': 'situacao_execucao',
-            'Título da Contratação': 'titulo_contratacao',
-            'Categoria da Contratação': 'categoria_contratacao',
-            'Valor Total': 'valor_total',
-            'Área Requisitante': 'area_requisitante',
-            'Número DFD': 'numero_dfd',
-            'Data Estimada de Início': 'data_estimada_inicio',
-            'Data Estimada de Conclusão': 'data_estimada_conclusao',
-            # Versões com encoding corrompido
-            'N�mero da Contrata��o': 'numero_contratacao',
-            'Status da Contrata��o': 'status_contratacao',
-            'Situa��o da Execu��o': 'situacao_execucao',
-            'T�tulo da Contrata��o': 'titulo_contratacao',
-            'Categoria da Contrata��o': 'categoria_contratacao',
-            '�rea Requisitante': 'area_requisitante',
-            'N�mero DFD': 'numero_dfd',
-            'Data Estimada de In�cio': 'data_estimada_inicio',
-            'Data Estimada de Conclus�o': 'data_estimada_conclusao',
-            # Mapeamentos alternativos caso as colunas tenham nomes diferentes
-            'numero_contratacao': 'numero_contratacao',
-            'status_contratacao': 'status_contratacao',
-            'situacao_execucao': 'situacao_execucao',
-            'titulo_contratacao': 'titulo_contratacao',
-            'categoria_contratacao': 'categoria_contratacao',
-            'valor_total': 'valor_total',
-            'area_requisitante': 'area_requisitante',
-            'numero_dfd': 'numero_dfd',
-            'data_estimada_inicio': 'data_estimada_inicio',
-            'data_estimada_conclusao': 'data_estimada_conclusao',
-        }
-        
-        # Renomear colunas se necessário
-        for old_name, new_name in column_mapping.items():
-            if old_name in df.columns:
-                df = df.rename(columns={old_name: new_name})
-        
-        # Estatísticas de importação
-        imported = 0
-        updated = 0
-        errors = []
-        chosen_year = None
-        if ano is not None:
-            if 2000 <= int(ano) <= 2100:
-                chosen_year = int(ano)
-            else:
-                raise HTTPException(status_code=400, detail="Ano informado inválido")
-        processed_numbers = set()  # Para evitar duplicatas no mesmo arquivo
-        
-        for index, row in df.iterrows():
-            try:
-                # Verificar se já existe
-                numero_contratacao = str(row.get('numero_contratacao', '')).strip()
-                if not numero_contratacao:
-                    errors.append(f"Linha {index + 2}: Número da contratação não informado")
-                    continue
-                
-                # Verificar duplicatas dentro do mesmo arquivo
-                if numero_contratacao in processed_numbers:
-                    errors.append(f"Linha {index + 2}: Número da contratação {numero_contratacao} duplicado no arquivo")
-                    continue
-                
-                processed_numbers.add(numero_contratacao)
-                
-                print(f"VERIFICANDO DUPLICATA - Numero: {numero_contratacao}")
-                existing_pca = db.query(PCA).filter(
-                    PCA.numero_contratacao == numero_contratacao
-                ).first()
-                print(f"RESULTADO DUPLICATA - Existe: {existing_pca is not None}")
-                
-                # Preparar dados
-                pca_data = {
-                    'numero_contratacao': numero_contratacao,
-                    'status_contratacao': str(row.get('status_contratacao', '')) if pd.notna(row.get('status_contratacao')) else None,
-                    'situacao_execucao': str(row.get('situacao_execucao', '')) if pd.notna(row.get('situacao_execucao')) else None,
-                    'titulo_contratacao': str(row.get('titulo_contratacao', '')) if pd.notna(row.get('titulo_contratacao')) else None,
-                    'categoria_contratacao': str(row.get('categoria_contratacao', '')) if pd.notna(row.get('categoria_contratacao')) else None,
-                    'area_requisitante': str(row.get('area_requisitante', '')) if pd.notna(row.get('area_requisitante')) else None,
-                    'numero_dfd': str(row.get('numero_dfd', '')) if pd.notna(row.get('numero_dfd')) else None,
-                }
-                
-                # Converter valor
-                if pd.notna(row.get('valor_total')):
-                    try:
-                        valor = str(row.get('valor_total')).replace('R$', '').replace(',', '.')
-                        pca_data['valor_total'] = float(valor.strip())
-                    except (ValueError, AttributeError):
-                        pca_data['valor_total'] = 0.0
-                else:
-                    pca_data['valor_total'] = 0.0
-                
-                # Converter datas
-                from datetime import datetime
-                for date_field in ['data_estimada_inicio', 'data_estimada_conclusao']:
-                    if pd.notna(row.get(date_field)):
-                        try:
-                            if isinstance(row.get(date_field), str):
-                                pca_data[date_field] = datetime.strptime(
-                                    row.get(date_field), '%d/%m/%Y'
-                                ).date()
-                            else:
-                                pca_data[date_field] = pd.to_datetime(
-                                    row.get(date_field)
-                                ).date()
-                        except (ValueError, TypeError):
-                            pca_data[date_field] = None
-                    else:
-                        pca_data[date_field] = None
-                
-                
-                if existing_pca:
-                    # Atualizar registro existente
-                    for key, value in pca_data.items():
-                        setattr(existing_pca, key, value)
-                    updated += 1
-                else:
-                    # Criar novo registro
-                    pca_data['created_by'] = current_user.id
-                    inferred = _extract_year_from_num(pca_data.get('numero_contratacao'))
-                    from datetime import date as _date
-                    pca_data['ano_pca'] = chosen_year or inferred or _date.today().year
-                    new_pca = PCA(**pca_data)
-                    db.add(new_pca)
-                    imported += 1
-                
-                # Flush intermediário para detectar problemas mais cedo
-                db.flush()
-                    
-            except Exception as e:
-                db.rollback()
-                error_msg = f"Linha {index + 2} (PCA {numero_contratacao}): {str(e)}"
-                errors.append(error_msg)
-                print(f"ERRO DE IMPORTACAO: {error_msg}")  # Debug mais visível
-                import traceback
-                print(f"TRACEBACK: {traceback.format_exc()}")  # Stack trace completo
-                continue
-        
-        # Commit das alterações
-        db.commit()
-        
-        result_payload = {
-            "success": True,
-            "message": f"Importação concluída",
-            "imported": imported,
-            "updated": updated,
-            "total": len(df),
-            "errors": errors[:5] if errors else []  # Retornar apenas os 5 primeiros erros
-        }
-
-        # Registrar evento agregado de importa��ǜo (best-effort)
-        try:
-            from app.models.activity_event import ActivityEvent  # lazy import
-            ev = ActivityEvent(
-                module="PCA",
-                action="import",
-                title=f"Importa��ǜo de PCA: {imported} novos, {updated} atualizados",
-                details={
-                    "imported": imported,
-                    "updated": updated,
-                    "total_rows": int(len(df)),
-                    "errors_count": int(len(errors) if errors else 0),
-                    "filename": file.filename,
-                    "source": "excel",
-                },
-                user_id=current_user.id,
-            )
-            db.add(ev)
-            db.commit()
-        except Exception:
-            # N�o bloquear fluxo se logging falhar
-            try:
-                import traceback
-                print("[IMPORT EXCEL EVENT LOGGING ERROR]", traceback.format_exc())
-            except Exception:
-                pass
-
-        return result_payload
-        
+        if dry_run:
+            return _preview_import(db, "excel", path, file.filename, chosen_year, current_user.id)
+        result = run_pca_import(db, "excel", path, file.filename, chosen_year, current_user.id)
+        return _import_response(result, "Importação concluída")
     except pd.errors.EmptyDataError:
         raise HTTPException(
             status_code=400,
@@ -589,209 +519,34 @@ async def import_pca_excel(
             status_code=400,
             detail=f"Erro ao processar arquivo: {str(e)}"
         )
-
+    finally:
+        os.unlink(path)
 
 
 @router.post("/import-csv")
-async def import_pca_csv(
+def import_pca_csv(
     file: UploadFile = File(...),
     ano: int | None = Form(default=None),
+    dry_run: bool = Form(default=False),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_user_with_write_access)
 ) -> Any:
-    """Importa dados do PCA a partir de arquivo CSV e converte automaticamente"""
+    """Importa dados do PCA a partir de arquivo CSV e converte automaticamente (ou apenas simula, com dry_run)"""
     print(f"INICIO IMPORT CSV - Filename: {file.filename}, ContentType: {file.content_type}")
-    try:
-        # Validar tipo de arquivo
-        print(f"VALIDANDO ARQUIVO CSV - Filename: {file.filename}")
-        if not file.filename.endswith('.csv'):
-            print(f"ERRO VALIDACAO CSV - Arquivo inválido: {file.filename}")
-            raise HTTPException(
-                status_code=400,
-                detail="Arquivo deve ser CSV (.csv)"
-            )
-
-        # Ler o arquivo CSV
-        print(f"LENDO ARQUIVO CSV")
-        contents = await file.read()
-        print(f"ARQUIVO CSV LIDO - Size: {len(contents)} bytes")
-
-        # Tentar diferentes encodings (melhorado com base no convert_pca.py)
-        df = None
-        encodings = ['windows-1252', 'utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(io.BytesIO(contents), sep=';', encoding=encoding)
-                print(f"CSV PROCESSADO COM ENCODING {encoding} - Linhas: {len(df)}, Colunas: {len(df.columns)}")
-                break
-            except Exception as e:
-                print(f"Erro com encoding {encoding}: {e}")
-                continue
-
-        if df is None:
-            raise HTTPException(
-                status_code=400,
-                detail="Erro ao processar arquivo CSV. Verifique o formato e encoding."
-            )
-
-        print("Colunas encontradas no CSV:")
-        for i, col in enumerate(df.columns):
-            print(f"{i+1}. {col}")
-
-        # Mapeamento das colunas do CSV para a tabela PCA (baseado no convert_pca.py)
-        column_mapping = {
-            0: 'numero_contratacao',      # Número da contratação
-            1: 'status_contratacao',      # Status da contratação
-            2: 'situacao_execucao',       # Situação da Execução
-            3: 'titulo_contratacao',      # Título da contratação
-            4: 'categoria_contratacao',   # Categoria da contratação
-            6: 'data_estimada_inicio',    # Data estimada para o início
-            7: 'data_estimada_conclusao', # Data estimada para a conclusão
-            9: 'area_requisitante',       # Área requisitante
-            10: 'numero_dfd',             # Nº DFD
-            24: 'valor_total'             # Valor Total (coluna 25, índice 24)
-        }
-
-        # Processar e limpar dados
-        clean_data = []
-        processed_numbers = set()
-
-        print("Processando registros do CSV...")
-
-        for index, row in df.iterrows():
-            try:
-                # Extrair dados usando o mapeamento de colunas
-                record = {}
-
-                for col_index, field_name in column_mapping.items():
-                    if col_index < len(df.columns):
-                        raw_value = row.iloc[col_index] if col_index < len(row) else None
-
-                        if field_name in ['data_estimada_inicio', 'data_estimada_conclusao']:
-                            record[field_name] = parse_csv_date(raw_value)
-                        elif field_name == 'valor_total':
-                            record[field_name] = parse_csv_currency(raw_value)
-                        else:
-                            cleaned_value = clean_text(raw_value)
-                            # Se for situacao_execucao e estiver vazio, colocar "Não iniciada"
-                            if field_name == 'situacao_execucao' and (cleaned_value is None or cleaned_value == ''):
-                                cleaned_value = 'Não iniciada'
-                            record[field_name] = cleaned_value
-
-                # Verificar se tem número de contratação
-                numero_contratacao = record.get('numero_contratacao')
-                if not numero_contratacao:
-                    print(f"Linha {index + 2}: Número da contratação não informado")
-                    continue
-
-                numero_contratacao = str(numero_contratacao).strip()
-
-                # Verificar duplicatas dentro do mesmo arquivo
-                if numero_contratacao in processed_numbers:
-                    print(f"Linha {index + 2}: Número da contratação {numero_contratacao} duplicado no arquivo")
-                    continue
-
-                processed_numbers.add(numero_contratacao)
-                clean_data.append(record)
-
-            except Exception as e:
-                print(f"Erro processando linha CSV {index + 2}: {e}")
-                continue
-
-        print(f"CSV processado: {len(clean_data)} registros válidos de {len(df)} total")
-
-        # Agora processar como se fosse importação Excel normal
-        imported = 0
-        updated = 0
-        errors = []
-        chosen_year = None
-        if ano is not None:
-            if 2000 <= int(ano) <= 2100:
-                chosen_year = int(ano)
-            else:
-                raise HTTPException(status_code=400, detail="Ano informado inválido")
-
-        for record in clean_data:
-            try:
-                numero_contratacao = record['numero_contratacao']
-
-                print(f"VERIFICANDO DUPLICATA CSV - Numero: {numero_contratacao}")
-                existing_pca = db.query(PCA).filter(
-                    PCA.numero_contratacao == numero_contratacao
-                ).first()
-                print(f"RESULTADO DUPLICATA CSV - Existe: {existing_pca is not None}")
-
-
-                if existing_pca:
-                    # Atualizar registro existente
-                    for key, value in record.items():
-                        setattr(existing_pca, key, value)
-                    existing_pca.updated_by = current_user.id
-                    updated += 1
-                else:
-                    # Criar novo registro
-                    record['created_by'] = current_user.id
-                    inferred = _extract_year_from_num(record.get('numero_contratacao'))
-                    from datetime import date as _date
-                    record['ano_pca'] = chosen_year or inferred or _date.today().year
-                    new_pca = PCA(**record)
-                    db.add(new_pca)
-                    imported += 1
-
-                # Flush intermediário
-                db.flush()
-
-            except Exception as e:
-                db.rollback()
-                error_msg = f"PCA {numero_contratacao}: {str(e)}"
-                errors.append(error_msg)
-                print(f"ERRO DE IMPORTACAO CSV: {error_msg}")
-                import traceback
-                print(f"TRACEBACK CSV: {traceback.format_exc()}")
-                continue
-
-        # Commit das alterações
-        db.commit()
-
-        result_payload = {
-            "success": True,
-            "message": f"Importação CSV concluída",
-            "imported": imported,
-            "updated": updated,
-            "total": len(clean_data),
-            "errors": errors[:5] if errors else []
-        }
-
-        # Registrar evento agregado de importa��ǜo (best-effort)
-        try:
-            from app.models.activity_event import ActivityEvent  # lazy import
-            ev = ActivityEvent(
-                module="PCA",
-                action="import",
-                title=f"Importa��ǜo de PCA (CSV): {imported} novos, {updated} atualizados",
-                details={
-                    "imported": imported,
-                    "updated": updated,
-                    "total_rows": int(len(clean_data)),
-                    "errors_count": int(len(errors) if errors else 0),
-                    "filename": file.filename,
-                    "source": "csv",
-                },
-                user_id=current_user.id,
-            )
-            db.add(ev)
-            db.commit()
-        except Exception:
-            # N�o bloquear fluxo se logging falhar
-            try:
-                import traceback
-                print("[IMPORT CSV EVENT LOGGING ERROR]", traceback.format_exc())
-            except Exception:
-                pass
-
-        return result_payload
+    if _import_source(file.filename) != "csv":
+        print(f"ERRO VALIDACAO CSV - Arquivo inválido: {file.filename}")
+        raise HTTPException(
+            status_code=400,
+            detail="Arquivo deve ser CSV (.csv)"
+        )
+    chosen_year = _validate_import_year(ano)
 
+    path = spool_upload(file.file, ".csv")
+    try:
+        if dry_run:
+            return _preview_import(db, "csv", path, file.filename, chosen_year, current_user.id)
+        result = run_pca_import(db, "csv", path, file.filename, chosen_year, current_user.id)
+        return _import_response(result, "Importação CSV concluída")
     except pd.errors.EmptyDataError:
         raise HTTPException(
             status_code=400,
@@ -806,6 +561,8 @@ async def import_pca_csv(
             status_code=400,
             detail=f"Erro ao processar arquivo CSV: {str(e)}"
         )
+    finally:
+        os.unlink(path)
 
 
 @router.get("/debug/situacoes")
@@ -817,44 +574,6 @@ def debug_situacoes_execucao(
     from datetime import date
     from sqlalchemy import func
 
-    # Optional year filter (early return path)
-    if ano is not None:
-        try:
-            year = int(ano)
-            if not (2000 <= year <= 2100):
-                raise ValueError()
-        except Exception:
-            raise HTTPException(status_code=400, detail="Parâmetro 'ano' inválido")
-
-        pcas_year = db.query(PCA).filter(PCA.ano_pca == year).all()
-
-        # Aggregate charts in Python
-        from collections import Counter, defaultdict
-        cnt_sit = Counter([(p.situacao_execucao or 'Nao iniciada') for p in pcas_year])
-        situacao_data = [{ 'name': k, 'value': v } for k, v in cnt_sit.items()]
-
-        cnt_cat = Counter([(p.categoria_contratacao or 'Nao informada') for p in pcas_year])
-        categoria_data = [{ 'name': k, 'value': v } for k, v in cnt_cat.items()]
-
-        cnt_status = Counter([(p.status_contratacao or 'Nao informado') for p in pcas_year])
-        status_data = [{ 'name': k, 'value': v } for k, v in cnt_status.items()]
-
-        sum_cat = defaultdict(float)
-        for p in pcas_year:
-            key = p.categoria_contratacao or 'Nao informada'
-            try:
-                sum_cat[key] += float(p.valor_total or 0)
-            except Exception:
-                pass
-        valor_categoria_data = [{ 'name': k, 'value': v } for k, v in sum_cat.items()]
-
-        return {
-            'situacao_execucao': situacao_data,
-            'categoria': categoria_data,
-            'status_contratacao': status_data,
-            'valor_por_categoria': valor_categoria_data,
-        }
-
     # Listar todos os valores únicos de situacao_execucao
     situacoes = db.query(PCA.situacao_execucao, func.count(PCA.id)).group_by(PCA.situacao_execucao).all()
     
@@ -879,13 +598,13 @@ def debug_situacoes_execucao(
 
 @router.get("/dashboard/stats")
 def get_dashboard_stats(
+    request: Request,
+    response: Response,
     ano: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    from sqlalchemy import text
-
-    # Filtro por ano (caminho otimizado em Python para evitar alterar SQL existente)
+    year = None
     if ano is not None:
         try:
             year = int(ano)
@@ -894,124 +613,31 @@ def get_dashboard_stats(
         except Exception:
             raise HTTPException(status_code=400, detail="Parâmetro 'ano' inválido")
 
-        pcas_year = db.query(PCA).filter(PCA.ano_pca == year).all()
-        total_pcas = len(pcas_year)
-        pcas_atrasadas = sum(1 for p in pcas_year if getattr(p, 'atrasada', False))
-        pcas_vencidas = sum(1 for p in pcas_year if getattr(p, 'vencida', False))
-        pcas_no_prazo = total_pcas - pcas_atrasadas - pcas_vencidas
-
-        return {
-            "total_pcas": total_pcas,
-            "pcas_atrasadas": pcas_atrasadas,
-            "pcas_vencidas": pcas_vencidas,
-            "pcas_no_prazo": pcas_no_prazo,
-        }
-
-    # Usar a consulta SQL direta conforme especificado
-    sql_query = text("""
-        SELECT
-            COUNT(*) as total,
-            COUNT(CASE
-                      WHEN situacao_execucao = 'Não iniciada'
-                           AND data_estimada_inicio < CURRENT_DATE
-                           AND data_estimada_conclusao >= CURRENT_DATE
-                      THEN 1
-                 END) as atrasadas,
-            COUNT(CASE
-                      WHEN situacao_execucao = 'Não iniciada'
-                           AND data_estimada_conclusao < CURRENT_DATE
-                      THEN 1
-                 END) as vencidas
-        FROM pca
-    """)
-
-    result = db.execute(sql_query).fetchone()
-
-    total_pcas = result.total
-    pcas_atrasadas = result.atrasadas
-    pcas_vencidas = result.vencidas
-    pcas_no_prazo = total_pcas - pcas_atrasadas - pcas_vencidas
-
-    print(f"SQL STATS: Total={total_pcas}, Atrasadas={pcas_atrasadas}, Vencidas={pcas_vencidas}, No prazo={pcas_no_prazo}")
-
-    return {
-        "total_pcas": total_pcas,
-        "pcas_atrasadas": pcas_atrasadas,
-        "pcas_vencidas": pcas_vencidas,
-        "pcas_no_prazo": pcas_no_prazo
-    }
-
+    filters = [PCA.ano_pca == year] if year is not None else []
+    not_modified = check_etag(request, response, table_version(db, PCA, *filters), date.today())
+    if not_modified:
+        return not_modified
 
+    # Resumo pré-calculado (recalculado após escritas/importações e na virada do dia),
+    # servido do cache do processo enquanto não houver escrita no PCA
+    return dashboard_cache.get_or_compute(
+        ("pca", "stats", year, date.today()), lambda: get_summary(db, "pca_stats", year)
+    )
 
 
 @router.get("/dashboard/charts")
 def get_dashboard_charts(
+    request: Request,
+    response: Response,
     ano: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    """Retorna dados para gráficos do dashboard de planejamento"""
-    from sqlalchemy import func
-    
-    # Gráfico por situação da execução
-    situacao_stats = db.query(
-        PCA.situacao_execucao,
-        func.count(PCA.id).label('quantidade')
-    ).group_by(PCA.situacao_execucao).all()
-    
-    situacao_data = [
-        {
-            "name": item.situacao_execucao or "Não iniciada",
-            "value": item.quantidade
-        }
-        for item in situacao_stats
-    ]
-    
-    # Gráfico por categoria
-    categoria_stats = db.query(
-        PCA.categoria_contratacao,
-        func.count(PCA.id).label('quantidade')
-    ).group_by(PCA.categoria_contratacao).all()
-    
-    categoria_data = [
-        {
-            "name": item.categoria_contratacao or "Não informada",
-            "value": item.quantidade
-        }
-        for item in categoria_stats
-    ]
-    
-    # Gráfico por status da contratação
-    status_stats = db.query(
-        PCA.status_contratacao,
-        func.count(PCA.id).label('quantidade')
-    ).group_by(PCA.status_contratacao).all()
-    
-    status_data = [
-        {
-            "name": item.status_contratacao or "Não informado",
-            "value": item.quantidade
-        }
-        for item in status_stats
-    ]
-    
-    # Gráfico de valores por categoria
-    valor_categoria_stats = db.query(
-        PCA.categoria_contratacao,
-        func.sum(PCA.valor_total).label('valor_total')
-    ).group_by(PCA.categoria_contratacao).all()
-    
-    valor_categoria_data = [
-        {
-            "name": item.categoria_contratacao or "Não informada",
-            "value": float(item.valor_total or 0)
-        }
-        for item in valor_categoria_stats
-    ]
-    
-    return {
-        "situacao_execucao": situacao_data,
-        "categoria": categoria_data,
-        "status_contratacao": status_data,
-        "valor_por_categoria": valor_categoria_data
-    }
+    """Retorna dados para gráficos do dashboard de planejamento (opcionalmente por ano do PCA)"""
+    if ano is not None and not (2000 <= ano <= 2100):
+        raise HTTPException(status_code=400, detail="Parâmetro 'ano' inválido")
+    filters = [PCA.ano_pca == ano] if ano is not None else []
+    not_modified = check_etag(request, response, table_version(db, PCA, *filters))
+    if not_modified:
+        return not_modified
+    return dashboard_cache.get_or_compute(("pca", "charts", ano), lambda: get_summary(db, "pca_charts", ano))
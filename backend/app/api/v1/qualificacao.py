@@ -1,7 +1,10 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.api.conditional import check_etag, table_version
+from app.api.pagination import paginate
+from app.core.cache import invalidate_cache
 from app.core.database import get_db
 from app.models.usuario import Usuario
 from app.models.qualificacao import Qualificacao, StatusQualificacao
@@ -13,23 +16,35 @@ router = APIRouter()
 
 @router.get("/", response_model=List[QualificacaoSchema])
 def read_qualificacoes(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    qualificacoes = db.query(Qualificacao).offset(skip).limit(limit).all()
-    return qualificacoes
+    not_modified = check_etag(request, response, table_version(db, Qualificacao))
+    if not_modified:
+        return not_modified
+    return paginate(db.query(Qualificacao), response, skip, limit, cursor)
 
 
 @router.get("/concluidas", response_model=List[QualificacaoSchema])
 def read_qualificacoes_concluidas(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 1000,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
     """Retorna apenas as qualificações com status 'Concluído' para seleção em licitações"""
+    not_modified = check_etag(
+        request, response, table_version(db, Qualificacao, Qualificacao.status == StatusQualificacao.CONCLUIDO)
+    )
+    if not_modified:
+        return not_modified
     qualificacoes = db.query(Qualificacao).filter(
         Qualificacao.status == StatusQualificacao.CONCLUIDO
     ).offset(skip).limit(limit).all()
@@ -57,6 +72,7 @@ def create_qualificacao(
         created_by=current_user.id
     )
     db.add(qualificacao)
+    invalidate_cache(db, ("qualificacao",))
     db.commit()
     db.refresh(qualificacao)
     return qualificacao
@@ -90,6 +106,7 @@ def update_qualificacao(
         setattr(qualificacao, field, value)
     # Track updater
     qualificacao.updated_by = current_user.id
+    invalidate_cache(db, ("qualificacao",))
 
     db.commit()
     db.refresh(qualificacao)
@@ -107,6 +124,7 @@ def delete_qualificacao(
         raise HTTPException(status_code=404, detail="Qualificacao not found")
     
     db.delete(qualificacao)
+    invalidate_cache(db, ("qualificacao",))
     db.commit()
     return {"message": "Qualificacao deleted successfully"}
 
@@ -1,14 +1,37 @@
 from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, Response, HTTPException
+from fastapi import APIRouter, Depends, Path, Response, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.api import deps
+from app.core.cache import dashboard_cache
 from app.core.database import get_db
 from app.models.usuario import Usuario
 from app.models.pca import PCA
 from app.models.qualificacao import Qualificacao
 from app.models.licitacao import Licitacao
+from app.services import report_jobs
+from app.services.chart_render_service import render_charts
+from app.services.custom_report_service import (
+    REPORT_MODELS,
+    custom_report_chart_data,
+    custom_report_criteria,
+    fetch_report_rows,
+)
+from app.services.report_export_service import (
+    CSV_MEDIA_TYPE,
+    EXPORT_SPECS,
+    PARQUET_MEDIA_TYPE,
+    XLSX_MEDIA_TYPE,
+    build_xlsx,
+    export_filename,
+    export_records,
+    iter_file_chunks,
+    parquet_available,
+    stream_csv,
+    stream_parquet,
+)
 import pandas as pd
 import io
 from datetime import datetime, date
@@ -18,15 +41,15 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.colors import HexColor
-import matplotlib.pyplot as plt
-import seaborn as sns
 import base64
 from reportlab.platypus import Image
-import tempfile
 import os
 
 router = APIRouter()
 
+# Id de job de relatório: sha256 em hexadecimal
+REPORT_JOB_ID_PATTERN = r"^[0-9a-f]{64}$"
+
 # Mapeamento de campos para labels legíveis
 FIELD_LABELS = {
     'numero_contratacao': 'Número da Contratação',
@@ -102,53 +125,50 @@ class CustomReportRequest(BaseModel):
     filters: ReportFilters
 
 
+def _stream_report(kind: str, format: str) -> StreamingResponse:
+    """CSV/Parquet enviados à medida que as linhas saem do cursor (sem Content-Length)"""
+    spec = EXPORT_SPECS[kind]
+    if format == "parquet":
+        if not parquet_available():
+            raise HTTPException(status_code=501, detail="Exportação em Parquet indisponível: pyarrow não instalado")
+        body, media_type, extension = stream_parquet(spec), PARQUET_MEDIA_TYPE, "parquet"
+    else:
+        body, media_type, extension = stream_csv(spec), CSV_MEDIA_TYPE, "csv"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={export_filename(spec, extension)}"}
+    )
+
+
+def _export_report(db: Session, kind: str, format: str) -> Any:
+    spec = EXPORT_SPECS[kind]
+    if format.lower() in ("csv", "parquet"):
+        return _stream_report(kind, format.lower())
+    if format.lower() != "excel":
+        return {"data": export_records(db, spec)}
+
+    # Planilha montada em arquivo temporário e enviada em blocos
+    output = build_xlsx(db, spec)
+    size = output.seek(0, os.SEEK_END)
+    output.seek(0)
+    return StreamingResponse(
+        iter_file_chunks(output),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename={export_filename(spec, 'xlsx')}",
+            "Content-Length": str(size),
+        }
+    )
+
+
 @router.get("/pca")
 def export_pca_report(
     format: str = "excel",
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    pcas = db.query(PCA).all()
-    
-    data = []
-    for pca in pcas:
-        data.append({
-            "Número Contratação": pca.numero_contratacao,
-            "Status": pca.status_contratacao,
-            "Situação Execução": pca.situacao_execucao,
-            "Título": pca.titulo_contratacao,
-            "Categoria": pca.categoria_contratacao,
-            "Valor Total": float(pca.valor_total) if pca.valor_total else 0,
-            "Área Requisitante": pca.area_requisitante,
-            "Número DFD": pca.numero_dfd,
-            "Data Início": pca.data_estimada_inicio.strftime('%d/%m/%Y') if pca.data_estimada_inicio else None,
-            "Data Conclusão": pca.data_estimada_conclusao.strftime('%d/%m/%Y') if pca.data_estimada_conclusao else None,
-            "Atrasada": "Sim" if pca.atrasada else "Não",
-            "Criado em": pca.created_at.replace(tzinfo=None) if pca.created_at else None
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Convert any remaining datetime objects to timezone-naive
-    for col in df.columns:
-        if df[col].dtype.kind in ['M', 'O']:  # datetime or object columns
-            df[col] = df[col].apply(lambda x: x.replace(tzinfo=None) if hasattr(x, 'replace') and hasattr(x, 'tzinfo') and x.tzinfo is not None else x)
-    
-    if format.lower() == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='PCA Report', index=False)
-        output.seek(0)
-        
-        return Response(
-            content=output.getvalue(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=pca_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            }
-        )
-    
-    return {"data": data}
+    return _export_report(db, "pca", format)
 
 
 @router.get("/qualificacao")
@@ -157,46 +177,7 @@ def export_qualificacao_report(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    qualificacoes = db.query(Qualificacao).all()
-    
-    data = []
-    for qual in qualificacoes:
-        data.append({
-            "NUP": qual.nup,
-            "Número Contratação": qual.numero_contratacao,
-            "Área Demandante": qual.area_demandante,
-            "Responsável Instrução": qual.responsavel_instrucao,
-            "Modalidade": qual.modalidade,
-            "Objeto": qual.objeto,
-            "Palavra Chave": qual.palavra_chave,
-            "Valor Estimado": float(qual.valor_estimado) if qual.valor_estimado else 0,
-            "Status": qual.status,
-            "Observações": qual.observacoes,
-            "Criado em": qual.created_at.replace(tzinfo=None) if qual.created_at else None
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Convert any remaining datetime objects to timezone-naive
-    for col in df.columns:
-        if df[col].dtype.kind in ['M', 'O']:  # datetime or object columns
-            df[col] = df[col].apply(lambda x: x.replace(tzinfo=None) if hasattr(x, 'replace') and hasattr(x, 'tzinfo') and x.tzinfo is not None else x)
-    
-    if format.lower() == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Qualificação Report', index=False)
-        output.seek(0)
-        
-        return Response(
-            content=output.getvalue(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=qualificacao_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            }
-        )
-    
-    return {"data": data}
+    return _export_report(db, "qualificacao", format)
 
 
 @router.get("/licitacao")
@@ -205,51 +186,7 @@ def export_licitacao_report(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
-    licitacoes = db.query(Licitacao).all()
-    
-    data = []
-    for lic in licitacoes:
-        data.append({
-            "NUP": lic.nup,
-            "Número Contratação": lic.numero_contratacao,
-            "Área Demandante": lic.area_demandante,
-            "Responsável Instrução": lic.responsavel_instrucao,
-            "Modalidade": lic.modalidade,
-            "Objeto": lic.objeto,
-            "Palavra Chave": lic.palavra_chave,
-            "Valor Estimado": float(lic.valor_estimado) if lic.valor_estimado else 0,
-            "Pregoeiro": lic.pregoeiro,
-            "Valor Homologado": float(lic.valor_homologado) if lic.valor_homologado else 0,
-            "Data Homologação": lic.data_homologacao.strftime('%d/%m/%Y') if lic.data_homologacao else None,
-            "Link": lic.link,
-            "Status": lic.status,
-            "Economia": float(lic.economia) if lic.economia else 0,
-            "Observações": lic.observacoes,
-            "Criado em": lic.created_at.replace(tzinfo=None) if lic.created_at else None
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Convert any remaining datetime objects to timezone-naive
-    for col in df.columns:
-        if df[col].dtype.kind in ['M', 'O']:  # datetime or object columns
-            df[col] = df[col].apply(lambda x: x.replace(tzinfo=None) if hasattr(x, 'replace') and hasattr(x, 'tzinfo') and x.tzinfo is not None else x)
-    
-    if format.lower() == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Licitação Report', index=False)
-        output.seek(0)
-        
-        return Response(
-            content=output.getvalue(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename=licitacao_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            }
-        )
-    
-    return {"data": data}
+    return _export_report(db, "licitacao", format)
 
 
 @router.get("/economia")
@@ -258,6 +195,9 @@ def export_economia_report(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
+    if format.lower() in ("csv", "parquet"):
+        return _stream_report("economia", format.lower())
+
     licitacoes = db.query(Licitacao).filter(
         Licitacao.economia.isnot(None),
         Licitacao.economia > 0
@@ -354,11 +294,92 @@ def get_areas_demandantes(
     if area_field is None:
         return {"areas": []}
 
-    # Buscar áreas únicas
-    areas = db.query(area_field).distinct().filter(area_field.isnot(None)).all()
-    areas_list = [area[0] for area in areas if area[0]]
+    def compute():
+        # Buscar áreas únicas
+        areas = db.query(area_field).distinct().filter(area_field.isnot(None)).all()
+        areas_list = [area[0] for area in areas if area[0]]
+        return {"areas": sorted(areas_list)}
+
+    return dashboard_cache.get_or_compute((data_source, "areas"), compute)
+
+
+def render_custom_report(db: Session, config: CustomReportRequest) -> bytes:
+    """Consulta, gráficos e PDF do relatório customizado"""
+    model = REPORT_MODELS.get(config.dataSource)
+    if model is None:
+        raise HTTPException(status_code=400, detail="Fonte de dados inválida")
+
+    criteria = custom_report_criteria(model, config.filters)
+
+    # Detalhe: só as colunas selecionadas
+    records = fetch_report_rows(db, model, criteria, config.selectedFields)
+
+    if not records:
+        raise HTTPException(status_code=404, detail="Nenhum registro encontrado com os filtros aplicados")
+
+    # Preparar dados para DataFrame
+    data = []
+    for record in records:
+        row_data = {}
+        for field in config.selectedFields:
+            if field in record:
+                value = record[field]
+                # Tratar datas (datetime/date) com segurança
+                if hasattr(value, 'strftime'):
+                    tz = getattr(value, 'tzinfo', None)
+                    if tz:
+                        try:
+                            value = value.replace(tzinfo=None)
+                        except Exception:
+                            pass
+                    row_data[field] = value.strftime('%d/%m/%Y') if ('data' in field.lower() or isinstance(value, (datetime, date))) else value
+                # Tratar valores monetários
+                elif field in ['valor_total', 'valor_estimado', 'valor_homologado', 'economia'] and value:
+                    row_data[field] = float(value)
+                # Tratar campo atrasada (boolean para texto)
+                elif field == 'atrasada':
+                    row_data[field] = "Sim" if value else "Não"
+                else:
+                    row_data[field] = value
+            else:
+                row_data[field] = None
+        data.append(row_data)
+
+    # Criar DataFrame
+    df = pd.DataFrame(data)
+
+    # Gerar dados para gráficos (agregados no banco)
+    chart_data_list = []
+    if config.charts:
+        for chart_type in config.charts:
+            try:
+                chart_data = custom_report_chart_data(db, model, criteria, config.selectedFields, chart_type)
+                if chart_data:
+                    chart_data_list.append({
+                        'type': chart_type,
+                        'data': chart_data,
+                        'title': get_chart_title(chart_type)
+                    })
+            except Exception as e:
+                print(f"Erro ao gerar gráfico {chart_type}: {str(e)}")
+                continue
+
+    # Gerar PDF
+    pdf_content = generate_pdf_report(
+        df=df,
+        config=config,
+        chart_data_list=chart_data_list,
+        data_source_label=get_data_source_label(config.dataSource)
+    )
+    return pdf_content
+
+
+def _custom_report_filename(config: CustomReportRequest) -> str:
+    return f"relatorio_customizado_{config.dataSource}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-    return {"areas": sorted(areas_list)}
+
+def _pdf_file_response(path: str, filename: str) -> FileResponse:
+    return FileResponse(path, media_type="application/pdf", filename=filename)
 
 
 @router.post("/custom")
@@ -367,124 +388,25 @@ def generate_custom_report(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(deps.get_current_active_user)
 ) -> Any:
+    """Geração síncrona (compatibilidade); pedidos repetidos saem do armazenamento de relatórios"""
     try:
-        # Mapear fontes de dados para modelos
-        model_map = {
-            'pca': PCA,
-            'qualificacao': Qualificacao,
-            'licitacao': Licitacao
-        }
-        
-        if config.dataSource not in model_map:
-            raise HTTPException(status_code=400, detail="Fonte de dados inválida")
-        
-        model = model_map[config.dataSource]
-        query = db.query(model)
-        
-        # Aplicar filtros
-        if config.filters.dateStart:
-            date_start = datetime.strptime(config.filters.dateStart, '%Y-%m-%d')
-            if hasattr(model, 'created_at'):
-                query = query.filter(model.created_at >= date_start)
-            elif hasattr(model, 'data_estimada_inicio'):
-                query = query.filter(model.data_estimada_inicio >= date_start)
-        
-        if config.filters.dateEnd:
-            date_end = datetime.strptime(config.filters.dateEnd, '%Y-%m-%d')
-            if hasattr(model, 'created_at'):
-                query = query.filter(model.created_at <= date_end)
-            elif hasattr(model, 'data_estimada_conclusao'):
-                query = query.filter(model.data_estimada_conclusao <= date_end)
-        
-        if config.filters.minValue and hasattr(model, 'valor_total'):
-            query = query.filter(model.valor_total >= config.filters.minValue)
-        elif config.filters.minValue and hasattr(model, 'valor_estimado'):
-            query = query.filter(model.valor_estimado >= config.filters.minValue)
-        
-        if config.filters.maxValue and hasattr(model, 'valor_total'):
-            query = query.filter(model.valor_total <= config.filters.maxValue)
-        elif config.filters.maxValue and hasattr(model, 'valor_estimado'):
-            query = query.filter(model.valor_estimado <= config.filters.maxValue)
-        
-        if config.filters.status:
-            if hasattr(model, 'status'):
-                query = query.filter(model.status.in_(config.filters.status))
-            elif hasattr(model, 'status_contratacao'):
-                query = query.filter(model.status_contratacao.in_(config.filters.status))
-
-        # Filtro por área demandante
-        if config.filters.areasDemandantes:
-            if hasattr(model, 'area_requisitante'):
-                query = query.filter(model.area_requisitante.in_(config.filters.areasDemandantes))
-            elif hasattr(model, 'area_demandante'):
-                query = query.filter(model.area_demandante.in_(config.filters.areasDemandantes))
-        
-        # Executar query
-        records = query.all()
-        
-        if not records:
-            raise HTTPException(status_code=404, detail="Nenhum registro encontrado com os filtros aplicados")
-        
-        # Preparar dados para DataFrame
-        data = []
-        for record in records:
-            row_data = {}
-            for field in config.selectedFields:
-                if hasattr(record, field):
-                    value = getattr(record, field)
-                    # Tratar datas (datetime/date) com segurança
-                    if hasattr(value, 'strftime'):
-                        tz = getattr(value, 'tzinfo', None)
-                        if tz:
-                            try:
-                                value = value.replace(tzinfo=None)
-                            except Exception:
-                                pass
-                        row_data[field] = value.strftime('%d/%m/%Y') if ('data' in field.lower() or isinstance(value, (datetime, date))) else value
-                    # Tratar valores monetários
-                    elif field in ['valor_total', 'valor_estimado', 'valor_homologado', 'economia'] and value:
-                        row_data[field] = float(value)
-                    # Tratar campo atrasada (boolean para texto)
-                    elif field == 'atrasada':
-                        row_data[field] = "Sim" if value else "Não"
-                    else:
-                        row_data[field] = value
-                else:
-                    row_data[field] = None
-            data.append(row_data)
-        
-        # Criar DataFrame
-        df = pd.DataFrame(data)
-        
-        # Gerar dados para gráficos
-        chart_data_list = []
-        if config.charts:
-            for chart_type in config.charts:
-                try:
-                    chart_data = generate_chart_data(df, chart_type, config.dataSource)
-                    if chart_data:
-                        chart_data_list.append({
-                            'type': chart_type,
-                            'data': chart_data,
-                            'title': get_chart_title(chart_type)
-                        })
-                except Exception as e:
-                    print(f"Erro ao gerar gráfico {chart_type}: {str(e)}")
-                    continue
-        
-        # Gerar PDF
-        pdf_content = generate_pdf_report(
-            df=df,
-            config=config,
-            chart_data_list=chart_data_list,
-            data_source_label=get_data_source_label(config.dataSource)
-        )
+        key = report_jobs.report_key(config.model_dump())
+        filename = _custom_report_filename(config)
+        path = report_jobs.report_file(key)
+        if path:
+            return _pdf_file_response(path, filename)
+
+        pdf_content = render_custom_report(db, config)
+        try:
+            report_jobs.store_report(key, filename, pdf_content)
+        except OSError as e:
+            print(f"Erro ao guardar relatório customizado: {str(e)}")
 
         return Response(
             content=pdf_content,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=relatorio_customizado_{config.dataSource}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+                "Content-Disposition": f"attachment; filename={filename}"
             }
         )
         
@@ -495,74 +417,50 @@ def generate_custom_report(
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 
-def generate_chart_data(df: pd.DataFrame, chart_type: str, data_source: str) -> Optional[Dict]:
-    """Gera dados para diferentes tipos de gráficos"""
-    try:
-        if chart_type == "status_distribution":
-            status_col = 'status' if 'status' in df.columns else 'status_contratacao'
-            if status_col in df.columns:
-                status_counts = df[status_col].value_counts()
-                return {
-                    'Status': status_counts.index.tolist(),
-                    'Quantidade': status_counts.values.tolist()
-                }
-        
-        elif chart_type == "value_timeline":
-            value_col = next((col for col in ['valor_total', 'valor_estimado', 'valor_homologado'] if col in df.columns), None)
-            date_col = next((col for col in df.columns if 'data' in col.lower()), None)
-            
-            if value_col and date_col:
-                # Agrupar por mês
-                df_copy = df.copy()
-                df_copy[date_col] = pd.to_datetime(df_copy[date_col], errors='coerce')
-                monthly_data = df_copy.groupby(df_copy[date_col].dt.to_period('M'))[value_col].sum()
-                
-                return {
-                    'Mes': [str(period) for period in monthly_data.index],
-                    'Valor': monthly_data.values.tolist()
-                }
-        
-        elif chart_type == "category_comparison":
-            category_col = next((col for col in ['categoria_contratacao', 'modalidade'] if col in df.columns), None)
-            value_col = next((col for col in ['valor_total', 'valor_estimado'] if col in df.columns), None)
-            
-            if category_col and value_col:
-                category_data = df.groupby(category_col)[value_col].sum()
-                return {
-                    'Categoria': category_data.index.tolist(),
-                    'Valor': category_data.values.tolist()
-                }
-        
-        elif chart_type == "summary_table":
-            numeric_columns = df.select_dtypes(include=['number']).columns
-            if len(numeric_columns) > 0:
-                # Retornar dados para gráfico de barras com estatísticas
-                col = numeric_columns[0]  # Usar a primeira coluna numérica
-                return {
-                    'Estatistica': ['Total', 'Média', 'Máximo', 'Mínimo'],
-                    'Valor': [
-                        float(df[col].sum()) if not pd.isna(df[col].sum()) else 0,
-                        float(df[col].mean()) if not pd.isna(df[col].mean()) else 0,
-                        float(df[col].max()) if not pd.isna(df[col].max()) else 0,
-                        float(df[col].min()) if not pd.isna(df[col].min()) else 0
-                    ]
-                }
-            else:
-                # Se não há colunas numéricas, mostrar contagem por status
-                status_col = 'status' if 'status' in df.columns else 'status_contratacao'
-                if status_col in df.columns:
-                    status_counts = df[status_col].value_counts()
-                    return {
-                        'Estatistica': status_counts.index.tolist()[:4],
-                        'Valor': status_counts.values.tolist()[:4]
-                    }
-                return None
-        
-        return None
-        
-    except Exception as e:
-        print(f"Erro ao gerar dados do gráfico {chart_type}: {str(e)}")
-        return None
+@router.post("/custom/jobs", status_code=202)
+def create_custom_report_job(
+    config: CustomReportRequest,
+    current_user: Usuario = Depends(deps.get_current_active_user)
+) -> Any:
+    """Agenda o PDF em segundo plano; um pedido idêntico ainda válido devolve o mesmo job"""
+    if config.dataSource not in REPORT_MODELS:
+        raise HTTPException(status_code=400, detail="Fonte de dados inválida")
+
+    key = report_jobs.report_key(config.model_dump())
+    meta = report_jobs.submit_report_job(
+        key,
+        _custom_report_filename(config),
+        lambda db: render_custom_report(db, config),
+    )
+    return report_jobs.report_job_to_dict(meta)
+
+
+@router.get("/custom/jobs/{job_id}")
+def get_custom_report_job(
+    job_id: str = Path(..., pattern=REPORT_JOB_ID_PATTERN),
+    current_user: Usuario = Depends(deps.get_current_active_user)
+) -> Any:
+    """Estado de um job de relatório"""
+    meta = report_jobs.get_report_job(job_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Job de relatório não encontrado ou expirado")
+    return report_jobs.report_job_to_dict(meta)
+
+
+@router.get("/custom/jobs/{job_id}/download")
+def download_custom_report(
+    job_id: str = Path(..., pattern=REPORT_JOB_ID_PATTERN),
+    current_user: Usuario = Depends(deps.get_current_active_user)
+) -> Any:
+    meta = report_jobs.get_report_job(job_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Job de relatório não encontrado ou expirado")
+    path = report_jobs.report_file(job_id)
+    if path is None:
+        if meta.get("status") == report_jobs.STATUS_ERROR:
+            raise HTTPException(status_code=409, detail=meta.get("message") or "Falha ao gerar relatório")
+        raise HTTPException(status_code=409, detail="Relatório ainda em processamento")
+    return _pdf_file_response(path, meta["filename"])
 
 
 def get_chart_title(chart_type: str) -> str:
@@ -684,78 +582,15 @@ def generate_pdf_report(df: pd.DataFrame, config: CustomReportRequest, chart_dat
     elements.append(stats_table)
     elements.append(Spacer(1, 20))
 
-    # Gerar gráficos
-    chart_images = []
+    # Gerar gráficos (PNG em memória, com cache)
     if chart_data_list:
         elements.append(Paragraph("ANÁLISE GRÁFICA:", heading_style))
 
-        for chart_info in chart_data_list:
-            chart_type = chart_info['type']
-            chart_data = chart_info['data']
-            chart_title = chart_info['title']
-
-            # Criar gráfico com matplotlib
-            plt.figure(figsize=(8, 6))
-            sns.set_style("whitegrid")
-
-            if chart_type == 'status_distribution':
-                labels = chart_data.get('Status', [])
-                values = chart_data.get('Quantidade', [])
-                if labels and values:
-                    plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
-                    plt.title(chart_title, fontsize=14, fontweight='bold')
-
-            elif chart_type == 'value_timeline':
-                months = chart_data.get('Mes', [])
-                values = chart_data.get('Valor', [])
-                if months and values:
-                    plt.plot(months, values, marker='o', linewidth=2, markersize=6)
-                    plt.title(chart_title, fontsize=14, fontweight='bold')
-                    plt.xlabel('Mês')
-                    plt.ylabel('Valor (R$)')
-                    plt.xticks(rotation=45)
-                    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
-
-            elif chart_type == 'category_comparison':
-                categories = chart_data.get('Categoria', [])
-                values = chart_data.get('Valor', [])
-                if categories and values:
-                    plt.bar(categories, values, color='#16a34a', alpha=0.8)
-                    plt.title(chart_title, fontsize=14, fontweight='bold')
-                    plt.xlabel('Categoria')
-                    plt.ylabel('Valor (R$)')
-                    plt.xticks(rotation=45, ha='right')
-                    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
-
-            elif chart_type == 'summary_table':
-                stats = chart_data.get('Estatistica', [])
-                values = chart_data.get('Valor', [])
-                if stats and values:
-                    colors = ['#2563eb', '#dc2626', '#16a34a', '#ca8a04']
-                    plt.bar(stats, values, color=colors[:len(stats)], alpha=0.8)
-                    plt.title(chart_title, fontsize=14, fontweight='bold')
-                    plt.xlabel('Estatística')
-                    plt.ylabel('Valor (R$)')
-                    plt.xticks(rotation=45, ha='right')
-                    plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
-
-            plt.tight_layout()
-
-            # Salvar gráfico em arquivo temporário
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                plt.savefig(tmp_file.name, dpi=150, bbox_inches='tight')
-                chart_images.append(tmp_file.name)
-
-            plt.close()
-
-        # Adicionar gráficos ao PDF
-        for img_path in chart_images:
-            try:
-                img = Image(img_path, width=6*inch, height=4*inch)
-                elements.append(img)
-                elements.append(Spacer(1, 15))
-            except:
-                pass  # Se houver erro na imagem, pula
+        for png in render_charts(chart_data_list):
+            if png is None:
+                continue  # Se houver erro na imagem, pula
+            elements.append(Image(io.BytesIO(png), width=6*inch, height=4*inch))
+            elements.append(Spacer(1, 15))
 
     # Quebra de página antes da tabela
     elements.append(PageBreak())
@@ -839,13 +674,6 @@ def generate_pdf_report(df: pd.DataFrame, config: CustomReportRequest, chart_dat
     # Construir PDF
     doc.build(elements)
 
-    # Limpar arquivos temporários de gráficos
-    for img_path in chart_images:
-        try:
-            os.unlink(img_path)
-        except:
-            pass
-
     # Retornar bytes do PDF
     buffer.seek(0)
     return buffer.getvalue()
@@ -0,0 +1,40 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.database import get_db
+from app.models.usuario import Usuario
+from app.services.search_service import SEARCH_SOURCES, search
+
+router = APIRouter()
+
+MAX_LIMIT = 100
+
+
+@router.get("/")
+def search_contratacoes(
+    q: str = Query(..., min_length=2, max_length=200, description="termos; aceita \"frase\", OR e -exclusão"),
+    tipo: Optional[List[str]] = Query(None, description="pca, qualificacao e/ou licitacao (repetível)"),
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(deps.get_current_active_user)
+) -> Any:
+    """Busca textual (sem acentos, com ranking e destaque) em PCA, qualificações e licitações"""
+    termo = q.strip()
+    if len(termo) < 2:
+        raise HTTPException(status_code=400, detail="Informe ao menos 2 caracteres")
+    invalid = sorted(set(tipo or []) - set(SEARCH_SOURCES))
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Tipo inválido: {', '.join(invalid)}")
+    if skip < 0 or not (1 <= limit <= MAX_LIMIT):
+        raise HTTPException(status_code=400, detail=f"Use skip >= 0 e limit entre 1 e {MAX_LIMIT}")
+
+    results, has_more = search(db, termo, tipo, skip, limit)
+    return {
+        "query": termo,
+        "results": results,
+        "skip": skip,
+        "limit": limit,
+        "has_more": has_more,
+    }
@@ -0,0 +1,237 @@
+"""
+Cache em memória (por processo) para endpoints de leitura agregada.
+
+Cada worker do gunicorn tem o seu próprio ``TTLCache``. As escritas chamam
+``invalidate_cache`` dentro da transação: o próprio processo descarta as
+entradas na hora e um ``pg_notify`` avisa os demais workers quando a
+transação é confirmada. Cada worker escuta o canal numa thread própria
+(``start_invalidation_listener``). Se o listener cair, o TTL limita quanto
+tempo um valor antigo pode ser servido.
+
+As chaves são tuplas cujo primeiro elemento é o namespace (``"pca"``,
+``"qualificacao"``, ``"licitacao"``), que é a unidade de invalidação. Cada
+invalidação incrementa a geração do namespace; um valor calculado antes dela
+não é guardado, mesmo que o cálculo termine depois.
+"""
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Intervalo máximo de espera por notificações antes de checar o pedido de parada
+LISTEN_POLL_SECONDS = 5.0
+# Espera antes de reconectar o listener após uma falha
+LISTEN_RETRY_SECONDS = 5.0
+
+
+class TTLCache:
+    """LRU limitado por tamanho, com expiração por entrada e contadores"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Geração por namespace e geral (``clear``)
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.discarded = 0
+
+    def generation(self, key: Tuple[Hashable, ...]) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._generations.get(key[0], 0)
+
+    def get(self, key: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, generation: Optional[Tuple[int, int]] = None) -> None:
+        """Guarda o valor; com ``generation``, só se o namespace não foi invalidado desde então"""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key[0], 0)):
+                self.discarded += 1
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Tuple[Hashable, ...], compute: Callable[[], Any]) -> Any:
+        """Devolve o valor em cache ou calcula (fora do lock) e guarda"""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return compute()
+        hit, value = self.get(key)
+        if hit:
+            return value
+        generation = self.generation(key)
+        value = compute()
+        self.set(key, value, generation)
+        return value
+
+    def invalidate(self, namespaces: Iterable[str]) -> int:
+        namespaces = set(namespaces)
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            stale = [key for key in self._data if key[0] in namespaces]
+            for key in stale:
+                del self._data[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "discarded": self.discarded,
+            }
+
+
+dashboard_cache = TTLCache(settings.cache_max_entries, settings.cache_ttl_seconds)
+
+
+def invalidate_cache(db: Session, namespaces: Iterable[str]) -> None:
+    """
+    Descarta as entradas dos namespaces neste processo e agenda o aviso aos
+    demais workers. Não faz commit: o NOTIFY só é entregue quando a transação
+    da escrita for confirmada (e é descartado se ela for desfeita).
+    """
+    namespaces = sorted(set(namespaces))
+    dashboard_cache.invalidate(namespaces)
+    try:
+        # SAVEPOINT: uma falha aqui não pode derrubar a escrita em andamento
+        with db.begin_nested():
+            db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": INVALIDATION_CHANNEL, "payload": ",".join(namespaces)},
+            )
+    except SQLAlchemyError as e:
+        print(f"[CACHE] falha ao notificar invalidação {namespaces}: {e}")
+
+
+class _InvalidationListener:
+    def __init__(self):
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.connected = False
+        self.notifications = 0
+        self.reconnects = 0
+
+    def _connect(self):
+        from .database import engine
+
+        # Conexão fora do pool: fica presa ao LISTEN durante toda a vida do worker
+        fairy = engine.raw_connection()
+        fairy.detach()
+        conn = fairy.dbapi_connection
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+        return conn
+
+    def _run(self) -> None:
+        while not self.stop_event.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                if self.reconnects:
+                    # Avisos podem ter sido perdidos enquanto estávamos desconectados
+                    dashboard_cache.clear()
+                self.connected = True
+                while not self.stop_event.is_set():
+                    ready, _, _ = select.select([conn], [], [], LISTEN_POLL_SECONDS)
+                    if not ready:
+                        continue
+                    conn.poll()
+                    namespaces = set()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        namespaces.update(filter(None, notify.payload.split(",")))
+                        self.notifications += 1
+                    if namespaces:
+                        dashboard_cache.invalidate(namespaces)
+            except Exception as e:
+                print(f"[CACHE] listener de invalidação desconectado: {e}")
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self.reconnects += 1
+            self.stop_event.wait(LISTEN_RETRY_SECONDS)
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=LISTEN_POLL_SECONDS + 1)
+
+
+_listener = _InvalidationListener()
+
+
+def start_invalidation_listener() -> None:
+    if settings.cache_listen_enabled:
+        _listener.start()
+
+
+def stop_invalidation_listener() -> None:
+    _listener.stop()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {
+        **dashboard_cache.stats(),
+        "listener": {
+            "enabled": settings.cache_listen_enabled,
+            "connected": _listener.connected,
+            "notifications": _listener.notifications,
+            "reconnects": _listener.reconnects,
+        },
+    }
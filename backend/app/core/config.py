@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
+import tempfile
 
 
 class Settings(BaseSettings):
@@ -9,6 +10,32 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     environment: str = os.getenv("ENVIRONMENT", "development")
+    # Threads por processo dedicadas às importações de PCA em segundo plano
+    pca_import_workers: int = int(os.getenv("PCA_IMPORT_WORKERS", "2"))
+    # Job de importação PENDENTE/PROCESSANDO sem progresso por mais que isso é dado como perdido
+    pca_import_job_timeout_seconds: float = float(os.getenv("PCA_IMPORT_JOB_TIMEOUT_SECONDS", "1800"))
+    # Processos para ler CSVs grandes do PCA em paralelo (0 ou 1 = leitura sequencial)
+    pca_csv_parse_workers: int = int(os.getenv("PCA_CSV_PARSE_WORKERS", "0"))
+    # Abaixo deste tamanho (bytes decodificados) o CSV é lido no próprio processo
+    pca_csv_parallel_min_bytes: int = int(os.getenv("PCA_CSV_PARALLEL_MIN_BYTES", str(8 * 1024 * 1024)))
+    # Cache em memória dos endpoints agregados (0 desativa)
+    cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    # Invalidação entre workers via LISTEN/NOTIFY do Postgres
+    cache_listen_enabled: bool = os.getenv("CACHE_LISTEN_ENABLED", "true").lower() in ("1", "true", "yes")
+    # PDFs do relatório customizado (compartilhado pelos workers do mesmo host)
+    report_store_dir: str = os.getenv("REPORT_STORE_DIR", os.path.join(tempfile.gettempdir(), "scglic_reports"))
+    report_store_ttl_seconds: float = float(os.getenv("REPORT_STORE_TTL_SECONDS", "900"))
+    report_store_max_entries: int = int(os.getenv("REPORT_STORE_MAX_ENTRIES", "200"))
+    report_store_max_bytes: int = int(os.getenv("REPORT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+    # Job sem progresso por mais que isso é considerado abandonado e pode ser refeito
+    report_job_timeout_seconds: float = float(os.getenv("REPORT_JOB_TIMEOUT_SECONDS", "600"))
+    # Threads por processo que geram PDFs em segundo plano
+    report_workers: int = int(os.getenv("REPORT_WORKERS", "2"))
+    # Gráficos dos relatórios: processos de renderização (0 ou 1 = na própria thread) e cache de PNGs
+    chart_render_workers: int = int(os.getenv("CHART_RENDER_WORKERS", "0"))
+    chart_cache_max_entries: int = int(os.getenv("CHART_CACHE_MAX_ENTRIES", "64"))
+    chart_cache_ttl_seconds: float = float(os.getenv("CHART_CACHE_TTL_SECONDS", "900"))
     
     class Config:
         env_file = ".env"
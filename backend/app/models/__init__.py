@@ -3,6 +3,8 @@ from .pca import PCA
 from .qualificacao import Qualificacao
 from .licitacao import Licitacao
 from .access_request import AccessRequest
+from .pca_import_job import PCAImportJob
+from .dashboard_summary import DashboardSummary
 
 # Import opcional: ActivityEvent pode nao existir em instalaees antigas/migrando
 try:
@@ -16,6 +18,8 @@ __all__ = [
     "Qualificacao",
     "Licitacao",
     "AccessRequest",
+    "PCAImportJob",
+    "DashboardSummary",
 ]
 if ActivityEvent is not None:
     __all__.append("ActivityEvent")
@@ -0,0 +1,25 @@
+"""
+pyright: reportMissingImports=false
+This module depends on SQLAlchemy at runtime. If your editor flags imports,
+point it to the backend virtualenv with dependencies installed.
+"""
+from sqlalchemy import Column, String, DateTime, Date, Integer, BigInteger, Boolean
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class DashboardSummary(Base):
+    """Resultado pré-calculado de um indicador de dashboard, por ano (0 = todos).
+    Recalculado sob demanda quando marcado como sujo, quando o dia muda ou
+    quando fica velho demais (ver dashboard_summary_service)."""
+    __tablename__ = "dashboard_summaries"
+
+    kind = Column(String(40), primary_key=True)  # pca_stats, pca_charts, licitacao_stats
+    ano = Column(Integer, primary_key=True, default=0)
+    payload = Column(JSONB, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    computed_on = Column(Date, nullable=False, server_default=func.current_date())
+    dirty = Column(Boolean, nullable=False, default=False)
+    # Incrementada a cada marcação como sujo; protege o recálculo concorrente
+    generation = Column(BigInteger, nullable=False, default=0, server_default="0")
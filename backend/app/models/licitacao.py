@@ -4,14 +4,24 @@ This module depends on SQLAlchemy at runtime. If your editor flags imports,
 point it to the backend virtualenv with dependencies installed.
 """
 import uuid
-from sqlalchemy import Column, String, Text, DECIMAL, DateTime, Date, ForeignKey, Enum, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, String, Text, DECIMAL, DateTime, Date, ForeignKey, Enum, Integer, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.core.database import Base
+from app.models.search import search_text_sql, search_vector_sql
 import enum
 
 
+# Colunas geradas de busca (ver app.models.search)
+SEARCH_VECTOR_SQL = search_vector_sql((
+    ("A", ("objeto",)),
+    ("B", ("palavra_chave",)),
+    ("C", ("area_demandante", "modalidade", "pregoeiro")),
+))
+SEARCH_TEXT_SQL = search_text_sql(("nup", "numero_contratacao", "objeto", "palavra_chave"))
+
+
 class StatusLicitacao(str, enum.Enum):
     HOMOLOGADA = "HOMOLOGADA"
     FRACASSADA = "FRACASSADA"
@@ -21,6 +31,25 @@ class StatusLicitacao(str, enum.Enum):
 
 class Licitacao(Base):
     __tablename__ = "licitacoes"
+    __table_args__ = (
+        # Filtros do dashboard (ano/modalidade); INCLUDE permite index-only scan nos agregados
+        Index(
+            "ix_licitacoes_ano_modalidade",
+            "ano",
+            "modalidade",
+            postgresql_include=["status", "valor_estimado", "valor_homologado"],
+        ),
+        # Paginação por cursor
+        Index("ix_licitacoes_created_at_id", "created_at", "id"),
+        # Busca
+        Index("ix_licitacoes_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_licitacoes_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nup = Column(String(50), ForeignKey("qualificacoes.nup"), nullable=False)
@@ -41,6 +70,9 @@ class Licitacao(Base):
     economia = Column(DECIMAL(precision=15, scale=2))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Busca textual/trigramas; fora do carregamento padrão das linhas
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    search_text = deferred(Column(Text, Computed(SEARCH_TEXT_SQL, persisted=True)))
     created_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=False)
     updated_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=True)
 
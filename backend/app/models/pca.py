@@ -5,11 +5,32 @@ point it to the backend virtualenv with dependencies installed.
 """
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Text, DECIMAL, Boolean, DateTime, Date, ForeignKey, Integer, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DECIMAL, Boolean, DateTime, Date, ForeignKey, Integer, UniqueConstraint, Computed, Index, and_
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.core.database import Base
+from app.models.search import search_text_sql, search_vector_sql
+
+
+# Valores de situacao_execucao (já em minúsculas e sem espaços) tratados como "não iniciada".
+# Vale tanto para as propriedades em Python quanto para as expressões SQL.
+SITUACOES_NAO_INICIADA = ("", "não iniciada", "nao iniciada", "não iniciado", "nao iniciado")
+
+# Expressão da coluna gerada pca.nao_iniciada (a migração f8d0b2c4e6a3 grava a mesma)
+NAO_INICIADA_SQL = (
+    "lower(btrim(coalesce(situacao_execucao, ''), E' \\t\\r\\n')) IN ("
+    + ", ".join(f"'{value}'" for value in SITUACOES_NAO_INICIADA)
+    + ")"
+)
+
+# Colunas geradas de busca (ver app.models.search)
+SEARCH_VECTOR_SQL = search_vector_sql((
+    ("A", ("titulo_contratacao",)),
+    ("B", ("categoria_contratacao", "area_requisitante")),
+))
+SEARCH_TEXT_SQL = search_text_sql(("numero_contratacao", "titulo_contratacao", "area_requisitante"))
 
 
 class PCA(Base):
@@ -26,7 +47,14 @@ class PCA(Base):
     numero_dfd = Column(String(50))
     data_estimada_inicio = Column(Date)
     data_estimada_conclusao = Column(Date)
-    ano_pca = Column(Integer, nullable=False, default=2025)
+    ano_pca = Column(Integer, nullable=False, default=2025, index=True)
+    # sha256 dos campos importáveis; a reimportação pula linhas com o mesmo hash
+    content_hash = Column(String(64), nullable=True)
+    # Coluna gerada (STORED) com a situação "não iniciada" normalizada; base dos índices parciais
+    situacao_nao_iniciada = Column("nao_iniciada", Boolean, Computed(NAO_INICIADA_SQL, persisted=True))
+    # Busca textual/trigramas; fora do carregamento padrão das linhas
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    search_text = deferred(Column(Text, Computed(SEARCH_TEXT_SQL, persisted=True)))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=False)
@@ -37,7 +65,33 @@ class PCA(Base):
     updater = relationship("Usuario", foreign_keys=[updated_by])
     qualificacoes = relationship("Qualificacao", back_populates="pca_ref")
 
-    @property
+    __table_args__ = (
+        Index("ix_pca_nao_iniciada_inicio", "data_estimada_inicio", postgresql_where=situacao_nao_iniciada),
+        Index("ix_pca_nao_iniciada_conclusao", "data_estimada_conclusao", postgresql_where=situacao_nao_iniciada),
+        # Paginação por cursor
+        Index("ix_pca_created_at_id", "created_at", "id"),
+        # Busca
+        Index("ix_pca_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_pca_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
+
+    @hybrid_property
+    def nao_iniciada(self) -> bool:
+        """Situação da execução vazia ou "Não iniciada" (e variações de grafia)"""
+        situacao = (self.situacao_execucao or "").strip().lower()
+        return situacao in SITUACOES_NAO_INICIADA
+
+    @nao_iniciada.expression
+    def nao_iniciada(cls):
+        # Lê a coluna gerada: casa com o predicado dos índices parciais
+        return cls.situacao_nao_iniciada
+
+    @hybrid_property
     def atrasada(self) -> bool:
         """
         Contratação é considerada atrasada se:
@@ -47,23 +101,22 @@ class PCA(Base):
         """
         if not self.data_estimada_inicio or not self.data_estimada_conclusao:
             return False
-
-        # Verificar se é "Não iniciada" - normalizar string
-        situacao = (self.situacao_execucao or "").strip().lower()
-        situacao_nao_iniciada = situacao in ["", "não iniciada", "nao iniciada", "não iniciado", "nao iniciado"]
-
-        if not situacao_nao_iniciada:
+        if not self.nao_iniciada:
             return False
 
         hoje = date.today()
-        # Debug para algumas contratações
-        if self.numero_contratacao in ["1/2025", "2/2025", "3/2025"]:
-            print(f"DEBUG {self.numero_contratacao}: situacao='{self.situacao_execucao}' -> nao_iniciada={situacao_nao_iniciada}, inicio={self.data_estimada_inicio}, conclusao={self.data_estimada_conclusao}, hoje={hoje}")
-
         # Atrasada: situação não iniciada + início passou + conclusão não passou
         return (hoje > self.data_estimada_inicio and hoje <= self.data_estimada_conclusao)
 
-    @property
+    @atrasada.expression
+    def atrasada(cls):
+        return and_(
+            cls.nao_iniciada,
+            cls.data_estimada_inicio < func.current_date(),
+            cls.data_estimada_conclusao >= func.current_date(),
+        )
+
+    @hybrid_property
     def vencida(self) -> bool:
         """
         Contratação é considerada vencida se:
@@ -72,14 +125,13 @@ class PCA(Base):
         """
         if not self.data_estimada_conclusao:
             return False
-
-        # Verificar se é "Não iniciada" - normalizar string
-        situacao = (self.situacao_execucao or "").strip().lower()
-        situacao_nao_iniciada = situacao in ["", "não iniciada", "nao iniciada", "não iniciado", "nao iniciado"]
-
-        if not situacao_nao_iniciada:
+        if not self.nao_iniciada:
             return False
 
         hoje = date.today()
         # Vencida: situação não iniciada + conclusão passou
         return hoje > self.data_estimada_conclusao
+
+    @vencida.expression
+    def vencida(cls):
+        return and_(cls.nao_iniciada, cls.data_estimada_conclusao < func.current_date())
@@ -0,0 +1,40 @@
+"""
+pyright: reportMissingImports=false
+This module depends on SQLAlchemy at runtime. If your editor flags imports,
+point it to the backend virtualenv with dependencies installed.
+"""
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class PCAImportJob(Base):
+    """Importação de PCA executada em segundo plano; o estado fica no banco
+    para que qualquer worker do gunicorn consiga responder ao polling."""
+    __tablename__ = "pca_import_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, default="PENDENTE")  # PENDENTE, PROCESSANDO, CONCLUIDO, ERRO, PREVIEW, EXPIRADO
+    source = Column(String(10), nullable=False)  # excel, csv
+    filename = Column(String(255))
+    ano = Column(Integer)
+    total_rows = Column(Integer)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSONB)
+    payload = Column(JSONB)  # linhas já lidas de uma simulação (status PREVIEW)
+    message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=False)
+
+    # Relationships
+    creator = relationship("Usuario", foreign_keys=[created_by])
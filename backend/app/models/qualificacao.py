@@ -4,14 +4,24 @@ This module depends on SQLAlchemy at runtime. If your editor flags imports,
 point it to the backend virtualenv with dependencies installed.
 """
 import uuid
-from sqlalchemy import Column, String, Text, DECIMAL, DateTime, ForeignKey, Enum, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, String, Text, DECIMAL, DateTime, ForeignKey, Enum, Integer, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.core.database import Base
+from app.models.search import search_text_sql, search_vector_sql
 import enum
 
 
+# Colunas geradas de busca (ver app.models.search)
+SEARCH_VECTOR_SQL = search_vector_sql((
+    ("A", ("objeto",)),
+    ("B", ("palavra_chave",)),
+    ("C", ("area_demandante", "modalidade")),
+))
+SEARCH_TEXT_SQL = search_text_sql(("nup", "numero_contratacao", "objeto", "palavra_chave"))
+
+
 class StatusQualificacao(str, enum.Enum):
     EM_ANALISE = "EM ANALISE"
     CONCLUIDO = "CONCLUIDO"
@@ -19,6 +29,18 @@ class StatusQualificacao(str, enum.Enum):
 
 class Qualificacao(Base):
     __tablename__ = "qualificacoes"
+    __table_args__ = (
+        # Paginação por cursor
+        Index("ix_qualificacoes_created_at_id", "created_at", "id"),
+        # Busca
+        Index("ix_qualificacoes_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_qualificacoes_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nup = Column(String(50), unique=True, index=True, nullable=False)
@@ -34,6 +56,9 @@ class Qualificacao(Base):
     observacoes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Busca textual/trigramas; fora do carregamento padrão das linhas
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    search_text = deferred(Column(Text, Computed(SEARCH_TEXT_SQL, persisted=True)))
     created_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=False)
     updated_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=True)
 
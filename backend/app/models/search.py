@@ -0,0 +1,30 @@
+"""
+Expressões das colunas geradas de busca (pca, qualificacoes, licitacoes).
+
+- ``search_vector``: tsvector ponderado na configuração ``public.pt_unaccent``
+  (português sem acentos), base da busca textual com ranking;
+- ``search_text``: texto em minúsculas e sem acentos, indexado com
+  ``gin_trgm_ops`` para trechos, números e erros de digitação.
+
+A função ``public.f_unaccent`` e a configuração ``public.pt_unaccent`` são
+criadas pela migração e2a4c6e8f0b3, que grava as mesmas expressões.
+"""
+from typing import Sequence, Tuple
+
+SEARCH_CONFIG = "public.pt_unaccent"
+
+
+def _joined(columns: Sequence[str]) -> str:
+    return " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+
+def search_vector_sql(weighted: Sequence[Tuple[str, Sequence[str]]]) -> str:
+    """((peso, colunas), ...) -> setweight(to_tsvector(...), peso) || ..."""
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, {_joined(columns)}), '{weight}')"
+        for weight, columns in weighted
+    )
+
+
+def search_text_sql(columns: Sequence[str]) -> str:
+    return f"public.f_unaccent(lower({_joined(columns)}))"
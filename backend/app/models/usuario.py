@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, Enum, LargeBinary
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, LargeBinary, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,10 @@ class NivelAcesso(str, enum.Enum):
 
 class Usuario(Base):
     __tablename__ = "usuarios"
+    __table_args__ = (
+        # Paginação por cursor
+        Index("ix_usuarios_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     username = Column(String(50), nullable=False)
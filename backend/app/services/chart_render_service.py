@@ -0,0 +1,159 @@
+"""
+Renderização dos gráficos do relatório customizado (PNG em memória).
+
+Usa a API orientada a objetos do matplotlib (``Figure`` + canvas Agg), sem o
+estado global do pyplot, então várias threads podem renderizar ao mesmo tempo.
+O estilo "whitegrid" é aplicado nos próprios eixos em vez de ``sns.set_style``
+(que altera o rcParams global). As imagens ficam num LRU em memória
+indexado por tipo, título e hash dos dados; com ``chart_render_workers`` > 1
+a renderização roda num pool de processos.
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+CHART_DPI = 150
+CHART_FIGSIZE = (8, 6)
+
+# Valores do estilo "whitegrid" do seaborn
+GRID_COLOR = "#cccccc"
+TEXT_COLOR = "#262626"
+
+SUMMARY_COLORS = ['#2563eb', '#dc2626', '#16a34a', '#ca8a04']
+
+chart_cache = TTLCache(settings.chart_cache_max_entries, settings.chart_cache_ttl_seconds)
+
+
+def _currency_axis(ax) -> None:
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
+
+
+def _apply_whitegrid(ax) -> None:
+    ax.set_facecolor("white")
+    ax.set_axisbelow(True)
+    ax.grid(True, color=GRID_COLOR, linewidth=1)
+    for spine in ax.spines.values():
+        spine.set_edgecolor(GRID_COLOR)
+    ax.tick_params(colors=TEXT_COLOR, length=0)
+
+
+def _plain(values: Sequence[Any]) -> List[Any]:
+    # Enums (status) viram o valor; evita "Classe.MEMBRO" no rótulo
+    return [getattr(value, "value", value) for value in values]
+
+
+def render_chart_png(chart_type: str, chart_data: Dict[str, Any], chart_title: str) -> bytes:
+    """Desenha um gráfico e devolve o PNG (também executado nos processos do pool)"""
+    fig = Figure(figsize=CHART_FIGSIZE)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    _apply_whitegrid(ax)
+
+    if chart_type == 'status_distribution':
+        labels = chart_data.get('Status', [])
+        values = chart_data.get('Quantidade', [])
+        if labels and values:
+            ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
+            ax.set_title(chart_title, fontsize=14, fontweight='bold')
+
+    elif chart_type == 'value_timeline':
+        months = chart_data.get('Mes', [])
+        values = chart_data.get('Valor', [])
+        if months and values:
+            ax.plot(months, values, marker='o', linewidth=2, markersize=6)
+            ax.set_title(chart_title, fontsize=14, fontweight='bold')
+            ax.set_xlabel('Mês')
+            ax.set_ylabel('Valor (R$)')
+            ax.tick_params(axis='x', labelrotation=45)
+            _currency_axis(ax)
+
+    elif chart_type == 'category_comparison':
+        categories = chart_data.get('Categoria', [])
+        values = chart_data.get('Valor', [])
+        if categories and values:
+            ax.bar(categories, values, color='#16a34a', alpha=0.8)
+            ax.set_title(chart_title, fontsize=14, fontweight='bold')
+            ax.set_xlabel('Categoria')
+            ax.set_ylabel('Valor (R$)')
+            ax.set_xticks(range(len(categories)), categories, rotation=45, ha='right')
+            _currency_axis(ax)
+
+    elif chart_type == 'summary_table':
+        stats = chart_data.get('Estatistica', [])
+        values = chart_data.get('Valor', [])
+        if stats and values:
+            ax.bar(stats, values, color=SUMMARY_COLORS[:len(stats)], alpha=0.8)
+            ax.set_title(chart_title, fontsize=14, fontweight='bold')
+            ax.set_xlabel('Estatística')
+            ax.set_ylabel('Valor (R$)')
+            ax.set_xticks(range(len(stats)), stats, rotation=45, ha='right')
+            _currency_axis(ax)
+
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def chart_key(chart_type: str, chart_data: Dict[str, Any], chart_title: str) -> tuple:
+    raw = json.dumps(chart_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return ("chart", chart_type, chart_title, hashlib.sha256(raw.encode("utf-8")).hexdigest())
+
+
+# --- Pool de processos opcional ---
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    # spawn: o processo do gunicorn tem threads (jobs), fork não é seguro
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=settings.chart_render_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _render_pool
+
+
+def render_charts(chart_data_list: List[Dict[str, Any]]) -> List[Optional[bytes]]:
+    """
+    PNG de cada gráfico (na mesma ordem; None se falhar). Os que não estão em
+    cache são renderizados juntos no pool, ou em sequência na própria thread.
+    """
+    images: List[Optional[bytes]] = [None] * len(chart_data_list)
+    pending = []
+    for index, chart_info in enumerate(chart_data_list):
+        chart_data = {name: _plain(values) for name, values in chart_info['data'].items()}
+        key = chart_key(chart_info['type'], chart_data, chart_info['title'])
+        hit, png = chart_cache.get(key)
+        if hit:
+            images[index] = png
+        else:
+            pending.append((index, key, (chart_info['type'], chart_data, chart_info['title'])))
+
+    use_pool = settings.chart_render_workers > 1 and len(pending) > 0
+    futures = [_get_render_pool().submit(render_chart_png, *args) for _, _, args in pending] if use_pool else None
+
+    for position, (index, key, args) in enumerate(pending):
+        try:
+            png = futures[position].result() if use_pool else render_chart_png(*args)
+        except Exception as e:
+            print(f"Erro ao renderizar gráfico {args[0]}: {str(e)}")
+            continue
+        chart_cache.set(key, png)
+        images[index] = png
+    return images
@@ -0,0 +1,183 @@
+"""
+Consultas do relatório customizado.
+
+Os filtros viram critérios SQL aplicados tanto à tabela de detalhe, que só
+busca as colunas selecionadas, quanto aos gráficos, cujos dados são
+agregados no banco (GROUP BY / count / sum). Nenhum objeto ORM é carregado
+e nenhum DataFrame é montado para os gráficos.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Session
+
+from app.models.licitacao import Licitacao
+from app.models.pca import PCA
+from app.models.qualificacao import Qualificacao
+
+REPORT_MODELS = {
+    'pca': PCA,
+    'qualificacao': Qualificacao,
+    'licitacao': Licitacao,
+}
+
+VALUE_FIELDS = ('valor_total', 'valor_estimado', 'valor_homologado')
+CATEGORY_FIELDS = ('categoria_contratacao', 'modalidade')
+CATEGORY_VALUE_FIELDS = ('valor_total', 'valor_estimado')
+SUMMARY_LABELS = ['Total', 'Média', 'Máximo', 'Mínimo']
+
+
+def custom_report_criteria(model, filters) -> list:
+    """Critérios SQL equivalentes aos filtros do relatório"""
+    criteria = []
+    if filters.dateStart:
+        date_start = datetime.strptime(filters.dateStart, '%Y-%m-%d')
+        if hasattr(model, 'created_at'):
+            criteria.append(model.created_at >= date_start)
+        elif hasattr(model, 'data_estimada_inicio'):
+            criteria.append(model.data_estimada_inicio >= date_start)
+
+    if filters.dateEnd:
+        date_end = datetime.strptime(filters.dateEnd, '%Y-%m-%d')
+        if hasattr(model, 'created_at'):
+            criteria.append(model.created_at <= date_end)
+        elif hasattr(model, 'data_estimada_conclusao'):
+            criteria.append(model.data_estimada_conclusao <= date_end)
+
+    if filters.minValue and hasattr(model, 'valor_total'):
+        criteria.append(model.valor_total >= filters.minValue)
+    elif filters.minValue and hasattr(model, 'valor_estimado'):
+        criteria.append(model.valor_estimado >= filters.minValue)
+
+    if filters.maxValue and hasattr(model, 'valor_total'):
+        criteria.append(model.valor_total <= filters.maxValue)
+    elif filters.maxValue and hasattr(model, 'valor_estimado'):
+        criteria.append(model.valor_estimado <= filters.maxValue)
+
+    if filters.status:
+        if hasattr(model, 'status'):
+            criteria.append(model.status.in_(filters.status))
+        elif hasattr(model, 'status_contratacao'):
+            criteria.append(model.status_contratacao.in_(filters.status))
+
+    # Filtro por área demandante
+    if filters.areasDemandantes:
+        if hasattr(model, 'area_requisitante'):
+            criteria.append(model.area_requisitante.in_(filters.areasDemandantes))
+        elif hasattr(model, 'area_demandante'):
+            criteria.append(model.area_demandante.in_(filters.areasDemandantes))
+    return criteria
+
+
+def _field_expression(model, field: str):
+    """Coluna ou propriedade híbrida do modelo; None para campos desconhecidos"""
+    mapper = inspect(model)
+    if field in mapper.column_attrs or isinstance(mapper.all_orm_descriptors.get(field), hybrid_property):
+        return getattr(model, field)
+    return None
+
+
+def _is_numeric(model, field: str) -> bool:
+    column = inspect(model).column_attrs.get(field)
+    if column is None:
+        return False
+    python_type = column.expression.type.python_type
+    return issubclass(python_type, (int, float, Decimal)) and not issubclass(python_type, bool)
+
+
+def fetch_report_rows(db: Session, model, criteria: Sequence, fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Linhas da tabela de detalhe, só com os campos selecionados que existem no
+    modelo (os demais ficam fora do dicionário, como atributos ausentes)
+    """
+    known = [field for field in dict.fromkeys(fields) if _field_expression(model, field) is not None]
+    columns = [_field_expression(model, field).label(field) for field in known] or [model.id]
+    query = select(*columns).where(*criteria).order_by(model.created_at, model.id)
+    return [{field: row[field] for field in known} for row in db.execute(query).mappings()]
+
+
+def _first(fields: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    return next((field for field in candidates if field in fields), None)
+
+
+def _status_counts(db: Session, model, criteria: Sequence, status_field: str, limit: Optional[int] = None):
+    status = _field_expression(model, status_field)
+    query = (
+        select(status, func.count())
+        .where(*criteria, status.isnot(None))
+        .group_by(status)
+        .order_by(func.count().desc())
+        .limit(limit)
+    )
+    rows = db.execute(query).all()
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+def custom_report_chart_data(
+    db: Session,
+    model,
+    criteria: Sequence,
+    fields: Sequence[str],
+    chart_type: str,
+) -> Optional[Dict[str, List[Any]]]:
+    """
+    Dados de um gráfico agregados no banco. As colunas usadas seguem os
+    campos selecionados, como na tabela de detalhe.
+    """
+    status_field = 'status' if 'status' in fields else 'status_contratacao'
+    has_status = status_field in fields and _field_expression(model, status_field) is not None
+
+    if chart_type == "status_distribution":
+        if has_status:
+            labels, counts = _status_counts(db, model, criteria, status_field)
+            return {'Status': labels, 'Quantidade': counts}
+
+    elif chart_type == "value_timeline":
+        value_field = _first(fields, VALUE_FIELDS)
+        date_field = next((field for field in fields if 'data' in field.lower()), None)
+        value = _field_expression(model, value_field) if value_field else None
+        moment = _field_expression(model, date_field) if date_field else None
+        if value is not None and moment is not None:
+            # Agrupar por mês
+            month = func.to_char(func.date_trunc('month', moment), 'YYYY-MM')
+            rows = db.execute(
+                select(month, func.sum(func.coalesce(value, 0)))
+                .where(*criteria, moment.isnot(None))
+                .group_by(month)
+                .order_by(month)
+            ).all()
+            return {'Mes': [row[0] for row in rows], 'Valor': [float(row[1] or 0) for row in rows]}
+
+    elif chart_type == "category_comparison":
+        category_field = _first(fields, CATEGORY_FIELDS)
+        value_field = _first(fields, CATEGORY_VALUE_FIELDS)
+        category = _field_expression(model, category_field) if category_field else None
+        value = _field_expression(model, value_field) if value_field else None
+        if category is not None and value is not None:
+            rows = db.execute(
+                select(category, func.sum(func.coalesce(value, 0)))
+                .where(*criteria, category.isnot(None))
+                .group_by(category)
+                .order_by(category)
+            ).all()
+            return {'Categoria': [row[0] for row in rows], 'Valor': [float(row[1] or 0) for row in rows]}
+
+    elif chart_type == "summary_table":
+        numeric_field = next((field for field in fields if _is_numeric(model, field)), None)
+        if numeric_field:
+            # Estatísticas da primeira coluna numérica selecionada
+            column = _field_expression(model, numeric_field)
+            row = db.execute(
+                select(func.sum(column), func.avg(column), func.max(column), func.min(column)).where(*criteria)
+            ).one()
+            return {'Estatistica': list(SUMMARY_LABELS), 'Valor': [float(value or 0) for value in row]}
+        # Se não há colunas numéricas, mostrar contagem por status
+        if has_status:
+            labels, counts = _status_counts(db, model, criteria, status_field, limit=4)
+            return {'Estatistica': labels, 'Valor': counts}
+        return None
+
+    return None
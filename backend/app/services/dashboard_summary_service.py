@@ -0,0 +1,150 @@
+"""
+Camada de resumos pré-calculados dos dashboards.
+
+Cada indicador (``kind``) é calculado uma vez por ano e guardado em
+``dashboard_summaries``. As escritas em PCA/licitações apenas marcam os
+resumos afetados como sujos (``mark_dashboards_dirty``, na mesma transação
+da escrita); o recálculo acontece na próxima leitura. Indicadores que
+dependem de CURRENT_DATE (atrasadas/vencidas) também são recalculados
+quando o dia muda.
+
+Cada marcação incrementa ``generation``. O recálculo anota a geração ao
+começar e só grava o resultado (e limpa ``dirty``) se ela não mudou: uma
+escrita confirmada durante o cálculo mantém o resumo sujo.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.dashboard_summary import DashboardSummary
+from app.services.licitacao_stats_service import licitacao_dashboard_stats
+from app.services.pca_stats_service import pca_chart_data, pca_status_counts
+
+# Idade máxima de um resumo, mesmo sem escritas (ex.: alterações feitas fora da API)
+SUMMARY_MAX_AGE = timedelta(minutes=15)
+
+# Chave usada quando o indicador não é filtrado por ano
+ALL_YEARS = 0
+
+
+class SummaryKind(NamedTuple):
+    compute: Callable[[Session, Optional[int]], Dict[str, Any]]
+    # Depende de CURRENT_DATE: expira na virada do dia
+    date_sensitive: bool
+
+
+SUMMARY_KINDS: Dict[str, SummaryKind] = {
+    "pca_stats": SummaryKind(pca_status_counts, date_sensitive=True),
+    "pca_charts": SummaryKind(pca_chart_data, date_sensitive=False),
+    "licitacao_stats": SummaryKind(licitacao_dashboard_stats, date_sensitive=False),
+}
+
+# Resumos afetados por escritas em cada módulo
+PCA_SUMMARIES = ("pca_stats", "pca_charts")
+LICITACAO_SUMMARIES = ("licitacao_stats",)
+
+
+def _is_fresh(row: DashboardSummary, kind: SummaryKind) -> bool:
+    if row.dirty:
+        return False
+    if kind.date_sensitive and row.computed_on != date.today():
+        return False
+    return row.computed_at >= datetime.now(timezone.utc) - SUMMARY_MAX_AGE
+
+
+def get_summary(db: Session, kind_name: str, ano: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Devolve o payload do indicador com ``computed_at`` (ISO), recalculando e
+    gravando o resumo se ele estiver sujo, vencido ou ainda não existir.
+    """
+    kind = SUMMARY_KINDS[kind_name]
+    key = ano if ano is not None else ALL_YEARS
+    try:
+        row = db.get(DashboardSummary, (kind_name, key))
+    except SQLAlchemyError as e:
+        # Sem a tabela (migração pendente) o dashboard continua funcionando sem cache
+        db.rollback()
+        print(f"[DASHBOARD SUMMARY] leitura indisponível ({kind_name}): {e}")
+        row = None
+    if row is not None and _is_fresh(row, kind):
+        return {**row.payload, "computed_at": row.computed_at.isoformat()}
+
+    # Geração anotada antes do cálculo; sem linha, cria-se uma (suja) para que
+    # as escritas concorrentes tenham o que marcar
+    generation = row.generation if row is not None else _create_placeholder(db, kind_name, key)
+
+    payload = kind.compute(db, ano)
+    stmt = pg_insert(DashboardSummary).values(
+        kind=kind_name,
+        ano=key,
+        payload=payload,
+        computed_at=func.now(),
+        computed_on=func.current_date(),
+        dirty=False,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DashboardSummary.kind, DashboardSummary.ano],
+        set_={
+            "payload": stmt.excluded.payload,
+            "computed_at": stmt.excluded.computed_at,
+            "computed_on": stmt.excluded.computed_on,
+            "dirty": False,
+        },
+        # Marcado como sujo durante o cálculo: o resultado não é gravado
+        where=DashboardSummary.generation == generation,
+    ).returning(DashboardSummary.computed_at)
+    try:
+        computed_at = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"[DASHBOARD SUMMARY] falha ao gravar resumo {kind_name}/{key}: {e}")
+        computed_at = None
+    if computed_at is None:
+        computed_at = datetime.now(timezone.utc)
+    return {**payload, "computed_at": computed_at.isoformat()}
+
+
+def _create_placeholder(db: Session, kind_name: str, key: int) -> Optional[int]:
+    """Linha suja e vazia para o indicador; devolve a geração atual"""
+    try:
+        db.execute(
+            pg_insert(DashboardSummary)
+            .values(kind=kind_name, ano=key, payload={}, dirty=True, generation=0)
+            .on_conflict_do_nothing(index_elements=[DashboardSummary.kind, DashboardSummary.ano])
+        )
+        db.commit()
+        return (
+            db.query(DashboardSummary.generation)
+            .filter(DashboardSummary.kind == kind_name, DashboardSummary.ano == key)
+            .scalar()
+        )
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"[DASHBOARD SUMMARY] falha ao criar resumo {kind_name}/{key}: {e}")
+        return None
+
+
+def mark_dashboards_dirty(db: Session, kinds: Iterable[str]) -> None:
+    """
+    Marca os resumos como sujos. Não faz commit: deve ser chamado dentro da
+    transação da escrita, para que dado e invalidação sejam gravados juntos.
+    """
+    kinds = list(kinds)
+    try:
+        # SAVEPOINT: uma falha aqui não pode derrubar a escrita em andamento
+        with db.begin_nested():
+            (
+                db.query(DashboardSummary)
+                .filter(DashboardSummary.kind.in_(kinds))
+                .update(
+                    {"dirty": True, "generation": DashboardSummary.generation + 1},
+                    synchronize_session=False,
+                )
+            )
+    except SQLAlchemyError as e:
+        print(f"[DASHBOARD SUMMARY] falha ao invalidar resumos {kinds}: {e}")
@@ -0,0 +1,78 @@
+"""
+Indicadores do dashboard de licitações.
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Numeric, case, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.licitacao import Licitacao, StatusLicitacao
+
+# Status considerados encerrados para a taxa de sucesso
+STATUS_ENCERRADOS = (StatusLicitacao.HOMOLOGADA, StatusLicitacao.FRACASSADA, StatusLicitacao.REVOGADA)
+
+
+def _percentual(parte, todo):
+    # parte * 100 / todo, com 0 quando não há base
+    return func.coalesce(cast(parte, Numeric) * 100 / func.nullif(todo, 0), literal(0))
+
+
+def licitacao_dashboard_stats(
+    db: Session,
+    ano: Optional[int] = None,
+    modalidade: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Totais, valores, economia e taxa de sucesso das licitações, num único comando"""
+    status = Licitacao.status
+    total = func.count(Licitacao.id)
+    homologadas = func.count(Licitacao.id).filter(status == StatusLicitacao.HOMOLOGADA)
+    encerradas = func.count(Licitacao.id).filter(status.in_(STATUS_ENCERRADOS))
+    valor_estimado = func.coalesce(func.sum(Licitacao.valor_estimado), 0)
+    economia = func.coalesce(
+        func.sum(
+            case(
+                (status == StatusLicitacao.HOMOLOGADA, Licitacao.valor_estimado - Licitacao.valor_homologado),
+                else_=0,
+            )
+        ),
+        0,
+    )
+
+    query = select(
+        total.label("total"),
+        homologadas.label("homologadas"),
+        func.count(Licitacao.id).filter(status == StatusLicitacao.EM_ANDAMENTO).label("em_andamento"),
+        func.count(Licitacao.id).filter(status == StatusLicitacao.FRACASSADA).label("fracassadas"),
+        func.count(Licitacao.id).filter(status == StatusLicitacao.REVOGADA).label("revogadas"),
+        valor_estimado.label("valor_estimado"),
+        func.coalesce(
+            func.sum(Licitacao.valor_homologado).filter(status == StatusLicitacao.HOMOLOGADA), 0
+        ).label("valor_homologado"),
+        economia.label("economia"),
+        _percentual(economia, valor_estimado).label("economia_percentual"),
+        _percentual(homologadas, encerradas).label("taxa_sucesso"),
+    )
+    if ano is not None:
+        query = query.where(Licitacao.ano == ano)
+    if modalidade:
+        query = query.where(Licitacao.modalidade == modalidade)
+    row = db.execute(query).one()
+
+    return {
+        "total_licitacoes": row.total,
+        "homologadas": row.homologadas,
+        "em_andamento": row.em_andamento,
+        "fracassadas": row.fracassadas,
+        "revogadas": row.revogadas,
+        "valor_total_estimado": float(row.valor_estimado),
+        "valor_total_homologado": float(row.valor_homologado),
+        "total_economia": float(row.economia),
+        "economia_percentual": float(row.economia_percentual),
+        "taxa_sucesso": float(row.taxa_sucesso),
+        "licitacoes_por_status": {
+            "HOMOLOGADA": row.homologadas,
+            "EM ANDAMENTO": row.em_andamento,
+            "FRACASSADA": row.fracassadas,
+            "REVOGADA": row.revogadas,
+        },
+    }
@@ -0,0 +1,258 @@
+"""
+Jobs de importação do PCA em segundo plano.
+
+A rota apenas grava o upload em disco e registra o job em ``pca_import_jobs``;
+um pool de threads do próprio processo executa ``run_pca_import`` e grava o
+progresso no banco a cada lote, de modo que qualquer worker do gunicorn
+consiga responder ao polling.
+
+Se o worker que executa o job morrer (deploy, max-requests, OOM), o job fica
+sem progresso; ``expire_stale_jobs`` o encerra como ERRO depois de
+``pca_import_job_timeout_seconds`` e remove o upload abandonado.
+"""
+import glob
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.pca_import_job import PCAImportJob
+from app.services.pca_import_service import ImportRow, run_pca_import
+
+# Quantidade de mensagens de erro guardadas no job (o total fica em error_count)
+MAX_STORED_ERRORS = 100
+
+# Validade do token de uma simulação (dry run) de importação
+PREVIEW_TTL = timedelta(minutes=30)
+
+PREVIEW_DATE_FIELDS = ('data_estimada_inicio', 'data_estimada_conclusao')
+
+ACTIVE_STATUSES = ("PENDENTE", "PROCESSANDO")
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.pca_import_workers),
+    thread_name_prefix="pca-import",
+)
+
+
+def job_to_dict(job: PCAImportJob) -> Dict[str, Any]:
+    return {
+        "id": str(job.id),
+        "status": job.status,
+        "source": job.source,
+        "filename": job.filename,
+        "ano": job.ano,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows or 0,
+        "imported": job.imported or 0,
+        "updated": job.updated or 0,
+        "unchanged": job.unchanged or 0,
+        "error_count": job.error_count or 0,
+        "errors": job.errors or [],
+        "message": job.message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def create_import_job(db: Session, source: str, filename: str, ano: Optional[int], user_id) -> PCAImportJob:
+    job = PCAImportJob(
+        status="PENDENTE",
+        source=source,
+        filename=filename,
+        ano=ano,
+        created_by=user_id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _serialize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        field: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for field, value in record.items()
+    }
+
+
+def _deserialize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    values = dict(record)
+    for field in PREVIEW_DATE_FIELDS:
+        if values.get(field):
+            values[field] = date.fromisoformat(values[field][:10])
+    return values
+
+
+def preview_expires_at(job: PCAImportJob) -> Optional[datetime]:
+    return job.created_at + PREVIEW_TTL if job.created_at else None
+
+
+def preview_expired(job: PCAImportJob) -> bool:
+    expires_at = preview_expires_at(job)
+    return expires_at is not None and expires_at < datetime.now(timezone.utc)
+
+
+def expire_old_previews(db: Session) -> None:
+    """Descarta o payload de simulações vencidas (não commita)"""
+    limit = datetime.now(timezone.utc) - PREVIEW_TTL
+    (
+        db.query(PCAImportJob)
+        .filter(PCAImportJob.status == "PREVIEW", PCAImportJob.created_at < limit)
+        .update({"status": "EXPIRADO", "payload": None}, synchronize_session=False)
+    )
+
+
+def create_preview_job(
+    db: Session,
+    source: str,
+    filename: str,
+    ano: Optional[int],
+    user_id,
+    rows: List[ImportRow],
+    errors: List[str],
+    total: int,
+    diff: Dict[str, Any],
+) -> PCAImportJob:
+    """Guarda as linhas já lidas para que a aplicação não precise reler o arquivo"""
+    expire_old_previews(db)
+    job = PCAImportJob(
+        status="PREVIEW",
+        source=source,
+        filename=filename,
+        ano=ano,
+        total_rows=total,
+        imported=diff["imported"],
+        updated=diff["updated"],
+        unchanged=diff["unchanged"],
+        error_count=len(errors),
+        errors=list(errors[:MAX_STORED_ERRORS]),
+        payload={
+            "rows": [[line, _serialize_record(record)] for line, record in rows],
+            "errors": errors,
+        },
+        message="Simulação de importação",
+        created_by=user_id,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def load_preview_rows(job: PCAImportJob) -> Tuple[List[ImportRow], List[str]]:
+    payload = job.payload or {}
+    rows = [(line, _deserialize_record(record)) for line, record in payload.get("rows", [])]
+    return rows, list(payload.get("errors", []))
+
+
+def expire_stale_jobs(db: Session) -> None:
+    """Encerra como ERRO os jobs ativos sem progresso (worker perdido) e apaga seus uploads"""
+    limit = datetime.now(timezone.utc) - timedelta(seconds=settings.pca_import_job_timeout_seconds)
+    expired = (
+        db.query(PCAImportJob)
+        .filter(
+            PCAImportJob.status.in_(ACTIVE_STATUSES),
+            func.coalesce(PCAImportJob.updated_at, PCAImportJob.created_at) < limit,
+        )
+        .update(
+            {
+                "status": "ERRO",
+                "message": "Importação interrompida: o processo responsável foi encerrado",
+                "finished_at": func.now(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if expired:
+        _remove_stale_uploads(limit)
+
+
+def _remove_stale_uploads(limit: datetime) -> None:
+    # Uploads gravados por spool_upload e nunca removidos pelo job
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), "pca_import_*")):
+        try:
+            if os.path.getmtime(path) < limit.timestamp():
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+def submit_import_job(job_id, path: str) -> None:
+    """Agenda a execução do job; o arquivo em ``path`` é removido ao final"""
+    _executor.submit(_run_import_job, job_id, path)
+
+
+def _run_import_job(job_id, path: str) -> None:
+    # Sessões separadas: a importação mantém a transação aberta até o commit
+    # final, enquanto o progresso precisa ser visível para os outros workers.
+    db = SessionLocal()
+    status_db = SessionLocal()
+    job = None
+    try:
+        # Só assume o job se ele ainda estiver pendente (pode ter sido expirado na fila)
+        claimed = (
+            status_db.query(PCAImportJob)
+            .filter(PCAImportJob.id == job_id, PCAImportJob.status == "PENDENTE")
+            .update({"status": "PROCESSANDO", "started_at": func.now()}, synchronize_session=False)
+        )
+        status_db.commit()
+        if not claimed:
+            return
+        job = status_db.get(PCAImportJob, job_id)
+        source, filename, ano, user_id = job.source, job.filename, job.ano, job.created_by
+
+        def on_progress(processed: int, total: Optional[int], errors: List[str]) -> None:
+            try:
+                job.processed_rows = processed
+                job.total_rows = total
+                job.error_count = len(errors)
+                job.errors = list(errors[:MAX_STORED_ERRORS])
+                status_db.commit()
+            except Exception as e:
+                status_db.rollback()
+                print(f"[PCA IMPORT JOB {job_id}] falha ao gravar progresso: {e}")
+
+        result = run_pca_import(db, source, path, filename, ano, user_id, on_progress=on_progress)
+
+        job.status = "CONCLUIDO"
+        job.imported = result["imported"]
+        job.updated = result["updated"]
+        job.unchanged = result["unchanged"]
+        job.total_rows = result["total"]
+        job.error_count = len(result["errors"])
+        job.errors = list(result["errors"][:MAX_STORED_ERRORS])
+        job.message = "Importação concluída"
+        if result.get("encoding"):
+            enc = result["encoding"]
+            job.message += f" (encoding {enc['detected']}, confiança {enc['confidence']:.2f})"
+        job.finished_at = func.now()
+        status_db.commit()
+    except Exception as e:
+        db.rollback()
+        status_db.rollback()
+        import traceback
+        print(f"[PCA IMPORT JOB {job_id}] ERRO: {traceback.format_exc()}")
+        if job is not None:
+            try:
+                job.status = "ERRO"
+                job.message = f"Erro ao processar arquivo: {str(e)}"
+                job.finished_at = func.now()
+                status_db.commit()
+            except Exception:
+                status_db.rollback()
+    finally:
+        db.close()
+        status_db.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,569 @@
+"""
+Leitura e normalização dos arquivos de importação do PCA (Excel e CSV).
+
+As funções ``parse_pca_*`` devolvem as linhas prontas para o motor de
+upsert em ``pca_import_service``; não acessam o banco.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import codecs
+import io
+import multiprocessing
+import re
+import threading
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from app.core.config import settings
+
+
+# Correções de encoding corrompido comum (baseado em convert_pca.py)
+MOJIBAKE_REPLACEMENTS = {
+    '�': 'ã',
+    '��o': 'ção',
+    '��': 'ção',
+    'contrata��o': 'contratação',
+    'situa��o': 'situação',
+    'execu��o': 'execução',
+    'prepara��o': 'preparação',
+    't�tulo': 'título',
+    'servi�o': 'serviço',
+    'informa��o': 'informação',
+    'comunica��o': 'comunicação',
+    'aquisi��o': 'aquisição',
+    'manuten��o': 'manutenção',
+    '�rea': 'área',
+    'n�mero': 'número',
+    'in�cio': 'início',
+    'conclus�o': 'conclusão',
+    'dura��o': 'duração',
+    'transfer�ncia': 'transferência',
+    'assist�ncia': 'assistência',
+    't�cnica': 'técnica',
+    'cient�fica': 'científica',
+    'implementa��o': 'implementação',
+    '�gil': 'ágil',
+    'ag�ncias': 'agências',
+    'mobili�rios': 'mobiliários',
+    'acess�rios': 'acessórios',
+    'an�lise': 'análise',
+    'tecnologia': 'tecnologia',
+    'licenciamento': 'licenciamento'
+}
+
+# Uma única regex com todas as correções, da chave mais longa para a mais curta:
+# a palavra inteira ("contrata��o") tem precedência sobre o fragmento ("�").
+MOJIBAKE_RE = re.compile(
+    '|'.join(re.escape(old) for old in sorted(MOJIBAKE_REPLACEMENTS, key=len, reverse=True))
+)
+
+
+def _fix_mojibake(match):
+    return MOJIBAKE_REPLACEMENTS[match.group(0)]
+
+
+def clean_text(text):
+    """Limpa e corrige caracteres especiais corrompidos"""
+    if pd.isna(text) or text == '':
+        return None
+
+    return MOJIBAKE_RE.sub(_fix_mojibake, str(text)).strip()
+
+
+CSV_DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y')
+
+
+def parse_csv_date(date_str):
+    """Converte string de data CSV para formato datetime"""
+    if pd.isna(date_str) or date_str == '':
+        return None
+
+    date_str = str(date_str).strip()
+
+    # Tentar diferentes formatos de data
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+
+    return None
+
+
+def parse_csv_currency(value_str):
+    """Converte string de valor monetário CSV para float"""
+    if pd.isna(value_str) or value_str == '':
+        return 0.0
+
+    value_str = str(value_str).strip()
+
+    # Remove espaços e outros caracteres não numéricos
+    value_str = re.sub(r'[^\d,.]', '', value_str)
+
+    # Se tem vírgula, é separador decimal brasileiro
+    if ',' in value_str:
+        # Dividir em parte inteira e decimal
+        parts = value_str.split(',')
+        integer_part = parts[0].replace('.', '')  # Remove pontos de milhares
+        decimal_part = parts[1] if len(parts) > 1 else '00'
+        value_str = integer_part + '.' + decimal_part
+
+    try:
+        return float(value_str)
+    except ValueError:
+        return 0.0
+
+
+EXCEL_COLUMN_MAPPING = {
+    'Número da Contratação': 'numero_contratacao',
+    'Status da Contratação': 'status_contratacao',
+    'Situação da Execução': 'situacao_execucao',
+    'Título da Contratação': 'titulo_contratacao',
+    'Categoria da Contratação': 'categoria_contratacao',
+    'Valor Total': 'valor_total',
+    'Área Requisitante': 'area_requisitante',
+    'Número DFD': 'numero_dfd',
+    'Data Estimada de Início': 'data_estimada_inicio',
+    'Data Estimada de Conclusão': 'data_estimada_conclusao',
+    # Versões com encoding corrompido
+    'N�mero da Contrata��o': 'numero_contratacao',
+    'Status da Contrata��o': 'status_contratacao',
+    'Situa��o da Execu��o': 'situacao_execucao',
+    'T�tulo da Contrata��o': 'titulo_contratacao',
+    'Categoria da Contrata��o': 'categoria_contratacao',
+    '�rea Requisitante': 'area_requisitante',
+    'N�mero DFD': 'numero_dfd',
+    'Data Estimada de In�cio': 'data_estimada_inicio',
+    'Data Estimada de Conclus�o': 'data_estimada_conclusao',
+    # Mapeamentos alternativos caso as colunas tenham nomes diferentes
+    'numero_contratacao': 'numero_contratacao',
+    'status_contratacao': 'status_contratacao',
+    'situacao_execucao': 'situacao_execucao',
+    'titulo_contratacao': 'titulo_contratacao',
+    'categoria_contratacao': 'categoria_contratacao',
+    'valor_total': 'valor_total',
+    'area_requisitante': 'area_requisitante',
+    'numero_dfd': 'numero_dfd',
+    'data_estimada_inicio': 'data_estimada_inicio',
+    'data_estimada_conclusao': 'data_estimada_conclusao',
+}
+
+
+# --- Normalização vetorizada (coluna inteira de uma vez) ---
+# Mesma semântica de clean_text / parse_csv_date / parse_csv_currency.
+
+def clean_text_column(column: pd.Series) -> pd.Series:
+    # Colunas de texto do PCA repetem muito (status, categoria, área):
+    # cada valor distinto é limpo uma única vez.
+    codes, uniques = pd.factorize(column)
+    cleaned = [clean_text(value) for value in uniques]
+    cleaned.append(None)  # código -1 = valor ausente
+    return pd.Series([cleaned[code] for code in codes], index=column.index, dtype=object)
+
+
+def parse_date_column(column: pd.Series) -> pd.Series:
+    text = column.astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=column.index, dtype='datetime64[ns]')
+    for fmt in CSV_DATE_FORMATS:
+        pending = parsed.isna() & column.notna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(text[pending], format=fmt, errors='coerce')
+    dates = parsed.dt.date.astype(object).where(parsed.notna(), None)
+    # Datas fora do intervalo do datetime64[ns] (antes de 1677 ou depois de 2262)
+    # viram NaT; essas, e só elas, passam pela conversão linha a linha
+    fallback = parsed.isna() & column.notna() & (text != '')
+    if fallback.any():
+        dates[fallback] = column[fallback].map(parse_csv_date)
+    return dates
+
+
+def parse_currency_column(column: pd.Series) -> pd.Series:
+    digits = column.astype(str).str.replace(r'[^\d,.]', '', regex=True)
+    # Com vírgula é separador decimal brasileiro: pontos de milhar saem da parte inteira
+    has_comma = digits.str.contains(',', regex=False)
+    if has_comma.any():
+        parts = digits[has_comma].str.split(',')
+        digits = digits.copy()
+        digits[has_comma] = parts.str[0].str.replace('.', '', regex=False) + '.' + parts.str[1]
+    values = pd.to_numeric(digits, errors='coerce').fillna(0.0)
+    return values.where(column.notna() & (column != ''), 0.0)
+
+
+def normalize_pca_csv_frame(df: pd.DataFrame, first_line: int = 2) -> Tuple[List[Tuple[int, Dict[str, Any]]], int]:
+    """
+    Converte as colunas do CSV (por posição, ver ``CSV_COLUMN_MAPPING``) de
+    uma só vez e devolve (linhas válidas, linhas descartadas). Linhas sem
+    número da contratação ou repetidas no próprio frame são descartadas.
+    """
+    columns: Dict[str, pd.Series] = {}
+    for col_index, field_name in CSV_COLUMN_MAPPING.items():
+        if col_index >= len(df.columns):
+            continue
+        raw = df.iloc[:, col_index]
+        if field_name in ('data_estimada_inicio', 'data_estimada_conclusao'):
+            columns[field_name] = parse_date_column(raw)
+        elif field_name == 'valor_total':
+            columns[field_name] = parse_currency_column(raw)
+        else:
+            cleaned = clean_text_column(raw)
+            # Se for situacao_execucao e estiver vazio, colocar "Não iniciada"
+            if field_name == 'situacao_execucao':
+                cleaned = cleaned.where(cleaned.notna() & (cleaned != ''), 'Não iniciada')
+            columns[field_name] = cleaned
+
+    if 'numero_contratacao' not in columns:
+        return [], len(df)
+
+    numeros = columns['numero_contratacao']
+    keep = numeros.notna() & (numeros != '')
+    keep &= ~(numeros.where(keep).duplicated(keep='first') & keep)
+
+    # As colunas já trazem None nos vazios; montar os dicts a partir de listas
+    # evita o custo de DataFrame.to_dict em colunas object.
+    fields = list(columns)
+    values = [columns[field][keep].tolist() for field in fields]
+    lines = (df.index[keep.to_numpy()] + first_line).tolist()
+    rows = [(line, dict(zip(fields, row))) for line, row in zip(lines, zip(*values))]
+    return rows, len(df) - len(rows)
+
+
+EXCEL_TEXT_FIELDS = (
+    'status_contratacao',
+    'situacao_execucao',
+    'titulo_contratacao',
+    'categoria_contratacao',
+    'area_requisitante',
+    'numero_dfd',
+)
+EXCEL_FIELDS = ('numero_contratacao', 'valor_total', 'data_estimada_inicio', 'data_estimada_conclusao') + EXCEL_TEXT_FIELDS
+
+# Linhas entregues por lote ao upsert na leitura em streaming
+EXCEL_BATCH_SIZE = 1000
+
+
+def _is_missing(value) -> bool:
+    return value is None or (not isinstance(value, str) and pd.isna(value))
+
+
+def _excel_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, '%d/%m/%Y').date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.to_datetime(value).date()
+
+
+def _excel_record(line: int, values: Dict[str, Any], errors: List[str], processed_numbers: set):
+    """
+    Valida e converte uma linha da planilha (já com as colunas mapeadas).
+    Devolve o registro normalizado ou None quando a linha é descartada.
+    """
+    numero_contratacao = None
+    try:
+        # Verificar número da contratação
+        raw_numero = values.get('numero_contratacao')
+        numero_contratacao = '' if _is_missing(raw_numero) else str(raw_numero).strip()
+        if not numero_contratacao:
+            errors.append(f"Linha {line}: Número da contratação não informado")
+            return None
+
+        # Verificar duplicatas dentro do mesmo arquivo
+        if numero_contratacao in processed_numbers:
+            errors.append(f"Linha {line}: Número da contratação {numero_contratacao} duplicado no arquivo")
+            return None
+
+        processed_numbers.add(numero_contratacao)
+
+        # Preparar dados
+        pca_data = {'numero_contratacao': numero_contratacao}
+        for field in EXCEL_TEXT_FIELDS:
+            value = values.get(field)
+            pca_data[field] = None if _is_missing(value) else str(value)
+
+        # Converter valor
+        valor = values.get('valor_total')
+        if not _is_missing(valor):
+            try:
+                pca_data['valor_total'] = float(str(valor).replace('R$', '').replace(',', '.').strip())
+            except (ValueError, AttributeError):
+                pca_data['valor_total'] = 0.0
+        else:
+            pca_data['valor_total'] = 0.0
+
+        # Converter datas
+        for date_field in ['data_estimada_inicio', 'data_estimada_conclusao']:
+            value = values.get(date_field)
+            try:
+                pca_data[date_field] = None if _is_missing(value) else _excel_date(value)
+            except (ValueError, TypeError):
+                pca_data[date_field] = None
+
+        return pca_data
+
+    except Exception as e:
+        error_msg = f"Linha {line} (PCA {numero_contratacao}): {str(e)}"
+        errors.append(error_msg)
+        print(f"ERRO DE IMPORTACAO: {error_msg}")
+        return None
+
+
+def iter_pca_excel_batches(
+    path: str,
+    errors: List[str],
+    stats: Dict[str, Any],
+    batch_size: int = EXCEL_BATCH_SIZE,
+) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """
+    Lê um .xlsx em streaming (openpyxl ``read_only``) e entrega lotes de
+    (linha do arquivo, registro normalizado), sem carregar a planilha inteira.
+
+    Os erros são acrescentados em ``errors`` à medida que as linhas são lidas;
+    ``stats["total"]`` conta as linhas de dados e ``stats["expected"]`` traz a
+    estimativa de linhas declarada pela planilha (pode ser None).
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        stats["expected"] = max(ws.max_row - 1, 0) if ws.max_row else None
+        rows_iter = ws.iter_rows(values_only=True)
+        header = next(rows_iter, None) or ()
+
+        # Posição de cada campo do modelo (primeira coluna que o mapeia)
+        positions: Dict[str, int] = {}
+        for i, name in enumerate(header):
+            field = EXCEL_COLUMN_MAPPING.get(name) if isinstance(name, str) else None
+            if field and field not in positions:
+                positions[field] = i
+
+        processed_numbers = set()  # Para evitar duplicatas no mesmo arquivo
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        for line, cells in enumerate(rows_iter, start=2):
+            if not cells or all(cell is None for cell in cells):
+                continue
+            stats["total"] += 1
+            values = {field: cells[i] if i < len(cells) else None for field, i in positions.items()}
+            record = _excel_record(line, values, errors, processed_numbers)
+            if record is not None:
+                batch.append((line, record))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        wb.close()
+
+
+def parse_pca_excel(path: str) -> Dict[str, Any]:
+    """
+    Leitura via pandas, usada para planilhas .xls (formato que o openpyxl não
+    lê). Devolve ``{"rows", "errors", "total"}``, onde ``rows`` são pares
+    (linha do arquivo, registro normalizado).
+    """
+    df = pd.read_excel(path)
+    print(f"EXCEL PROCESSADO - Linhas: {len(df)}, Colunas: {len(df.columns)}")
+
+    # Renomear colunas se necessário
+    for old_name, new_name in EXCEL_COLUMN_MAPPING.items():
+        if old_name in df.columns:
+            df = df.rename(columns={old_name: new_name})
+
+    errors: List[str] = []
+    rows: List[Tuple[int, Dict[str, Any]]] = []
+    processed_numbers = set()  # Para evitar duplicatas no mesmo arquivo
+    fields = [field for field in EXCEL_FIELDS if field in df.columns]
+
+    for index, values in enumerate(df[fields].to_dict('records')):
+        record = _excel_record(index + 2, values, errors, processed_numbers)
+        if record is not None:
+            rows.append((index + 2, record))
+
+    return {"rows": rows, "errors": errors, "total": len(df)}
+
+
+CSV_COLUMN_MAPPING = {
+    0: 'numero_contratacao',      # Número da contratação
+    1: 'status_contratacao',      # Status da contratação
+    2: 'situacao_execucao',       # Situação da Execução
+    3: 'titulo_contratacao',      # Título da contratação
+    4: 'categoria_contratacao',   # Categoria da contratação
+    6: 'data_estimada_inicio',    # Data estimada para o início
+    7: 'data_estimada_conclusao', # Data estimada para a conclusão
+    9: 'area_requisitante',       # Área requisitante
+    10: 'numero_dfd',             # Nº DFD
+    24: 'valor_total'             # Valor Total (coluna 25, índice 24)
+}
+
+
+# Amostra usada para decidir o encoding antes da leitura única do arquivo
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+ENCODING_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Bytes sem caractere atribuído no cp1252; se aparecem, o arquivo só pode ser latin-1
+CP1252_UNDEFINED = re.compile(b'[\x81\x8d\x8f\x90\x9d]')
+
+
+def sniff_encoding(sample: bytes) -> Tuple[str, float]:
+    """
+    Decide o encoding do CSV a partir de uma amostra inicial do arquivo.
+
+    Devolve (encoding, confiança entre 0 e 1). Ordem: BOM, UTF-8 válido e,
+    por fim, cp1252 (padrão do Excel em português) ou latin-1.
+    """
+    for bom, encoding in ENCODING_BOMS:
+        if sample.startswith(bom):
+            return encoding, 1.0
+
+    # Decodificador incremental: a amostra pode cortar um caractere multibyte no fim
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        if CP1252_UNDEFINED.search(sample):
+            return 'latin-1', 0.6
+        return 'cp1252', 0.8
+
+    if sample.isascii():
+        # Só ASCII na amostra: qualquer codec serve até aqui, o resto do arquivo decide
+        return 'utf-8', 0.5
+    return 'utf-8', 0.99
+
+
+def decode_csv_payload(contents: bytes) -> Tuple[str, Dict[str, Any]]:
+    """Decodifica o arquivo inteiro uma única vez com o encoding detectado"""
+    encoding, confidence = sniff_encoding(contents[:ENCODING_SAMPLE_SIZE])
+    try:
+        text = contents.decode(encoding)
+    except UnicodeDecodeError:
+        # UTF-8 válido na amostra mas não no restante: recai no padrão do Excel
+        encoding, confidence = 'cp1252', 0.4
+        text = contents.decode(encoding, errors='replace')
+    return text, {"detected": encoding, "confidence": confidence}
+
+
+# --- Leitura paralela de CSVs grandes ---
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    # spawn: o processo do gunicorn tem threads (jobs de importação), fork não é seguro
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=settings.pca_csv_parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _parse_pool
+
+
+def split_csv_chunks(text: str, chunks: int) -> Tuple[str, List[str]]:
+    """
+    Separa o cabeçalho e divide o restante em até ``chunks`` pedaços que
+    terminam em fim de linha. Um corte nunca cai dentro de campo entre aspas
+    (quebra de linha dentro do campo): conta-se a paridade das aspas.
+    """
+    header_end = text.find('\n')
+    if header_end < 0:
+        return text, []
+    header, start = text[:header_end + 1], header_end + 1
+    target = max(1, (len(text) - start) // max(1, chunks))
+
+    pieces: List[str] = []
+    while start < len(text):
+        end = text.find('\n', min(start + target, len(text)) - 1)
+        while end >= 0 and text.count('"', start, end + 1) % 2:
+            end = text.find('\n', end + 1)
+        end = len(text) if end < 0 else end + 1
+        pieces.append(text[start:end])
+        start = end
+    return header, pieces
+
+
+def _parse_csv_chunk(header: str, chunk: str) -> Tuple[List[Tuple[int, Dict[str, Any]]], int, int]:
+    """Executado no processo filho: (linhas com posição relativa, linhas lidas, descartadas)"""
+    df = pd.read_csv(io.StringIO(header + chunk), sep=';', dtype=str)
+    rows, discarded = normalize_pca_csv_frame(df, first_line=0)
+    return rows, len(df), discarded
+
+
+def parse_csv_text_parallel(text: str, workers: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], int, int]:
+    """
+    Lê o CSV já decodificado em vários processos e junta os pedaços na ordem
+    original. A duplicidade de ``numero_contratacao`` continua global: cada
+    pedaço descarta as repetições internas e a junção descarta números já
+    vistos em pedaços anteriores (mantém a primeira ocorrência do arquivo).
+    Devolve (linhas, total de linhas lidas, descartadas).
+    """
+    header, pieces = split_csv_chunks(text, workers * 4)
+    pool = _get_parse_pool()
+    futures = [pool.submit(_parse_csv_chunk, header, piece) for piece in pieces]
+
+    rows: List[Tuple[int, Dict[str, Any]]] = []
+    seen = set()
+    offset = 2  # primeira linha de dados, como no index + 2 da leitura sequencial
+    total = 0
+    discarded = 0
+    for future in futures:
+        chunk_rows, chunk_total, chunk_discarded = future.result()
+        discarded += chunk_discarded
+        for line, record in chunk_rows:
+            numero = record['numero_contratacao']
+            if numero in seen:
+                discarded += 1
+                continue
+            seen.add(numero)
+            rows.append((line + offset, record))
+        offset += chunk_total
+        total += chunk_total
+    return rows, total, discarded
+
+
+def parse_pca_csv(path: str) -> Dict[str, Any]:
+    """
+    Lê o CSV exportado do sistema federal (separador ';') e devolve
+    ``{"rows", "errors", "total", "encoding"}``; ``encoding`` informa o
+    codec detectado e a confiança da detecção.
+    """
+    with open(path, 'rb') as fh:
+        contents = fh.read()
+    print(f"ARQUIVO CSV LIDO - Size: {len(contents)} bytes")
+
+    text, encoding = decode_csv_payload(contents)
+    del contents
+    workers = settings.pca_csv_parse_workers
+    parallel = workers > 1 and len(text) >= settings.pca_csv_parallel_min_bytes
+    try:
+        if parallel:
+            clean_rows, total_lines, discarded = parse_csv_text_parallel(text, workers)
+        else:
+            df = pd.read_csv(io.StringIO(text), sep=';', dtype=str)
+            total_lines = len(df)
+            clean_rows, discarded = normalize_pca_csv_frame(df)
+    except pd.errors.EmptyDataError:
+        raise
+    except Exception as e:
+        print(f"Erro ao ler CSV ({encoding['detected']}): {e}")
+        raise ValueError("Erro ao processar arquivo CSV. Verifique o formato e encoding.")
+    print(
+        f"CSV PROCESSADO COM ENCODING {encoding['detected']} "
+        f"(confiança {encoding['confidence']:.2f}) - Linhas: {total_lines}"
+        + (f" ({workers} processos)" if parallel else "")
+    )
+
+    if discarded:
+        print(f"CSV: {discarded} linha(s) sem número da contratação ou duplicadas no arquivo")
+
+    print(f"CSV processado: {len(clean_rows)} registros válidos de {total_lines} total")
+    return {"rows": clean_rows, "errors": [], "total": len(clean_rows), "encoding": encoding}
@@ -0,0 +1,388 @@
+"""
+Motor de importação em massa do PCA.
+
+As rotas de importação (Excel/CSV) apenas interpretam o arquivo e entregam
+as linhas já normalizadas para este módulo, que as aplica no banco com um
+único ``INSERT ... ON CONFLICT (numero_contratacao) DO UPDATE`` por lote,
+em vez de um SELECT + flush por linha. Linhas cujo ``content_hash`` não
+mudou não são regravadas.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, any_, bindparam, func, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_cache
+from app.models.pca import PCA
+from app.services.dashboard_summary_service import PCA_SUMMARIES, mark_dashboards_dirty
+from app.services.pca_import_parsing import iter_pca_excel_batches, parse_pca_csv, parse_pca_excel
+
+# Linhas por comando INSERT. Com ~14 colunas fica bem abaixo do limite de
+# 65535 parâmetros por comando do PostgreSQL.
+DEFAULT_CHUNK_SIZE = 1000
+
+# Campos vindos do arquivo; só os presentes no arquivo são sobrescritos quando a
+# contratação já existe (o CSV pode ter menos colunas)
+IMPORT_FIELDS = (
+    'numero_contratacao',
+    'status_contratacao',
+    'situacao_execucao',
+    'titulo_contratacao',
+    'categoria_contratacao',
+    'valor_total',
+    'area_requisitante',
+    'numero_dfd',
+    'data_estimada_inicio',
+    'data_estimada_conclusao',
+)
+
+# Itens detalhados por tipo no diff da simulação (as contagens são sempre completas)
+DIFF_DETAIL_LIMIT = 200
+
+# (linha do arquivo, registro normalizado)
+ImportRow = Tuple[int, Dict[str, Any]]
+
+# on_progress(linhas aplicadas, estimativa de linhas a aplicar, erros até agora)
+ProgressCallback = Callable[[int, Optional[int], List[str]], None]
+
+
+def extract_year_from_numero(numero: str) -> Optional[int]:
+    """Infere o ano do PCA a partir do sufixo do número (ex.: '12/2025')"""
+    try:
+        if not numero:
+            return None
+        m = re.search(r'(\d{4})$', str(numero).strip())
+        if m:
+            y = int(m.group(1))
+            if 2000 <= y <= 2100:
+                return y
+        return None
+    except Exception:
+        return None
+
+
+def _canonical(value: Any) -> Any:
+    # Mesma representação para o valor vindo do arquivo e o lido do banco
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (float, Decimal)):
+        try:
+            return str(Decimal(str(value)).quantize(Decimal('0.01')))
+        except InvalidOperation:
+            return str(value)
+    return str(value)
+
+
+def record_fields(record: Dict[str, Any]) -> Tuple[str, ...]:
+    """Campos importáveis que o parser produziu para o registro"""
+    return tuple(field for field in IMPORT_FIELDS if field in record)
+
+
+def compute_content_hash(values: Dict[str, Any], fields: Sequence[str] = IMPORT_FIELDS) -> str:
+    """
+    sha256 dos campos importáveis, usado para pular linhas sem alteração. Com
+    só parte dos campos, os nomes entram no hash: ele nunca coincide com o de
+    outro conjunto de campos, e a linha é regravada em vez de pulada.
+    """
+    canonical: Any = [_canonical(values.get(field)) for field in fields]
+    if tuple(fields) != IMPORT_FIELDS:
+        canonical = [list(fields), canonical]
+    payload = json.dumps(canonical, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def pca_content_hash(pca: PCA) -> str:
+    """Hash de uma contratação já carregada (criação/edição manual)"""
+    return compute_content_hash({field: getattr(pca, field) for field in IMPORT_FIELDS})
+
+
+def _build_values(record: Dict[str, Any], fields: Sequence[str], user_id, chosen_year: Optional[int]) -> Dict[str, Any]:
+    values = {field: record.get(field) for field in fields}
+    values['content_hash'] = compute_content_hash(values, fields)
+    values['id'] = uuid.uuid4()
+    values['created_by'] = user_id
+    # ano_pca só vale para novas contratações: não entra no SET do ON CONFLICT
+    values['ano_pca'] = chosen_year or extract_year_from_numero(values['numero_contratacao']) or date.today().year
+    return values
+
+
+def _upsert_chunk(db: Session, rows: Sequence[ImportRow], user_id, chosen_year: Optional[int]) -> Tuple[int, int, int]:
+    # Os registros de um mesmo arquivo têm as mesmas chaves; colunas ausentes
+    # do arquivo ficam fora do INSERT e do SET e mantêm o valor atual
+    fields = record_fields(rows[0][1])
+    stmt = pg_insert(PCA).values([_build_values(record, fields, user_id, chosen_year) for _, record in rows])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PCA.numero_contratacao],
+        set_={
+            **{field: stmt.excluded[field] for field in fields if field != 'numero_contratacao'},
+            'content_hash': stmt.excluded.content_hash,
+            'updated_by': user_id,
+            'updated_at': func.now(),
+        },
+        # Conteúdo igual: a tupla não é regravada nem volta no RETURNING
+        where=PCA.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    )
+    # xmax = 0 apenas em tuplas recém-inseridas; distingue insert de update sem nova consulta
+    stmt = stmt.returning(literal_column('(xmax = 0)').label('inserted'))
+    flags = db.execute(stmt).scalars().all()
+    imported = sum(1 for inserted in flags if inserted)
+    return imported, len(flags) - imported, len(rows) - len(flags)
+
+
+def _db_error_message(exc: SQLAlchemyError) -> str:
+    message = str(getattr(exc, 'orig', None) or exc).strip()
+    return message.splitlines()[0] if message else exc.__class__.__name__
+
+
+def _upsert_isolated(
+    db: Session,
+    rows: Sequence[ImportRow],
+    user_id,
+    chosen_year: Optional[int],
+    errors: List[str],
+) -> Tuple[int, int, int]:
+    """
+    Aplica o lote dentro de um SAVEPOINT. Se o banco rejeitar o lote, só o
+    savepoint é desfeito e o lote é dividido ao meio até isolar as linhas
+    inválidas; as demais entram normalmente.
+    """
+    try:
+        with db.begin_nested():
+            return _upsert_chunk(db, rows, user_id, chosen_year)
+    except SQLAlchemyError as e:
+        if len(rows) == 1:
+            line, record = rows[0]
+            errors.append(f"Linha {line}: {record.get('numero_contratacao')} - {_db_error_message(e)}")
+            return 0, 0, 0
+    middle = len(rows) // 2
+    first = _upsert_isolated(db, rows[:middle], user_id, chosen_year, errors)
+    second = _upsert_isolated(db, rows[middle:], user_id, chosen_year, errors)
+    return first[0] + second[0], first[1] + second[1], first[2] + second[2]
+
+
+def bulk_upsert_pcas(
+    db: Session,
+    rows: Sequence[ImportRow],
+    user_id,
+    chosen_year: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    errors: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Aplica as linhas no banco em lotes de ``chunk_size``, cada um em seu
+    próprio SAVEPOINT. Linhas rejeitadas pelo banco são descritas em
+    ``errors`` (com o número da linha) e não entram nas contagens.
+
+    As linhas devem estar sem números de contratação repetidos (o ON CONFLICT
+    não admite atualizar a mesma tupla duas vezes no mesmo comando). Não faz
+    commit: a transação fica a cargo de quem chama.
+    """
+    if errors is None:
+        errors = []
+    imported = 0
+    updated = 0
+    unchanged = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        chunk_imported, chunk_updated, chunk_unchanged = _upsert_isolated(db, chunk, user_id, chosen_year, errors)
+        imported += chunk_imported
+        updated += chunk_updated
+        unchanged += chunk_unchanged
+    return {"imported": imported, "updated": updated, "unchanged": unchanged}
+
+
+def spool_upload(fileobj: BinaryIO, suffix: str) -> str:
+    """Copia o upload para um arquivo temporário em disco e devolve o caminho"""
+    fd, path = tempfile.mkstemp(prefix="pca_import_", suffix=suffix)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(fileobj, out, 1024 * 1024)
+    return path
+
+
+def _log_import_event(db: Session, source: str, filename: str, user_id, result: Dict[str, Any]) -> None:
+    """Registra evento agregado da importação (best-effort)"""
+    try:
+        from app.models.activity_event import ActivityEvent  # lazy import
+        label = "Importação de PCA" if source == "excel" else "Importação de PCA (CSV)"
+        ev = ActivityEvent(
+            module="PCA",
+            action="import",
+            title=f"{label}: {result['imported']} novos, {result['updated']} atualizados",
+            details={
+                "imported": result["imported"],
+                "updated": result["updated"],
+                "unchanged": result["unchanged"],
+                "total_rows": int(result["total"]),
+                "errors_count": int(len(result["errors"])),
+                "filename": filename,
+                "source": source,
+            },
+            user_id=user_id,
+        )
+        db.add(ev)
+        db.commit()
+    except Exception:
+        # Não bloquear fluxo se logging falhar
+        db.rollback()
+        try:
+            import traceback
+            print(f"[IMPORT {source.upper()} EVENT LOGGING ERROR]", traceback.format_exc())
+        except Exception:
+            pass
+
+
+def _open_import_batches(source: str, path: str, errors: List[str], stats: Dict[str, Any]) -> Iterator[List[ImportRow]]:
+    # .xlsx é lido em streaming; .xls e CSV ainda passam por um DataFrame
+    if source == "excel" and path.lower().endswith(".xlsx"):
+        return iter_pca_excel_batches(path, errors, stats, DEFAULT_CHUNK_SIZE)
+
+    parsed = parse_pca_excel(path) if source == "excel" else parse_pca_csv(path)
+    rows = parsed["rows"]
+    errors.extend(parsed["errors"])
+    stats["total"] = parsed["total"]
+    stats["expected"] = len(rows)
+    if parsed.get("encoding"):
+        stats["encoding"] = parsed["encoding"]
+    return (rows[start:start + DEFAULT_CHUNK_SIZE] for start in range(0, len(rows), DEFAULT_CHUNK_SIZE))
+
+
+def run_pca_import(
+    db: Session,
+    source: str,
+    path: str,
+    filename: str,
+    chosen_year: Optional[int],
+    user_id,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Executa a importação completa (leitura, upsert e commit) de um arquivo já
+    gravado em disco. Usado tanto pelas rotas síncronas quanto pelos jobs em
+    segundo plano. Devolve ``imported``, ``updated``, ``unchanged``, ``total``, a lista
+    completa de ``errors`` e, para CSV, o ``encoding`` detectado.
+    """
+    errors: List[str] = []
+    stats: Dict[str, Any] = {"total": 0, "expected": None}
+    batches = _open_import_batches(source, path, errors, stats)
+
+    imported = 0
+    updated = 0
+    unchanged = 0
+    applied = 0
+    if on_progress:
+        on_progress(0, stats["expected"], errors)
+    for batch in batches:
+        counts = bulk_upsert_pcas(db, batch, user_id, chosen_year, errors=errors)
+        imported += counts["imported"]
+        updated += counts["updated"]
+        unchanged += counts["unchanged"]
+        applied += len(batch)
+        if on_progress:
+            on_progress(applied, stats["expected"], errors)
+    mark_dashboards_dirty(db, PCA_SUMMARIES)
+    invalidate_cache(db, ("pca",))
+    db.commit()
+
+    result = {
+        "imported": imported,
+        "updated": updated,
+        "unchanged": unchanged,
+        "total": stats["total"],
+        "errors": errors,
+    }
+    if stats.get("encoding"):
+        result["encoding"] = stats["encoding"]
+    _log_import_event(db, source, filename, user_id, result)
+    return result
+
+
+def load_import_rows(source: str, path: str) -> Tuple[List[ImportRow], List[str], Dict[str, Any]]:
+    """Lê o arquivo inteiro sem tocar no banco: (linhas, erros, estatísticas)"""
+    errors: List[str] = []
+    stats: Dict[str, Any] = {"total": 0, "expected": None}
+    rows = [row for batch in _open_import_batches(source, path, errors, stats) for row in batch]
+    return rows, errors, stats
+
+
+def diff_import_rows(db: Session, rows: Sequence[ImportRow]) -> Dict[str, Any]:
+    """
+    Simula a importação: classifica cada linha em inclusão, atualização ou
+    sem alteração com uma única consulta pelos números de contratação.
+    """
+    numeros = [record['numero_contratacao'] for _, record in rows]
+    existing: Dict[str, Any] = {}
+    if numeros:
+        query = (
+            db.query(PCA.content_hash, *[getattr(PCA, field) for field in IMPORT_FIELDS])
+            .filter(PCA.numero_contratacao == any_(bindparam('numeros', numeros, type_=ARRAY(String))))
+        )
+        existing = {row.numero_contratacao: row for row in query}
+
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    imported = updated = unchanged = 0
+    for line, record in rows:
+        fields = record_fields(record)
+        values = {field: record.get(field) for field in fields}
+        current = existing.get(values['numero_contratacao'])
+        if current is None:
+            imported += 1
+            if len(inserts) < DIFF_DETAIL_LIMIT:
+                inserts.append({"linha": line, "numero_contratacao": values['numero_contratacao']})
+            continue
+        if current.content_hash == compute_content_hash(values, fields):
+            unchanged += 1
+            continue
+        updated += 1
+        if len(updates) < DIFF_DETAIL_LIMIT:
+            changes = {}
+            for field in fields:
+                old, new = _canonical(getattr(current, field)), _canonical(values[field])
+                if old != new:
+                    changes[field] = {"atual": old, "novo": new}
+            updates.append({"linha": line, "numero_contratacao": values['numero_contratacao'], "alteracoes": changes})
+
+    return {
+        "imported": imported,
+        "updated": updated,
+        "unchanged": unchanged,
+        "inserts": inserts,
+        "updates": updates,
+        "truncated": imported > len(inserts) or updated > len(updates),
+    }
+
+
+def apply_import_rows(
+    db: Session,
+    source: str,
+    filename: str,
+    rows: Sequence[ImportRow],
+    errors: List[str],
+    total: int,
+    chosen_year: Optional[int],
+    user_id,
+) -> Dict[str, Any]:
+    """Aplica linhas já lidas (ex.: de uma simulação) e faz o commit"""
+    errors = list(errors)
+    counts = bulk_upsert_pcas(db, rows, user_id, chosen_year, errors=errors)
+    mark_dashboards_dirty(db, PCA_SUMMARIES)
+    invalidate_cache(db, ("pca",))
+    db.commit()
+    result = {**counts, "total": total, "errors": errors}
+    _log_import_event(db, source, filename, user_id, result)
+    return result
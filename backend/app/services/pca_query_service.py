@@ -0,0 +1,136 @@
+"""
+Filtros, ordenação e projeção de colunas da listagem do PCA.
+
+Tudo é resolvido no SQL: a rota só recebe listas de critérios/expressões já
+validadas contra os campos permitidos. Erros de parâmetro viram ValueError,
+que a rota converte em 400.
+"""
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter, create_model
+from sqlalchemy import false, func
+
+from app.models.pca import PCA
+from app.schemas.pca import PCA as PCASchema
+
+# Campos aceitos em ``sort`` (prefixo "-" = decrescente)
+SORTABLE_FIELDS = {
+    "numero_contratacao": PCA.numero_contratacao,
+    "titulo_contratacao": PCA.titulo_contratacao,
+    "situacao_execucao": PCA.situacao_execucao,
+    "status_contratacao": PCA.status_contratacao,
+    "categoria_contratacao": PCA.categoria_contratacao,
+    "area_requisitante": PCA.area_requisitante,
+    "valor_total": PCA.valor_total,
+    "data_estimada_inicio": PCA.data_estimada_inicio,
+    "data_estimada_conclusao": PCA.data_estimada_conclusao,
+    "ano_pca": PCA.ano_pca,
+    "created_at": PCA.created_at,
+    "updated_at": PCA.updated_at,
+}
+
+# Campos aceitos em ``fields``: os mesmos do PCASchema (inclui atrasada/vencida,
+# calculadas no SQL pelas expressões híbridas)
+PROJECTABLE_FIELDS = tuple(PCASchema.model_fields)
+
+# Sempre presentes numa projeção: identificam a linha e alimentam o cursor
+ALWAYS_PROJECTED = ("id", "created_at")
+
+
+def pca_list_filters(
+    situacao: Optional[Sequence[str]] = None,
+    categoria: Optional[Sequence[str]] = None,
+    status: Optional[Sequence[str]] = None,
+    area: Optional[str] = None,
+    valor_min: Optional[Decimal] = None,
+    valor_max: Optional[Decimal] = None,
+    inicio_de: Optional[date] = None,
+    inicio_ate: Optional[date] = None,
+    conclusao_de: Optional[date] = None,
+    conclusao_ate: Optional[date] = None,
+) -> list:
+    """Critérios SQL da listagem; parâmetros omitidos não filtram"""
+    criteria = []
+    if situacao:
+        criteria.append(PCA.situacao_execucao.in_(situacao))
+    if categoria:
+        criteria.append(PCA.categoria_contratacao.in_(categoria))
+    if status:
+        criteria.append(PCA.status_contratacao.in_(status))
+    if area:
+        criteria.append(PCA.area_requisitante.ilike(f"%{area.strip()}%"))
+    if valor_min is not None and valor_max is not None and valor_min > valor_max:
+        raise ValueError("'valor_min' maior que 'valor_max'")
+    if valor_min is not None:
+        criteria.append(PCA.valor_total >= valor_min)
+    if valor_max is not None:
+        criteria.append(PCA.valor_total <= valor_max)
+    if inicio_de is not None:
+        criteria.append(PCA.data_estimada_inicio >= inicio_de)
+    if inicio_ate is not None:
+        criteria.append(PCA.data_estimada_inicio <= inicio_ate)
+    if conclusao_de is not None:
+        criteria.append(PCA.data_estimada_conclusao >= conclusao_de)
+    if conclusao_ate is not None:
+        criteria.append(PCA.data_estimada_conclusao <= conclusao_ate)
+    return criteria
+
+
+def parse_sort(sort: Optional[str]) -> list:
+    """``"-valor_total,numero_contratacao"`` -> cláusulas ORDER BY (nulos por último)"""
+    clauses = []
+    for item in (sort or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name = item.lstrip("-+")
+        column = SORTABLE_FIELDS.get(name)
+        if column is None:
+            raise ValueError(f"Campo de ordenação inválido: {name}")
+        ordered = column.desc() if item.startswith("-") else column.asc()
+        clauses.append(ordered.nulls_last())
+    return clauses
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Campos pedidos (na ordem do schema) ou None para o registro completo"""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    invalid = sorted(requested - set(PROJECTABLE_FIELDS))
+    if invalid:
+        raise ValueError(f"Campos inválidos em 'fields': {', '.join(invalid)}")
+    requested.update(ALWAYS_PROJECTED)
+    return tuple(name for name in PROJECTABLE_FIELDS if name in requested)
+
+
+# Híbridas que dão NULL no SQL quando falta uma data; a propriedade Python dá
+# False. O coalesce fica só na projeção: nos filtros as expressões seguem
+# nuas para casar com os índices parciais de nao_iniciada.
+DATE_FLAG_FIELDS = ("atrasada", "vencida")
+
+
+def projection_columns(names: Sequence[str]) -> list:
+    columns = []
+    for name in names:
+        expr = getattr(PCA, name)
+        if name in DATE_FLAG_FIELDS:
+            expr = func.coalesce(expr, false())
+        columns.append(expr.label(name))
+    return columns
+
+
+@lru_cache(maxsize=64)
+def projection_adapter(names: Tuple[str, ...]) -> TypeAdapter:
+    """Lista de um subconjunto do PCASchema (mesma serialização de Decimal/datas)"""
+    definitions = {name: (PCASchema.model_fields[name].annotation, None) for name in names}
+    projection = create_model("PCAProjection", **definitions)
+    return TypeAdapter(List[projection])
+
+
+def serialize_projection(names: Tuple[str, ...], rows: Sequence) -> bytes:
+    adapter = projection_adapter(names)
+    return adapter.dump_json(adapter.validate_python([row._mapping for row in rows]))
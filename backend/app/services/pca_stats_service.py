@@ -0,0 +1,122 @@
+"""
+Indicadores do PCA calculados no banco.
+
+As regras de "não iniciada", atrasada e vencida ficam nas expressões
+híbridas de ``app.models.pca.PCA``; aqui elas são apenas agregadas, com ou
+sem filtro de ano, numa única consulta.
+"""
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.pca import PCA
+
+
+def _count(ano: Optional[int], *criteria):
+    query = select(func.count()).select_from(PCA).where(*criteria)
+    if ano is not None:
+        query = query.where(PCA.ano_pca == ano)
+    return query.scalar_subquery()
+
+
+def pca_status_counts(db: Session, ano: Optional[int] = None) -> Dict[str, int]:
+    """Total, atrasadas, vencidas e no prazo (opcionalmente de um ano do PCA)"""
+    # Um comando só, com uma subconsulta por indicador: atrasadas e vencidas
+    # usam os índices parciais sobre pca.nao_iniciada em vez de varrer a tabela
+    row = db.execute(
+        select(
+            _count(ano).label("total"),
+            _count(ano, PCA.atrasada).label("atrasadas"),
+            _count(ano, PCA.vencida).label("vencidas"),
+        )
+    ).one()
+
+    total = row.total or 0
+    atrasadas = row.atrasadas or 0
+    vencidas = row.vencidas or 0
+    return {
+        "total_pcas": total,
+        "pcas_atrasadas": atrasadas,
+        "pcas_vencidas": vencidas,
+        "pcas_no_prazo": total - atrasadas - vencidas,
+    }
+
+
+class ChartDimension(NamedTuple):
+    # Expressão agrupada (uma entrada em GROUPING SETS)
+    expr: Any
+    # Rótulo usado quando o valor é nulo
+    fallback: str
+    # Ordena pelo rótulo (séries temporais) em vez de pela medida
+    chronological: bool = False
+
+
+# Dimensões disponíveis para os gráficos; cada uma vira um conjunto em
+# GROUPING SETS, então uma nova dimensão não acrescenta varreduras na tabela
+CHART_DIMENSIONS: Dict[str, ChartDimension] = {
+    "situacao_execucao": ChartDimension(PCA.situacao_execucao, "Não iniciada"),
+    "categoria": ChartDimension(PCA.categoria_contratacao, "Não informada"),
+    "status_contratacao": ChartDimension(PCA.status_contratacao, "Não informado"),
+    "area_requisitante": ChartDimension(PCA.area_requisitante, "Não informada"),
+    "mes_inicio": ChartDimension(
+        func.to_char(PCA.data_estimada_inicio, "YYYY-MM"), "Sem data", chronological=True
+    ),
+}
+
+# Medidas calculadas para cada grupo
+CHART_MEASURES = {
+    "quantidade": func.count(PCA.id),
+    "valor_total": func.coalesce(func.sum(PCA.valor_total), 0),
+}
+
+# Gráfico do dashboard -> (dimensão, medida)
+CHARTS: Dict[str, Tuple[str, str]] = {
+    "situacao_execucao": ("situacao_execucao", "quantidade"),
+    "categoria": ("categoria", "quantidade"),
+    "status_contratacao": ("status_contratacao", "quantidade"),
+    "valor_por_categoria": ("categoria", "valor_total"),
+    "area_requisitante": ("area_requisitante", "quantidade"),
+    "mes_inicio": ("mes_inicio", "quantidade"),
+}
+
+
+def pca_chart_data(db: Session, ano: Optional[int] = None) -> Dict[str, list]:
+    """Dados dos gráficos do dashboard de planejamento (opcionalmente de um ano do PCA)"""
+    names = list(CHART_DIMENSIONS)
+    exprs = [CHART_DIMENSIONS[name].expr for name in names]
+
+    # Uma única varredura: GROUPING SETS ((situacao), (categoria), ...);
+    # GROUPING(expr) = 0 identifica a dimensão de cada linha do resultado
+    query = select(
+        *[expr.label(f"dim_{i}") for i, expr in enumerate(exprs)],
+        *[func.grouping(expr).label(f"grp_{i}") for i, expr in enumerate(exprs)],
+        *[measure.label(name) for name, measure in CHART_MEASURES.items()],
+    ).group_by(func.grouping_sets(*[tuple_(expr) for expr in exprs]))
+    if ano is not None:
+        query = query.where(PCA.ano_pca == ano)
+
+    groups: Dict[str, list] = {name: [] for name in names}
+    for row in db.execute(query).mappings():
+        for i, name in enumerate(names):
+            if row[f"grp_{i}"] == 0:
+                groups[name].append(row)
+                break
+
+    charts = {}
+    for chart, (dimension, measure) in CHARTS.items():
+        i = names.index(dimension)
+        spec = CHART_DIMENSIONS[dimension]
+        rows = groups[dimension]
+        if spec.chronological:
+            rows = sorted(rows, key=lambda r: (r[f"dim_{i}"] is None, r[f"dim_{i}"] or ""))
+        else:
+            rows = sorted(rows, key=lambda r: r[measure], reverse=True)
+        charts[chart] = [
+            {
+                "name": row[f"dim_{i}"] or spec.fallback,
+                "value": float(row[measure]) if measure == "valor_total" else row[measure],
+            }
+            for row in rows
+        ]
+    return charts
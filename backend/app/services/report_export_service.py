@@ -0,0 +1,318 @@
+"""
+Exportação dos relatórios de PCA, qualificação, licitação e economia.
+
+As linhas são lidas com cursor no servidor (``yield_per``), só com as colunas
+exportadas, e nunca ficam todas em memória:
+
+- Excel: workbook ``write_only`` do openpyxl gravado num arquivo temporário
+  que só vai para o disco acima de ``EXPORT_SPOOL_MAX_MEMORY``, depois
+  enviado em blocos;
+- CSV: gerador que emite os bytes à medida que as linhas chegam do cursor;
+- Parquet: grupos de linhas colunares emitidos assim que cada um é gravado
+  (pyarrow, importado só quando o formato é pedido).
+
+Os geradores de CSV/Parquet abrem a própria sessão: rodam depois que a rota
+retornou e a sessão da requisição já foi fechada.
+"""
+import csv
+import importlib.util
+import io
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Sequence
+
+from openpyxl import Workbook
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.licitacao import Licitacao
+from app.models.pca import PCA
+from app.models.qualificacao import Qualificacao
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Linhas buscadas por ida ao banco
+EXPORT_FETCH_SIZE = 2000
+# Acima disto o arquivo temporário passa da memória para o disco
+EXPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+# Tamanho dos blocos enviados ao cliente
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Linhas por grupo (row group) do Parquet
+PARQUET_ROW_GROUP_SIZE = 50000
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+def _money(value) -> float:
+    return float(value) if value else 0
+
+
+def _date_br(value):
+    return value.strftime('%d/%m/%Y') if value else None
+
+
+def _naive(value):
+    # Excel não aceita datas com fuso horário
+    return value.replace(tzinfo=None) if value else None
+
+
+def _yes_no(value) -> str:
+    return "Sim" if value else "Não"
+
+
+def _enum_value(value):
+    return value.value if value is not None else None
+
+
+def _same(value):
+    return value
+
+
+class ExportColumn(NamedTuple):
+    header: str
+    expr: Any
+    convert: Callable[[Any], Any] = _same
+
+
+class ExportSpec(NamedTuple):
+    model: Any
+    sheet: str
+    filename: str
+    columns: Sequence[ExportColumn]
+    criteria: Sequence[Any] = ()
+
+
+# Percentual de economia sobre o estimado, calculado no banco
+ECONOMIA_PERCENTUAL = case(
+    (Licitacao.valor_estimado > 0, func.round(Licitacao.economia / Licitacao.valor_estimado * 100, 2)),
+    else_=0,
+)
+
+
+EXPORT_SPECS: Dict[str, ExportSpec] = {
+    "pca": ExportSpec(PCA, "PCA Report", "pca_report", (
+        ExportColumn("Número Contratação", PCA.numero_contratacao),
+        ExportColumn("Status", PCA.status_contratacao),
+        ExportColumn("Situação Execução", PCA.situacao_execucao),
+        ExportColumn("Título", PCA.titulo_contratacao),
+        ExportColumn("Categoria", PCA.categoria_contratacao),
+        ExportColumn("Valor Total", PCA.valor_total, _money),
+        ExportColumn("Área Requisitante", PCA.area_requisitante),
+        ExportColumn("Número DFD", PCA.numero_dfd),
+        ExportColumn("Data Início", PCA.data_estimada_inicio, _date_br),
+        ExportColumn("Data Conclusão", PCA.data_estimada_conclusao, _date_br),
+        ExportColumn("Atrasada", PCA.atrasada, _yes_no),
+        ExportColumn("Criado em", PCA.created_at, _naive),
+    )),
+    "qualificacao": ExportSpec(Qualificacao, "Qualificação Report", "qualificacao_report", (
+        ExportColumn("NUP", Qualificacao.nup),
+        ExportColumn("Número Contratação", Qualificacao.numero_contratacao),
+        ExportColumn("Área Demandante", Qualificacao.area_demandante),
+        ExportColumn("Responsável Instrução", Qualificacao.responsavel_instrucao),
+        ExportColumn("Modalidade", Qualificacao.modalidade),
+        ExportColumn("Objeto", Qualificacao.objeto),
+        ExportColumn("Palavra Chave", Qualificacao.palavra_chave),
+        ExportColumn("Valor Estimado", Qualificacao.valor_estimado, _money),
+        ExportColumn("Status", Qualificacao.status, _enum_value),
+        ExportColumn("Observações", Qualificacao.observacoes),
+        ExportColumn("Criado em", Qualificacao.created_at, _naive),
+    )),
+    "licitacao": ExportSpec(Licitacao, "Licitação Report", "licitacao_report", (
+        ExportColumn("NUP", Licitacao.nup),
+        ExportColumn("Número Contratação", Licitacao.numero_contratacao),
+        ExportColumn("Área Demandante", Licitacao.area_demandante),
+        ExportColumn("Responsável Instrução", Licitacao.responsavel_instrucao),
+        ExportColumn("Modalidade", Licitacao.modalidade),
+        ExportColumn("Objeto", Licitacao.objeto),
+        ExportColumn("Palavra Chave", Licitacao.palavra_chave),
+        ExportColumn("Valor Estimado", Licitacao.valor_estimado, _money),
+        ExportColumn("Pregoeiro", Licitacao.pregoeiro),
+        ExportColumn("Valor Homologado", Licitacao.valor_homologado, _money),
+        ExportColumn("Data Homologação", Licitacao.data_homologacao, _date_br),
+        ExportColumn("Link", Licitacao.link),
+        ExportColumn("Status", Licitacao.status, _enum_value),
+        ExportColumn("Economia", Licitacao.economia, _money),
+        ExportColumn("Observações", Licitacao.observacoes),
+        ExportColumn("Criado em", Licitacao.created_at, _naive),
+    )),
+    "economia": ExportSpec(Licitacao, "Relatório de Economia", "economia_report", (
+        ExportColumn("NUP", Licitacao.nup),
+        ExportColumn("Número Contratação", Licitacao.numero_contratacao),
+        ExportColumn("Objeto", Licitacao.objeto),
+        ExportColumn("Valor Estimado", Licitacao.valor_estimado, _money),
+        ExportColumn("Valor Homologado", Licitacao.valor_homologado, _money),
+        ExportColumn("Economia (R$)", Licitacao.economia, _money),
+        ExportColumn("Percentual Economia (%)", ECONOMIA_PERCENTUAL, _money),
+        ExportColumn("Data Homologação", Licitacao.data_homologacao, _date_br),
+        ExportColumn("Status", Licitacao.status, _enum_value),
+    ), criteria=(Licitacao.economia.isnot(None), Licitacao.economia > 0)),
+}
+
+
+def iter_export_rows(db: Session, spec: ExportSpec) -> Iterator[List[Any]]:
+    """Linhas já convertidas, lidas em lotes por cursor no servidor"""
+    query = (
+        select(*[column.expr for column in spec.columns])
+        .where(*spec.criteria)
+        .order_by(spec.model.created_at, spec.model.id)
+        .execution_options(yield_per=EXPORT_FETCH_SIZE)
+    )
+    converters = [column.convert for column in spec.columns]
+    for row in db.execute(query):
+        yield [convert(value) for convert, value in zip(converters, row)]
+
+
+def export_records(db: Session, spec: ExportSpec) -> List[Dict[str, Any]]:
+    """Mesmas linhas como dicionários (resposta JSON)"""
+    headers = [column.header for column in spec.columns]
+    return [dict(zip(headers, values)) for values in iter_export_rows(db, spec)]
+
+
+def build_xlsx(db: Session, spec: ExportSpec):
+    """Grava a planilha num SpooledTemporaryFile posicionado no início"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(spec.sheet)
+    sheet.append([column.header for column in spec.columns])
+    for values in iter_export_rows(db, spec):
+        sheet.append(values)
+
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY, suffix=".xlsx")
+    try:
+        workbook.save(output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+def iter_file_chunks(fileobj, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Lê o arquivo em blocos e o fecha ao final (ou se o cliente desconectar)"""
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def export_filename(spec: ExportSpec, extension: str) -> str:
+    return f"{spec.filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+
+def stream_csv(spec: ExportSpec, flush_rows: int = EXPORT_FETCH_SIZE) -> Iterator[bytes]:
+    """CSV (;, UTF-8 com BOM, como a importação aceita) emitido a cada lote do cursor"""
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
+        writer.writerow([column.header for column in spec.columns])
+        # Cabeçalho sai antes da primeira ida ao banco
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+        pending = 0
+        for values in iter_export_rows(db, spec):
+            writer.writerow(values)
+            pending += 1
+            if pending >= flush_rows:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class _ChunkSink:
+    """Destino de escrita do pyarrow que acumula bytes para serem drenados"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_type(pa, column: ExportColumn):
+    # Tipo fixo por coluna: um lote só com nulos não pode mudar o schema
+    if column.convert is _money:
+        return pa.float64()
+    if column.convert is _naive:
+        return pa.timestamp("us")
+    if column.convert in (_date_br, _yes_no, _enum_value):
+        return pa.string()
+    python_type = column.expr.type.python_type
+    if issubclass(python_type, bool):
+        return pa.bool_()
+    if issubclass(python_type, int):
+        return pa.int64()
+    if issubclass(python_type, (float, Decimal)):
+        return pa.float64()
+    if issubclass(python_type, datetime):
+        return pa.timestamp("us")
+    if issubclass(python_type, date):
+        return pa.date32()
+    return pa.string()
+
+
+def stream_parquet(spec: ExportSpec, row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> Iterator[bytes]:
+    """Parquet emitido grupo a grupo; o rodapé (metadados) sai no final"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.header, _arrow_type(pa, column)) for column in spec.columns])
+    sink = _ChunkSink()
+    db = SessionLocal()
+    try:
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+        # Assinatura "PAR1" sai antes da primeira ida ao banco
+        yield sink.drain()
+        columns: List[List[Any]] = [[] for _ in spec.columns]
+        rows = 0
+        for values in iter_export_rows(db, spec):
+            for target, value in zip(columns, values):
+                target.append(value)
+            rows += 1
+            if rows >= row_group_size:
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                columns = [[] for _ in spec.columns]
+                rows = 0
+                yield sink.drain()
+        if rows:
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        writer.close()
+        yield sink.drain()
+    finally:
+        db.close()
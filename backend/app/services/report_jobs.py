@@ -0,0 +1,258 @@
+"""
+Geração do relatório customizado (PDF) em segundo plano.
+
+Cada pedido é identificado pelo hash do ``CustomReportRequest`` normalizado;
+esse hash é o id do job. O estado (``<id>.json``) e o PDF (``<id>.pdf``) ficam
+em ``settings.report_store_dir``, de modo que qualquer worker do gunicorn
+consiga responder ao polling e ao download. Pedidos idênticos dentro de
+``report_store_ttl_seconds`` reaproveitam o mesmo job e o mesmo arquivo.
+
+O diretório é limitado em quantidade e em bytes: a cada novo job os vencidos
+são removidos e, se ainda passar do limite, os concluídos mais antigos.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.report_workers),
+    thread_name_prefix="report-pdf",
+)
+
+STATUS_PENDING = "PENDENTE"
+STATUS_RUNNING = "PROCESSANDO"
+STATUS_DONE = "CONCLUIDO"
+STATUS_ERROR = "ERRO"
+
+
+def report_key(payload: Dict[str, Any]) -> str:
+    """Hash estável do pedido (a ordem de campos e gráficos é preservada)"""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _store_dir() -> str:
+    os.makedirs(settings.report_store_dir, exist_ok=True)
+    return settings.report_store_dir
+
+
+def _meta_path(key: str) -> str:
+    return os.path.join(_store_dir(), f"{key}.json")
+
+
+def _pdf_path(key: str) -> str:
+    return os.path.join(_store_dir(), f"{key}.pdf")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # Arquivo temporário no mesmo diretório + rename: leitores nunca veem conteúdo parcial
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        _unlink(tmp_path)
+        raise
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _load_meta(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_meta_path(key), "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_meta(meta: Dict[str, Any]) -> None:
+    meta["updated_at"] = time.time()
+    _write_atomic(_meta_path(meta["id"]), json.dumps(meta).encode("utf-8"))
+
+
+def _update_meta(key: str, **changes: Any) -> Dict[str, Any]:
+    meta = _load_meta(key) or {"id": key, "created_at": time.time()}
+    meta.update(changes)
+    _save_meta(meta)
+    return meta
+
+
+def _remove(key: str) -> None:
+    _unlink(_pdf_path(key))
+    _unlink(_meta_path(key))
+
+
+def _expired(meta: Dict[str, Any], now: float) -> bool:
+    return meta.get("created_at", 0) + settings.report_store_ttl_seconds < now
+
+
+def _stalled(meta: Dict[str, Any], now: float) -> bool:
+    # Job de um worker que morreu no meio da geração
+    return (
+        meta.get("status") in (STATUS_PENDING, STATUS_RUNNING)
+        and meta.get("updated_at", 0) + settings.report_job_timeout_seconds < now
+    )
+
+
+def get_report_job(key: str) -> Optional[Dict[str, Any]]:
+    meta = _load_meta(key)
+    if meta is None:
+        return None
+    if _expired(meta, time.time()):
+        _remove(key)
+        return None
+    return meta
+
+
+def report_file(key: str) -> Optional[str]:
+    """Caminho do PDF pronto, ou None"""
+    meta = get_report_job(key)
+    if meta is None or meta.get("status") != STATUS_DONE:
+        return None
+    path = _pdf_path(key)
+    return path if os.path.exists(path) else None
+
+
+def evict_reports(incoming_bytes: int = 0) -> None:
+    """
+    Remove vencidos e, acima dos limites, os concluídos mais antigos. Chamado
+    logo antes de uma nova entrada ser criada: reserva a vaga dela (e
+    ``incoming_bytes``, quando o tamanho já é conhecido).
+    """
+    now = time.time()
+    directory = _store_dir()
+    entries: List[Dict[str, Any]] = []
+    known = set()
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        key = name[:-len(".json")]
+        meta = _load_meta(key)
+        if meta is None:
+            continue
+        if _expired(meta, now):
+            _remove(key)
+            continue
+        entries.append(meta)
+        known.add(key)
+
+    # PDFs sem estado e temporários abandonados
+    for name in os.listdir(directory):
+        if name.endswith(".json") or os.path.splitext(name)[0] in known:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) + settings.report_store_ttl_seconds < now:
+                os.unlink(path)
+        except OSError:
+            pass
+
+    done = sorted(
+        (meta for meta in entries if meta.get("status") == STATUS_DONE),
+        key=lambda meta: meta.get("finished_at") or meta.get("created_at", 0),
+    )
+    count = len(entries)
+    total_bytes = sum(meta.get("size") or 0 for meta in done) + incoming_bytes
+    while done and (count >= settings.report_store_max_entries or total_bytes > settings.report_store_max_bytes):
+        oldest = done.pop(0)
+        _remove(oldest["id"])
+        count -= 1
+        total_bytes -= oldest.get("size") or 0
+
+
+def store_report(key: str, filename: str, content: bytes) -> Dict[str, Any]:
+    """Grava um PDF pronto (geração síncrona ou pelo job)"""
+    if _load_meta(key) is None:
+        # Geração síncrona: entrada nova, que não passou por submit_report_job
+        evict_reports(len(content))
+    _write_atomic(_pdf_path(key), content)
+    return _update_meta(
+        key,
+        status=STATUS_DONE,
+        filename=filename,
+        size=len(content),
+        message="Relatório gerado",
+        finished_at=time.time(),
+    )
+
+
+def submit_report_job(
+    key: str,
+    filename: str,
+    render: Callable[[Session], bytes],
+) -> Dict[str, Any]:
+    """Devolve o job existente para o pedido ou agenda um novo"""
+    now = time.time()
+    meta = get_report_job(key)
+    if meta is not None and meta.get("status") != STATUS_ERROR and not _stalled(meta, now):
+        return meta
+    if meta is not None:
+        _remove(key)
+
+    evict_reports()
+    meta = {"id": key, "status": STATUS_PENDING, "filename": filename, "created_at": now, "updated_at": now}
+    try:
+        # O_EXCL: só um worker assume a geração de um mesmo pedido
+        fd = os.open(_meta_path(key), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return get_report_job(key) or meta
+    with os.fdopen(fd, "wb") as f:
+        f.write(json.dumps(meta).encode("utf-8"))
+
+    _executor.submit(_run_report_job, key, filename, render)
+    return meta
+
+
+def _run_report_job(key: str, filename: str, render: Callable[[Session], bytes]) -> None:
+    db = SessionLocal()
+    try:
+        _update_meta(key, status=STATUS_RUNNING, started_at=time.time())
+        content = render(db)
+        store_report(key, filename, content)
+    except HTTPException as e:
+        _update_meta(key, status=STATUS_ERROR, message=str(e.detail), finished_at=time.time())
+    except Exception as e:
+        import traceback
+        print(f"[REPORT JOB {key[:12]}] ERRO: {traceback.format_exc()}")
+        try:
+            _update_meta(key, status=STATUS_ERROR, message=f"Erro ao gerar relatório: {str(e)}", finished_at=time.time())
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+def report_job_to_dict(meta: Dict[str, Any]) -> Dict[str, Any]:
+    created_at = meta.get("created_at")
+    return {
+        "id": meta["id"],
+        "status": meta.get("status"),
+        "filename": meta.get("filename"),
+        "size": meta.get("size"),
+        "message": meta.get("message"),
+        "created_at": _iso(created_at),
+        "started_at": _iso(meta.get("started_at")),
+        "finished_at": _iso(meta.get("finished_at")),
+        "expires_at": _iso(created_at + settings.report_store_ttl_seconds if created_at else None),
+    }
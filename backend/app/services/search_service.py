@@ -0,0 +1,106 @@
+"""
+Busca unificada em PCA, qualificações e licitações.
+
+Cada fonte contribui com um SELECT que casa o termo por texto completo
+(``search_vector @@ websearch_to_tsquery``) ou por trigramas
+(``search_text LIKE '%termo%'``), ambos atendidos pelos índices GIN. As fontes
+são unidas (UNION ALL), ordenadas pela relevância e paginadas; o
+``ts_headline``, que é caro, só é calculado para as linhas da página.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, String, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.licitacao import Licitacao
+from app.models.pca import PCA
+from app.models.qualificacao import Qualificacao
+from app.models.search import SEARCH_CONFIG
+
+
+class SearchSource(NamedTuple):
+    model: Any
+    # Identificador exibido (número da contratação / NUP)
+    referencia: Any
+    # Texto principal, usado no destaque
+    documento: Any
+    ano: Any
+
+
+SEARCH_SOURCES: Dict[str, SearchSource] = {
+    "pca": SearchSource(PCA, PCA.numero_contratacao, PCA.titulo_contratacao, PCA.ano_pca),
+    "qualificacao": SearchSource(Qualificacao, Qualificacao.nup, Qualificacao.objeto, Qualificacao.ano),
+    "licitacao": SearchSource(Licitacao, Licitacao.nup, Licitacao.objeto, Licitacao.ano),
+}
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2"
+
+
+def escape_like(value: str) -> str:
+    """Escapa os curingas do LIKE (usar com ``escape='\\'``)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search(
+    db: Session,
+    termo: str,
+    tipos: Optional[Sequence[str]] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Resultados ranqueados (com destaque) e se há mais páginas"""
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    tsquery = func.websearch_to_tsquery(config, literal(termo, String))
+    normalized = func.public.f_unaccent(func.lower(literal(termo, String)))
+    # % e _ digitados pelo usuário são texto literal, não curingas
+    escaped = func.public.f_unaccent(func.lower(literal(escape_like(termo), String)))
+    pattern = literal("%") + escaped + literal("%")
+
+    selects = []
+    # Tipos repetidos (?tipo=pca&tipo=pca) duplicariam os resultados no UNION ALL
+    for tipo in dict.fromkeys(tipos or SEARCH_SOURCES):
+        source = SEARCH_SOURCES[tipo]
+        model = source.model
+        rank = func.greatest(
+            func.ts_rank(model.search_vector, tsquery),
+            func.word_similarity(normalized, model.search_text),
+        )
+        selects.append(
+            select(
+                literal(tipo, String).label("tipo"),
+                model.id.label("id"),
+                source.referencia.label("referencia"),
+                source.documento.label("documento"),
+                source.ano.cast(Integer).label("ano"),
+                rank.label("rank"),
+            ).where(or_(model.search_vector.op("@@")(tsquery), model.search_text.like(pattern, escape="\\")))
+        )
+
+    # Uma linha a mais indica se existe próxima página
+    page = (
+        union_all(*selects)
+        .order_by(literal_column("rank").desc(), literal_column("tipo"), literal_column("id"))
+        .offset(skip)
+        .limit(limit + 1)
+        .subquery("page")
+    )
+    rows = db.execute(
+        select(
+            page,
+            func.ts_headline(config, func.coalesce(page.c.documento, ""), tsquery, HEADLINE_OPTIONS).label("destaque"),
+        ).order_by(page.c.rank.desc(), page.c.tipo, page.c.id)
+    ).all()
+
+    results = [
+        {
+            "tipo": row.tipo,
+            "id": str(row.id),
+            "referencia": row.referencia,
+            "titulo": row.documento,
+            "ano": row.ano,
+            "rank": round(float(row.rank or 0), 4),
+            "destaque": row.destaque,
+        }
+        for row in rows[:limit]
+    ]
+    return results, len(rows) > limit
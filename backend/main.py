@@ -6,7 +6,8 @@ for your editor to resolve imports.
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import auth, planejamento, qualificacao, licitacao, reports, access_requests, activity, dashboards
+from app.core.cache import cache_stats, start_invalidation_listener, stop_invalidation_listener
+from app.api.v1 import auth, planejamento, qualificacao, licitacao, reports, access_requests, activity, dashboards, search
 
 app = FastAPI(
     title="Sistema de Gestão de Contratações Públicas",
@@ -26,6 +27,8 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos de paginação/versão lidos pelo frontend
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Estimate"],
 )
 
 # Include routers
@@ -37,6 +40,17 @@ app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
 app.include_router(access_requests.router, prefix="/api/v1/access-requests", tags=["access-requests"])
 app.include_router(activity.router, prefix="/api/v1/activity", tags=["activity"])
 app.include_router(dashboards.router, prefix="/api/v1/dashboards", tags=["dashboards"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
+
+
+@app.on_event("startup")
+def start_cache_listener():
+    start_invalidation_listener()
+
+
+@app.on_event("shutdown")
+def stop_cache_listener():
+    stop_invalidation_listener()
 
 
 @app.get("/")
@@ -48,6 +62,12 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/health/cache")
+async def health_cache():
+    """Contadores do cache deste worker (hits, misses, evicções, invalidações)"""
+    return cache_stats()
+
 # Static files (e.g., avatars)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
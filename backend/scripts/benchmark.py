@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos endpoints mais pesados contra uma API local.
+
+Mede importações (CSV/Excel), estatísticas de dashboard, exportações de
+relatório e listagens, e grava o resultado em JSON para comparar execuções.
+Pensado para rodar depois de ``generate_synthetic_data.py``.
+
+Uso (a partir de backend/, com a API rodando):
+    python scripts/benchmark.py --csv /tmp/pca.csv --xlsx /tmp/pca.xlsx
+    python scripts/benchmark.py --only dashboard --runs 10 --compare benchmark_results/anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results")
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# (nome, método, caminho, parâmetros de query, corpo JSON)
+READ_SCENARIOS = [
+    ("pca_list", "GET", "/api/v1/pca/", {"limit": 1000}, None),
+    ("pca_list_ano", "GET", "/api/v1/pca/", {"limit": 1000, "ano": 2025}, None),
+    ("pca_atrasadas", "GET", "/api/v1/pca/atrasadas", None, None),
+    ("pca_vencidas", "GET", "/api/v1/pca/vencidas", None, None),
+    ("pca_dashboard_stats", "GET", "/api/v1/pca/dashboard/stats", None, None),
+    ("pca_dashboard_stats_ano", "GET", "/api/v1/pca/dashboard/stats", {"ano": 2025}, None),
+    ("pca_dashboard_charts", "GET", "/api/v1/pca/dashboard/charts", None, None),
+    ("qualificacao_list", "GET", "/api/v1/qualificacao/", {"limit": 1000}, None),
+    ("licitacao_list", "GET", "/api/v1/licitacao/", {"limit": 1000}, None),
+    ("licitacao_dashboard_stats", "GET", "/api/v1/licitacao/dashboard/stats", None, None),
+    ("usuarios_list", "GET", "/api/v1/auth/users", None, None),
+    ("activity_recent", "GET", "/api/v1/activity/recent", None, None),
+    ("report_pca_excel", "GET", "/api/v1/reports/pca", {"format": "excel"}, None),
+    ("report_qualificacao_excel", "GET", "/api/v1/reports/qualificacao", {"format": "excel"}, None),
+    ("report_licitacao_excel", "GET", "/api/v1/reports/licitacao", {"format": "excel"}, None),
+    ("report_economia_excel", "GET", "/api/v1/reports/economia", {"format": "excel"}, None),
+    ("report_custom_pdf", "POST", "/api/v1/reports/custom", None, {
+        "dataSource": "pca",
+        "selectedFields": ["numero_contratacao", "titulo_contratacao", "valor_total", "area_requisitante"],
+        "charts": ["status_distribution", "value_timeline"],
+        "filters": {},
+    }),
+]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "desconhecido"
+
+
+def login(session: requests.Session, base_url: str, email: str, password: str) -> None:
+    response = session.post(f"{base_url}/api/v1/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    session.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+def summarize(name: str, timings, statuses, sizes) -> dict:
+    ordered = sorted(timings)
+    p95_index = max(0, int(round(len(ordered) * 0.95)) - 1)
+    return {
+        "name": name,
+        "runs": len(ordered),
+        "status": sorted(set(statuses)),
+        "bytes": max(sizes) if sizes else 0,
+        "min_ms": round(ordered[0], 1),
+        "median_ms": round(statistics.median(ordered), 1),
+        "mean_ms": round(statistics.fmean(ordered), 1),
+        "p95_ms": round(ordered[p95_index], 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+def run_scenario(session: requests.Session, base_url: str, scenario, runs: int, warmup: int, timeout: float) -> dict:
+    name, method, path, params, body = scenario
+    timings, statuses, sizes = [], [], []
+    for attempt in range(warmup + runs):
+        started = time.perf_counter()
+        response = session.request(method, f"{base_url}{path}", params=params, json=body, timeout=timeout)
+        content = response.content
+        elapsed = (time.perf_counter() - started) * 1000
+        if attempt < warmup:
+            continue
+        timings.append(elapsed)
+        statuses.append(response.status_code)
+        sizes.append(len(content))
+    return summarize(name, timings, statuses, sizes)
+
+
+def run_upload(session: requests.Session, base_url: str, name: str, path: str, file_path: str,
+               mime: str, form: dict, runs: int, timeout: float) -> dict:
+    timings, statuses, sizes = [], [], []
+    for _ in range(runs):
+        with open(file_path, "rb") as fh:
+            started = time.perf_counter()
+            response = session.post(
+                f"{base_url}{path}",
+                files={"file": (os.path.basename(file_path), fh, mime)},
+                data=form,
+                timeout=timeout,
+            )
+            content = response.content
+            timings.append((time.perf_counter() - started) * 1000)
+        statuses.append(response.status_code)
+        sizes.append(len(content))
+    result = summarize(name, timings, statuses, sizes)
+    result["file_bytes"] = os.path.getsize(file_path)
+    return result
+
+
+def upload_scenarios(args):
+    scenarios = []
+    if args.csv:
+        scenarios.append(("import_csv_dry_run", "/api/v1/pca/import-csv", args.csv, "text/csv", {"dry_run": "true"}))
+        scenarios.append(("import_csv", "/api/v1/pca/import-csv", args.csv, "text/csv", {}))
+    if args.xlsx:
+        scenarios.append(("import_xlsx_dry_run", "/api/v1/pca/import", args.xlsx, XLSX_MIME, {"dry_run": "true"}))
+        scenarios.append(("import_xlsx", "/api/v1/pca/import", args.xlsx, XLSX_MIME, {}))
+    return scenarios
+
+
+def print_comparison(results, previous_path: str) -> None:
+    with open(previous_path, encoding="utf-8") as fh:
+        previous = {item["name"]: item for item in json.load(fh)["results"]}
+    print(f"\nComparação com {previous_path} (mediana):")
+    for item in results:
+        before = previous.get(item["name"])
+        if not before or not before["median_ms"]:
+            print(f"  {item['name']:<32} {item['median_ms']:>10.1f} ms   (novo)")
+            continue
+        delta = (item["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+        print(f"  {item['name']:<32} {before['median_ms']:>10.1f} -> {item['median_ms']:>10.1f} ms   {delta:+6.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dos endpoints da API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="bench0000@bench.local")
+    parser.add_argument("--password", default="bench123")
+    parser.add_argument("--runs", type=int, default=5, help="execuções medidas por endpoint de leitura")
+    parser.add_argument("--warmup", type=int, default=1, help="execuções descartadas antes da medição")
+    parser.add_argument("--import-runs", type=int, default=1, help="execuções por cenário de importação")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--csv", help="arquivo CSV para os cenários de importação")
+    parser.add_argument("--xlsx", help="planilha para os cenários de importação")
+    parser.add_argument("--only", nargs="+", help="executa apenas cenários cujo nome contenha um destes termos")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    def selected(name: str) -> bool:
+        return not args.only or any(term in name for term in args.only)
+
+    session = requests.Session()
+    login(session, args.base_url, args.email, args.password)
+
+    started_at = datetime.now()
+    results = []
+    for scenario in READ_SCENARIOS:
+        if not selected(scenario[0]):
+            continue
+        result = run_scenario(session, args.base_url, scenario, args.runs, args.warmup, args.timeout)
+        print(f"{result['name']:<32} mediana {result['median_ms']:>10.1f} ms  p95 {result['p95_ms']:>10.1f} ms  status {result['status']}")
+        results.append(result)
+
+    for name, path, file_path, mime, form in upload_scenarios(args):
+        if not selected(name):
+            continue
+        result = run_upload(session, args.base_url, name, path, file_path, mime, form, args.import_runs, args.timeout)
+        print(f"{result['name']:<32} mediana {result['median_ms']:>10.1f} ms  status {result['status']}")
+        results.append(result)
+
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "base_url": args.base_url,
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "host": platform.node(),
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "results": results,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    output = os.path.join(args.output_dir, f"benchmark-{started_at:%Y%m%d-%H%M%S}-{report['git_commit']}.json")
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Gera uma massa de dados sintética (Faker pt_BR) para testes de carga.
+
+Preenche usuarios, pca, qualificacoes, licitacoes e activity_events com dados
+encadeados (qualificação aponta para uma contratação, licitação para uma
+qualificação) e, opcionalmente, grava a mesma lista de contratações nos
+formatos CSV e Excel aceitos pela importação do PCA.
+
+Uso (a partir de backend/):
+    python scripts/generate_synthetic_data.py --pca 100000 --anos 2023 2024 2025
+    python scripts/generate_synthetic_data.py --pca 10000 --csv /tmp/pca.csv --xlsx /tmp/pca.xlsx --no-db
+
+A carga usa COPY em lotes, então 1M de contratações cabe em poucos minutos
+num Postgres local. Use apenas em bancos de desenvolvimento.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from faker import Faker
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.security import get_password_hash
+from app.services.pca_import_service import compute_content_hash
+
+# Linhas enviadas por COPY
+COPY_BATCH_SIZE = 20000
+
+# Domínio dos e-mails gerados; usado também pelo --reset
+SYNTHETIC_EMAIL_DOMAIN = "bench.local"
+SYNTHETIC_PASSWORD = "bench123"
+
+NIVEIS = ["COORDENADOR", "DIPLAN", "DIQUALI", "DIPLI", "VISITANTE"]
+STATUS_CONTRATACAO = ["Aprovada", "Em elaboração", "Aguardando aprovação", "Revisada", "Cancelada"]
+SITUACOES = ["Não iniciada"] * 4 + ["Em andamento"] * 3 + ["Concluída"] * 2 + ["Suspensa", ""]
+CATEGORIAS = ["Bens", "Serviços", "Serviços de TIC", "Obras", "Serviços de Engenharia"]
+AREAS = [
+    "Diretoria de Planejamento",
+    "Diretoria de Gestão de Pessoas",
+    "Diretoria de Tecnologia da Informação",
+    "Coordenação de Logística",
+    "Coordenação de Contratos",
+    "Secretaria Executiva",
+    "Assessoria de Comunicação",
+    "Coordenação de Infraestrutura",
+    "Ouvidoria",
+    "Gabinete",
+]
+MODALIDADES = ["Pregão Eletrônico", "Dispensa", "Inexigibilidade", "Concorrência", "Adesão a ARP"]
+STATUS_LICITACAO = ["HOMOLOGADA"] * 5 + ["EM_ANDAMENTO"] * 3 + ["FRACASSADA", "REVOGADA"]
+
+# Cabeçalho do CSV do sistema federal: 26 colunas, só algumas são lidas
+CSV_COLUMNS = 26
+CSV_POSITIONS = {
+    'numero_contratacao': 0,
+    'status_contratacao': 1,
+    'situacao_execucao': 2,
+    'titulo_contratacao': 3,
+    'categoria_contratacao': 4,
+    'data_estimada_inicio': 6,
+    'data_estimada_conclusao': 7,
+    'area_requisitante': 9,
+    'numero_dfd': 10,
+    'valor_total': 24,
+}
+EXCEL_HEADER = [
+    ('Número da Contratação', 'numero_contratacao'),
+    ('Status da Contratação', 'status_contratacao'),
+    ('Situação da Execução', 'situacao_execucao'),
+    ('Título da Contratação', 'titulo_contratacao'),
+    ('Categoria da Contratação', 'categoria_contratacao'),
+    ('Valor Total', 'valor_total'),
+    ('Área Requisitante', 'area_requisitante'),
+    ('Número DFD', 'numero_dfd'),
+    ('Data Estimada de Início', 'data_estimada_inicio'),
+    ('Data Estimada de Conclusão', 'data_estimada_conclusao'),
+]
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\\', '\\\\').replace('\t', ' ').replace('\n', ' ').replace('\r', ' ')
+
+
+def copy_rows(conn, table: str, columns, rows) -> None:
+    """Envia as linhas com COPY ... FROM STDIN em lotes"""
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    with conn.cursor() as cursor:
+        for start in range(0, len(rows), COPY_BATCH_SIZE):
+            buffer = io.StringIO()
+            for row in rows[start:start + COPY_BATCH_SIZE]:
+                buffer.write('\t'.join(_copy_value(value) for value in row))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+
+
+def _timestamp(rng: random.Random, year: int) -> datetime:
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+    return start + timedelta(seconds=rng.randint(0, 364 * 86400))
+
+
+def generate_users(fake: Faker, rng: random.Random, count: int):
+    password_hash = get_password_hash(SYNTHETIC_PASSWORD)
+    users = []
+    for index in range(count):
+        nivel = "COORDENADOR" if index == 0 else rng.choice(NIVEIS)
+        users.append({
+            "id": uuid.uuid4(),
+            "username": f"bench{index:04d}",
+            "email": f"bench{index:04d}@{SYNTHETIC_EMAIL_DOMAIN}",
+            "password_hash": password_hash,
+            "nivel_acesso": nivel,
+            "nome_completo": fake.name(),
+            "ativo": True,
+            "created_at": _timestamp(rng, 2023),
+        })
+    return users
+
+
+def generate_pcas(fake: Faker, rng: random.Random, count: int, anos, writers):
+    titulos = [fake.catch_phrase() for _ in range(500)]
+    objetos = ["Aquisição de", "Contratação de", "Prestação de serviços de", "Manutenção de", "Locação de"]
+    pcas = []
+    for index in range(count):
+        ano = anos[index % len(anos)]
+        inicio = date(ano, 1, 1) + timedelta(days=rng.randint(0, 330))
+        record = {
+            "numero_contratacao": f"{index // len(anos) + 1}/{ano}",
+            "status_contratacao": rng.choice(STATUS_CONTRATACAO),
+            "situacao_execucao": rng.choice(SITUACOES) or None,
+            "titulo_contratacao": f"{rng.choice(objetos)} {rng.choice(titulos).lower()}",
+            "categoria_contratacao": rng.choice(CATEGORIAS),
+            "valor_total": Decimal(rng.randint(1_000_00, 5_000_000_00)) / 100,
+            "area_requisitante": rng.choice(AREAS),
+            "numero_dfd": f"{rng.randint(1, 9999)}/{ano}",
+            "data_estimada_inicio": inicio,
+            "data_estimada_conclusao": inicio + timedelta(days=rng.randint(30, 300)),
+        }
+        created_at = _timestamp(rng, ano)
+        updated_at = created_at + timedelta(days=rng.randint(1, 60)) if rng.random() < 0.3 else None
+        pcas.append({
+            **record,
+            "id": uuid.uuid4(),
+            "ano_pca": ano,
+            "content_hash": compute_content_hash(record),
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "created_by": rng.choice(writers)["id"],
+        })
+    return pcas
+
+
+def generate_qualificacoes(fake: Faker, rng: random.Random, pcas, ratio: float, writers):
+    qualificacoes = []
+    for index, pca in enumerate(rng.sample(pcas, int(len(pcas) * ratio))):
+        qualificacoes.append({
+            "id": uuid.uuid4(),
+            "nup": f"25000.{index + 1:06d}/{pca['ano_pca']}-{rng.randint(10, 99)}",
+            "numero_contratacao": pca["numero_contratacao"],
+            "ano": pca["ano_pca"],
+            "area_demandante": pca["area_requisitante"],
+            "responsavel_instrucao": fake.name(),
+            "modalidade": rng.choice(MODALIDADES),
+            "objeto": pca["titulo_contratacao"],
+            "palavra_chave": fake.word(),
+            "valor_estimado": pca["valor_total"],
+            "status": "CONCLUIDO" if rng.random() < 0.6 else "EM_ANALISE",
+            "observacoes": fake.sentence() if rng.random() < 0.2 else None,
+            "created_at": pca["created_at"] + timedelta(days=rng.randint(1, 30)),
+            "created_by": rng.choice(writers)["id"],
+        })
+    return qualificacoes
+
+
+def generate_licitacoes(fake: Faker, rng: random.Random, qualificacoes, ratio: float, writers):
+    concluidas = [q for q in qualificacoes if q["status"] == "CONCLUIDO"]
+    pregoeiros = [fake.name() for _ in range(30)]
+    licitacoes = []
+    for qualificacao in rng.sample(concluidas, int(len(concluidas) * ratio)):
+        status = rng.choice(STATUS_LICITACAO)
+        estimado = qualificacao["valor_estimado"]
+        homologado = None
+        data_homologacao = None
+        if status == "HOMOLOGADA":
+            homologado = (estimado * Decimal(rng.uniform(0.6, 1.0))).quantize(Decimal("0.01"))
+            data_homologacao = qualificacao["created_at"].date() + timedelta(days=rng.randint(20, 120))
+        licitacoes.append({
+            "id": uuid.uuid4(),
+            "nup": qualificacao["nup"],
+            "numero_contratacao": qualificacao["numero_contratacao"],
+            "ano": qualificacao["ano"],
+            "area_demandante": qualificacao["area_demandante"],
+            "responsavel_instrucao": qualificacao["responsavel_instrucao"],
+            "modalidade": qualificacao["modalidade"],
+            "objeto": qualificacao["objeto"],
+            "palavra_chave": qualificacao["palavra_chave"],
+            "valor_estimado": estimado,
+            "pregoeiro": rng.choice(pregoeiros),
+            "valor_homologado": homologado,
+            "data_homologacao": data_homologacao,
+            "status": status,
+            "economia": estimado - homologado if homologado is not None else None,
+            "created_at": qualificacao["created_at"] + timedelta(days=rng.randint(1, 30)),
+            "created_by": rng.choice(writers)["id"],
+        })
+    return licitacoes
+
+
+def generate_events(rng: random.Random, count: int, users):
+    modules = ["PCA", "QUALIFICACAO", "LICITACAO"]
+    events = []
+    for _ in range(count):
+        imported = rng.randint(0, 500)
+        updated = rng.randint(0, 5000)
+        events.append({
+            "id": uuid.uuid4(),
+            "module": rng.choice(modules),
+            "action": "import",
+            "title": f"Importação de PCA: {imported} novos, {updated} atualizados",
+            "details": '{"imported": %d, "updated": %d, "source": "csv"}' % (imported, updated),
+            "at": _timestamp(rng, rng.choice([2024, 2025])),
+            "user_id": rng.choice(users)["id"],
+        })
+    return events
+
+
+def write_pca_csv(path: str, pcas) -> None:
+    """CSV no layout do sistema federal (';', cp1252, valores e datas em pt-BR)"""
+    with open(path, 'w', encoding='cp1252', newline='') as fh:
+        writer = csv.writer(fh, delimiter=';')
+        writer.writerow([f"Coluna {i + 1}" for i in range(CSV_COLUMNS)])
+        for pca in pcas:
+            row = [''] * CSV_COLUMNS
+            for field, position in CSV_POSITIONS.items():
+                value = pca[field]
+                if value is None:
+                    continue
+                if isinstance(value, date):
+                    value = value.strftime('%d/%m/%Y')
+                elif isinstance(value, Decimal):
+                    value = f"{value:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+                row[position] = value
+            writer.writerow(row)
+
+
+def write_pca_xlsx(path: str, pcas) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("PCA")
+    sheet.append([label for label, _ in EXCEL_HEADER])
+    for pca in pcas:
+        sheet.append([
+            float(pca[field]) if isinstance(pca[field], Decimal) else pca[field]
+            for _, field in EXCEL_HEADER
+        ])
+    workbook.save(path)
+
+
+def reset_synthetic_data(conn) -> None:
+    """Remove o que foi criado pelos usuários sintéticos (em ordem de dependência)"""
+    owners = "SELECT id FROM usuarios WHERE email LIKE %s"
+    pattern = f"%@{SYNTHETIC_EMAIL_DOMAIN}"
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM activity_events WHERE user_id IN ({owners})", (pattern,))
+        cursor.execute(f"DELETE FROM licitacoes WHERE created_by IN ({owners})", (pattern,))
+        cursor.execute(f"DELETE FROM qualificacoes WHERE created_by IN ({owners})", (pattern,))
+        cursor.execute(f"DELETE FROM pca_import_jobs WHERE created_by IN ({owners})", (pattern,))
+        cursor.execute(f"DELETE FROM pca WHERE created_by IN ({owners})", (pattern,))
+        cursor.execute("DELETE FROM usuarios WHERE email LIKE %s", (pattern,))
+
+
+def load_into_database(users, pcas, qualificacoes, licitacoes, events, reset: bool) -> None:
+    from app.core.database import engine
+
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        if reset:
+            print("Removendo dados sintéticos anteriores...")
+            reset_synthetic_data(conn)
+
+        datasets = [
+            ("usuarios", users),
+            ("pca", pcas),
+            ("qualificacoes", qualificacoes),
+            ("licitacoes", licitacoes),
+            ("activity_events", events),
+        ]
+        for table, rows in datasets:
+            if not rows:
+                continue
+            started = time.perf_counter()
+            columns = list(rows[0].keys())
+            copy_rows(conn, table, columns, [[row[column] for column in columns] for row in rows])
+            print(f"  {table}: {len(rows)} linhas em {time.perf_counter() - started:.1f}s")
+        conn.commit()
+        with conn.cursor() as cursor:
+            for table, _ in datasets:
+                cursor.execute(f"ANALYZE {table}")
+            # A carga não passa pela API: invalida os resumos dos dashboards
+            cursor.execute("UPDATE dashboard_summaries SET dirty = true")
+        conn.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para testes de carga")
+    parser.add_argument("--pca", type=int, default=10000, help="quantidade de contratações (ex.: 10000, 100000, 1000000)")
+    parser.add_argument("--anos", type=int, nargs="+", default=[2024, 2025, 2026], help="anos do PCA a distribuir")
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--qualificacao-ratio", type=float, default=0.4, help="fração das contratações com qualificação")
+    parser.add_argument("--licitacao-ratio", type=float, default=0.6, help="fração das qualificações concluídas com licitação")
+    parser.add_argument("--eventos", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", help="grava as contratações também neste CSV")
+    parser.add_argument("--xlsx", help="grava as contratações também nesta planilha")
+    parser.add_argument("--no-db", action="store_true", help="apenas gera os arquivos, sem gravar no banco")
+    parser.add_argument("--reset", action="store_true", help="remove dados sintéticos anteriores antes da carga")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fake = Faker("pt_BR")
+    fake.seed_instance(args.seed)
+
+    started = time.perf_counter()
+    users = generate_users(fake, rng, args.usuarios)
+    writers = [user for user in users if user["nivel_acesso"] != "VISITANTE"]
+    pcas = generate_pcas(fake, rng, args.pca, args.anos, writers)
+    qualificacoes = generate_qualificacoes(fake, rng, pcas, args.qualificacao_ratio, writers)
+    licitacoes = generate_licitacoes(fake, rng, qualificacoes, args.licitacao_ratio, writers)
+    events = generate_events(rng, args.eventos, users)
+    print(
+        f"Gerados: {len(users)} usuários, {len(pcas)} contratações, {len(qualificacoes)} qualificações, "
+        f"{len(licitacoes)} licitações, {len(events)} eventos ({time.perf_counter() - started:.1f}s)"
+    )
+
+    if args.csv:
+        write_pca_csv(args.csv, pcas)
+        print(f"CSV gravado em {args.csv}")
+    if args.xlsx:
+        write_pca_xlsx(args.xlsx, pcas)
+        print(f"Planilha gravada em {args.xlsx}")
+
+    if not args.no_db:
+        print("Gravando no banco...")
+        load_into_database(users, pcas, qualificacoes, licitacoes, events, args.reset)
+        print(f"Login dos usuários sintéticos: bench0000@{SYNTHETIC_EMAIL_DOMAIN} / {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,6 +54,10 @@ import { PCA, Qualificacao, Licitacao } from '../types';
 import { format } from 'date-fns';
 import { ptBR } from 'date-fns/locale';
 
+// Acompanhamento do job de geração do relatório customizado
+const REPORT_JOB_POLL_MS = 1500;
+const REPORT_JOB_MAX_WAIT_MS = 10 * 60 * 1000;
+
 interface ReportConfig {
   dataSource: string;
   selectedFields: string[];
@@ -302,7 +306,22 @@ const Relatorios: React.FC = () => {
     try {
       setGenerating(true);
 
-      const response = await api.post('/api/v1/reports/custom', reportConfig, {
+      // O PDF é gerado em segundo plano: agenda o job e acompanha até concluir
+      let { data: job } = await api.post('/api/v1/reports/custom/jobs', reportConfig);
+      const deadline = Date.now() + REPORT_JOB_MAX_WAIT_MS;
+      while (job.status === 'PENDENTE' || job.status === 'PROCESSANDO') {
+        if (Date.now() > deadline) {
+          throw new Error('Tempo esgotado aguardando o relatório');
+        }
+        await new Promise(resolve => setTimeout(resolve, REPORT_JOB_POLL_MS));
+        ({ data: job } = await api.get(`/api/v1/reports/custom/jobs/${job.id}`));
+      }
+      if (job.status !== 'CONCLUIDO') {
+        toast.error(job.message || 'Erro ao gerar relatório PDF');
+        return;
+      }
+
+      const response = await api.get(`/api/v1/reports/custom/jobs/${job.id}/download`, {
         responseType: 'blob'
       });
 
@@ -1,6 +1,41 @@
 import { api } from './api';
 import { PCA, DashboardStats } from '../types';
 
+// Acompanhamento do job de importação (Excel ou CSV, detectado pela extensão)
+const IMPORT_JOB_POLL_MS = 2000;
+const IMPORT_JOB_MAX_WAIT_MS = 30 * 60 * 1000;
+
+async function runImportJob(file: File, ano?: number): Promise<{ message: string; errors?: string[] }> {
+  const formData = new FormData();
+  formData.append('file', file);
+  if (ano && ano >= 2000 && ano <= 2100) {
+    formData.append('ano', String(ano));
+  }
+
+  // A importação roda em segundo plano: agenda o job e acompanha até concluir
+  let { data: job } = await api.post('/api/v1/pca/import-jobs', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+  const deadline = Date.now() + IMPORT_JOB_MAX_WAIT_MS;
+  while (job.status === 'PENDENTE' || job.status === 'PROCESSANDO') {
+    if (Date.now() > deadline) {
+      throw { response: { data: { detail: 'Tempo esgotado aguardando a importação' } } };
+    }
+    await new Promise(resolve => setTimeout(resolve, IMPORT_JOB_POLL_MS));
+    ({ data: job } = await api.get(`/api/v1/pca/import-jobs/${job.id}`));
+  }
+  if (job.status !== 'CONCLUIDO') {
+    // Mesmo formato de erro do axios, tratado pela tela de importação
+    throw { response: { data: { detail: job.message || 'Erro ao importar arquivo' } } };
+  }
+  return {
+    message: `${job.message}: ${job.imported} novos, ${job.updated} atualizados`,
+    errors: (job.errors || []).slice(0, 5),
+  };
+}
+
 export const pcaService = {
   async getAll(skip = 0, limit = 100, ano?: number): Promise<PCA[]> {
     const anoParam = ano && ano >= 2000 && ano <= 2100 ? `&ano=${ano}` : '';
@@ -29,33 +64,11 @@ export const pcaService = {
   },
 
   async importExcel(file: File, ano?: number): Promise<{ message: string; errors?: string[] }> {
-    const formData = new FormData();
-    formData.append('file', file);
-    if (ano && ano >= 2000 && ano <= 2100) {
-      formData.append('ano', String(ano));
-    }
-
-    const response = await api.post('/api/v1/pca/import', formData, {
-      headers: {
-        'Content-Type': 'multipart/form-data',
-      },
-    });
-    return response.data;
+    return runImportJob(file, ano);
   },
 
   async importCsv(file: File, ano?: number): Promise<{ message: string; errors?: string[] }> {
-    const formData = new FormData();
-    formData.append('file', file);
-    if (ano && ano >= 2000 && ano <= 2100) {
-      formData.append('ano', String(ano));
-    }
-
-    const response = await api.post('/api/v1/pca/import-csv', formData, {
-      headers: {
-        'Content-Type': 'multipart/form-data',
-      },
-    });
-    return response.data;
+    return runImportJob(file, ano);
   },
 
   async getDashboardStats(ano?: number): Promise<DashboardStats> {